@@ -2,24 +2,67 @@
 Propósito: Inicializa la aplicación Flask y configura sus componentes principales.
 Funcionalidad: Define la función create_app() que crea la instancia de Flask, carga 
 configuraciones desde .env a través de config.py, inicializa extensiones como CORS y JWT, 
-configura la clave secreta y registra los Blueprints de categorías, productos, 
-documentación y autenticación.
+configura la clave secreta, instala el proveedor JSON rápido, crea el pool de conexiones a la
+base de datos, los repositorios de acceso a datos (MySQL o SQLite), los contadores de versión
+por tabla, la caché de lectura, el índice de búsqueda de productos, las estadísticas por
+categoría, el registro de cambios para la sincronización incremental y su difusión en vivo
+(Server-Sent Events), el pool de hashing de contraseñas, las métricas por endpoint, el
+control de admisión por grupo de endpoints, la caché de perfiles de usuario, el registro de
+consultas lentas, la compresión de respuestas y la documentación precomprimida en memoria,
+registra los Blueprints de categorías, productos, documentación, autenticación, monitoreo,
+métricas (/metrics) y cambios (/changes) y los comandos flask catalog de importación y
+exportación masiva.
 """
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager  # Importa JWTManager
 from dotenv import load_dotenv
 import os
 
 from .config import Config
+from .db import BaseDatos, PoolAgotadoError
+from .serializacion import ProveedorJSON
+from .repositorios import Repositorios
+from .cache import CacheCatalogo
+from .busqueda import BusquedaProductos
+from .estadisticas import EstadisticasCategorias
+from .registro_cambios import RegistroCambios
+from .eventos import DifusorCambios
+from .versiones import VersionesTablas
+from .hashing import HashingContrasenas, HashingSaturado
+from .perfiles import PerfilesUsuarios
+from .metricas import Metricas
+from .admision import ControlAdmision
+from .consultas_lentas import ConsultasLentas
+from .compresion import Compresion
+from .documentos import Documentacion
+from .comandos import catalogo_cli
 from .blueprints.categoria import categoria_bp
 from .blueprints.producto import producto_bp
 from .blueprints.documentacion import documentacion_bp
 from .blueprints.auth import auth_bp
+from .blueprints.monitoreo import monitoreo_bp
+from .blueprints.metricas import metricas_bp
+from .blueprints.sincronizacion import sincronizacion_bp
 
 cors = CORS()
 jwt = JWTManager()  # Instancia global de JWTManager
+db = BaseDatos()  # Pool de conexiones compartido por los Blueprints
+repositorios = Repositorios()  # Acceso a datos sobre el backend configurado
+versiones = VersionesTablas()  # Versión por tabla compartida entre workers (ETags)
+cache = CacheCatalogo()  # Caché de lectura de productos y categorías
+busqueda = BusquedaProductos()  # Índice de búsqueda de texto completo de productos
+estadisticas = EstadisticasCategorias()  # Resumen de productos y precios por categoría
+registro_cambios = RegistroCambios()  # Registro de cambios del catálogo (/changes)
+eventos = DifusorCambios()  # Cambios en vivo para las conexiones de /productos/stream
+hashing = HashingContrasenas()  # Pool de procesos para bcrypt
+perfiles = PerfilesUsuarios()  # Caché de perfiles de usuario para /auth/me
+metricas = Metricas()  # Latencia, tiempo de base de datos y rendimiento por endpoint
+admision = ControlAdmision()  # Límites de concurrencia por grupo de endpoints y de intentos de /auth
+consultas_lentas = ConsultasLentas()  # Consultas lentas recientes y sus planes de ejecución
+compresion = Compresion()  # Compresión gzip/brotli de las respuestas
+documentacion = Documentacion()  # swagger.json y Swagger UI precomprimidos en memoria
 
 def create_app():
     load_dotenv()
@@ -34,14 +77,58 @@ def create_app():
     # Configura la clave secreta de la aplicación
     app.secret_key = app.config['SECRET_KEY']
 
+    # Los comandos flask (catalog, shell, run) son un único proceso: sus métricas no se vuelcan
+    # al directorio que suma las de los workers del servicio, y el índice de búsqueda y las
+    # estadísticas se construyen con la primera consulta que los usa en lugar de al iniciar
+    # (flask catalog import no debe leer todo el catálogo antes de empezar)
+    if os.getenv('FLASK_RUN_FROM_CLI') == 'true':
+        app.config['METRICS_PERSIST'] = False
+        app.config['SEARCH_INDEX_PRELOAD'] = False
+        app.config['STATS_PRELOAD'] = False
+
+    # Serializa con orjson (si está instalado), Decimal según JSON_DECIMAL y filas precodificadas
+    app.json = ProveedorJSON(app)
+
     # Inicializa extensiones
     cors.init_app(app)
     jwt.init_app(app)  # Inicializa JWTManager
+    db.init_app(app)  # Crea el pool de conexiones
+    repositorios.init_app(app)  # Crea los repositorios de productos, categorías y usuarios
+    versiones.init_app(app)  # Abre los contadores de versión por tabla
+    cache.init_app(app)  # Crea la caché de lectura del catálogo
+    busqueda.init_app(app)  # Construye el índice de búsqueda de productos
+    estadisticas.init_app(app)  # Carga el resumen de productos por categoría
+    registro_cambios.init_app(app)  # Configura la lectura y compactación del registro de cambios
+    eventos.init_app(app)  # Configura la difusión de cambios por Server-Sent Events
+    hashing.init_app(app)  # Configura el pool de hashing de contraseñas
+    perfiles.init_app(app)  # Crea la caché de perfiles de usuario
+    metricas.init_app(app)  # Registra la medición de solicitudes y consultas
+    admision.init_app(app)  # Limita la concurrencia por grupo de endpoints y los intentos de /auth
+    consultas_lentas.init_app(app)  # Activa el registro de consultas lentas
+    compresion.init_app(app)  # Comprime las respuestas grandes de texto y JSON
+    documentacion.init_app(app)  # Carga y comprime la documentación
+
+    # Responde 503 cuando el pool no tiene conexiones libres dentro del tiempo de espera
+    @app.errorhandler(PoolAgotadoError)
+    def pool_agotado(err):
+        return jsonify({"error": "Servicio saturado, intente de nuevo"}), 503, {"Retry-After": "1"}
+
+    # Responde 503 cuando la cola de hashing de contraseñas está llena
+    @app.errorhandler(HashingSaturado)
+    def hashing_saturado(err):
+        retry_after = str(app.config['BCRYPT_RETRY_AFTER'])
+        return jsonify({"error": "Servicio saturado, intente de nuevo"}), 503, {"Retry-After": retry_after}
 
     # Registra Blueprints
     app.register_blueprint(categoria_bp, url_prefix='/categorias')
     app.register_blueprint(producto_bp, url_prefix='/productos')
     app.register_blueprint(documentacion_bp, url_prefix='/documentacion')
     app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(monitoreo_bp, url_prefix='/monitoreo')
+    app.register_blueprint(metricas_bp, url_prefix='/metrics')
+    app.register_blueprint(sincronizacion_bp, url_prefix='/changes')
+
+    # Registra los comandos flask catalog import / export
+    app.cli.add_command(catalogo_cli)
 
     return app
\ No newline at end of file
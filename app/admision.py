@@ -0,0 +1,315 @@
+"""
+Propósito: Control de admisión y descarte de carga por grupos de endpoints.
+Funcionalidad: Define la extensión ControlAdmision, que create_app() instala como hook de cada
+solicitud. Las rutas que usan la base de datos o bcrypt tienen presupuestos de concurrencia
+separados: lecturas del catálogo, escrituras del catálogo y autenticación. Así, cuando MySQL se
+vuelve lento, los hilos del worker no se acumulan todos en llamadas bloqueadas y las rutas que
+no la necesitan (/documentacion, /auth/refresh, /metrics, /monitoreo) siguen respondiendo. El
+límite de cada presupuesto se adapta a la latencia observada: baja cuando las solicitudes tardan
+bastante más que la latencia base y sube mientras se usa y la latencia se mantiene. Una solicitud
+que llega con el presupuesto lleno espera en una cola acotada hasta ADMISSION_QUEUE_TIMEOUT
+segundos; si no entra, recibe 503 con Retry-After de inmediato en lugar de agotar el tiempo del
+cliente. Además limita por cliente, con un token bucket, los intentos de /auth/login y
+/auth/register (429 con Retry-After).
+
+Los presupuestos y los buckets son de cada worker. Solo tienen efecto con workers que atienden
+varias solicitudes a la vez (gunicorn -k gthread o -k gevent). Detrás de un proxy, el cliente
+es request.remote_addr tal como lo deje ProxyFix.
+"""
+
+import collections
+import math
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+# Blueprint -> grupo de presupuesto; los Blueprints ausentes no tienen límite
+GRUPOS = {'categoria': 'catalogo', 'producto': 'catalogo', 'sincronizacion': 'catalogo', 'auth': 'auth'}
+
+# Endpoints sin límite: no usan la base (refresh) o son conexiones de larga duración con su
+# propio límite (SSE_MAX_CLIENTS)
+EXENTOS = {'auth.refresh', 'producto.stream_productos'}
+
+# Endpoints con límite de intentos por cliente
+LIMITADOS_POR_CLIENTE = {'auth.login', 'auth.register'}
+
+# Métodos que cuentan como lectura del catálogo
+METODOS_LECTURA = {'GET', 'HEAD'}
+
+# Ajuste del límite: peso de cada muestra y límites del gradiente
+SUAVIZADO = 0.2
+GRADIENTE_MINIMO = 0.5
+# Respuesta de sobrecarga aguas abajo (pool agotado, hashing saturado): el límite se reduce
+REDUCCION_SOBRECARGA = 0.9
+# La latencia base baja rápido con una muestra más rápida y sube despacio (unas mil muestras)
+ALFA_BASE_BAJA = 0.1
+ALFA_BASE_SUBE = 0.001
+
+
+def grupo_de(blueprint, endpoint, metodo):
+    """
+    Devuelve el presupuesto ('lectura', 'escritura' o 'auth') de una solicitud o None si no
+    tiene límite.
+    """
+    if endpoint in EXENTOS or metodo == 'OPTIONS':
+        return None
+    grupo = GRUPOS.get(blueprint)
+    if grupo == 'catalogo':
+        return 'lectura' if metodo in METODOS_LECTURA else 'escritura'
+    return grupo
+
+
+class Presupuesto:
+    """
+    Límite adaptativo de solicitudes concurrentes de un grupo, con cola FIFO y plazo de espera.
+
+    El límite sigue un gradiente de latencia: cada muestra compara la latencia base (casi la
+    mínima observada) con la de la solicitud. Si la solicitud tardó más de tolerancia veces la
+    base, el límite se reduce en proporción (como mucho a la mitad por muestra). Si no, crece en
+    raíz cuadrada del límite, solo mientras se usa más de la mitad.
+
+    Args:
+        nombre (str): Nombre del grupo.
+        inicial (int): Límite con el que arranca el worker.
+        minimo (int): Límite mínimo.
+        maximo (int): Límite máximo.
+        cola (int): Solicitudes que pueden esperar; con la cola llena se rechaza sin esperar.
+        espera (float): Segundos máximos de espera en la cola.
+        tolerancia (float): Múltiplo de la latencia base que se considera normal.
+    """
+
+    def __init__(self, nombre, inicial, minimo, maximo, cola, espera, tolerancia):
+        self.nombre = nombre
+        self.minimo = max(minimo, 1)
+        self.maximo = max(maximo, self.minimo)
+        self.limite = float(min(max(inicial, self.minimo), self.maximo))
+        self.cola_maxima = cola
+        self.espera = espera
+        self.tolerancia = tolerancia
+        self._lock = threading.Lock()
+        self._cola = collections.deque()
+        self._en_curso = 0
+        self._base = None
+        self._admitidas = 0
+        self._encoladas = 0
+        self._rechazadas = 0
+
+    def adquirir(self):
+        """
+        Ocupa un lugar del presupuesto, esperando en la cola si está lleno.
+
+        Returns:
+            bool: True si la solicitud fue admitida; False si debe rechazarse.
+        """
+        with self._lock:
+            if self._en_curso < int(self.limite) and not self._cola:
+                self._en_curso += 1
+                self._admitidas += 1
+                return True
+            if len(self._cola) >= self.cola_maxima:
+                self._rechazadas += 1
+                return False
+            turno = threading.Event()
+            self._cola.append(turno)
+            self._encoladas += 1
+        admitida = turno.wait(self.espera)
+        with self._lock:
+            # liberar() pudo ceder el lugar justo al vencer el plazo
+            if not admitida and turno.is_set():
+                admitida = True
+            if admitida:
+                self._admitidas += 1
+            else:
+                self._cola.remove(turno)
+                self._rechazadas += 1
+        return admitida
+
+    def liberar(self, segundos, sobrecarga=False):
+        """
+        Devuelve el lugar, ajusta el límite con la latencia de la solicitud y cede los lugares
+        libres a las solicitudes en cola.
+
+        Args:
+            segundos (float): Duración de la solicitud.
+            sobrecarga (bool): La solicitud terminó con un 503 aguas abajo (pool agotado o
+                hashing saturado).
+        """
+        with self._lock:
+            en_curso = self._en_curso
+            self._en_curso -= 1
+            if sobrecarga:
+                self.limite = max(self.minimo, self.limite * REDUCCION_SOBRECARGA)
+            else:
+                self._ajustar(segundos, en_curso)
+            while self._cola and self._en_curso < int(self.limite):
+                self._en_curso += 1
+                self._cola.popleft().set()
+
+    def estado(self):
+        """
+        Devuelve el límite actual, la ocupación y los contadores del presupuesto.
+        """
+        with self._lock:
+            return {
+                "limite": int(self.limite),
+                "en_curso": self._en_curso,
+                "en_cola": len(self._cola),
+                "latencia_base": None if self._base is None else round(self._base, 6),
+                "admitidas": self._admitidas,
+                "encoladas": self._encoladas,
+                "rechazadas": self._rechazadas,
+            }
+
+    def _ajustar(self, segundos, en_curso):
+        segundos = max(segundos, 1e-6)
+        if self._base is None:
+            self._base = segundos
+        else:
+            alfa = ALFA_BASE_BAJA if segundos < self._base else ALFA_BASE_SUBE
+            self._base += (segundos - self._base) * alfa
+        gradiente = max(GRADIENTE_MINIMO, min(1.0, self.tolerancia * self._base / segundos))
+        if gradiente == 1.0 and en_curso < self.limite / 2:
+            # Con el límite holgado la latencia no dice nada de la capacidad: no se sube
+            return
+        nuevo = self.limite * gradiente + math.sqrt(self.limite)
+        limite = self.limite * (1 - SUAVIZADO) + nuevo * SUAVIZADO
+        self.limite = min(max(limite, self.minimo), self.maximo)
+
+
+class LimitadorTasa:
+    """
+    Token bucket por cliente: rafaga intentos seguidos y luego tasa intentos por segundo.
+
+    Args:
+        tasa (float): Intentos por segundo que se reponen.
+        rafaga (int): Capacidad del bucket.
+        max_clientes (int): Clientes recordados; se olvidan los inactivos hace más tiempo.
+    """
+
+    def __init__(self, tasa, rafaga, max_clientes):
+        self.tasa = tasa
+        self.rafaga = max(rafaga, 1)
+        self.max_clientes = max_clientes
+        self._lock = threading.Lock()
+        self._buckets = collections.OrderedDict()  # cliente -> (fichas, momento)
+        self._rechazados = 0
+
+    def consumir(self, cliente):
+        """
+        Consume un intento del cliente.
+
+        Returns:
+            float: 0 si el intento se permite; si no, segundos hasta el siguiente intento.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            fichas, momento = self._buckets.pop(cliente, (float(self.rafaga), ahora))
+            fichas = min(self.rafaga, fichas + (ahora - momento) * self.tasa)
+            espera = 0.0
+            if fichas >= 1:
+                fichas -= 1
+            else:
+                espera = (1 - fichas) / self.tasa
+                self._rechazados += 1
+            self._buckets[cliente] = (fichas, ahora)
+            if len(self._buckets) > self.max_clientes:
+                self._buckets.popitem(last=False)
+            return espera
+
+    def estado(self):
+        with self._lock:
+            return {"clientes": len(self._buckets), "rechazados": self._rechazados}
+
+
+class ControlAdmision:
+    """
+    Extensión de Flask que aplica los presupuestos de concurrencia y el límite de intentos por
+    cliente antes de cada solicitud.
+    """
+
+    def __init__(self, app=None):
+        self.activo = False
+        self.retry_after = 1
+        self.presupuestos = {}
+        self.limitador = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.activo = config['ADMISSION_ENABLED']
+        self.retry_after = config['ADMISSION_RETRY_AFTER']
+        limites = {
+            'lectura': (config['ADMISSION_READ_LIMIT'], config['ADMISSION_READ_MAX']),
+            'escritura': (config['ADMISSION_WRITE_LIMIT'], config['ADMISSION_WRITE_MAX']),
+            'auth': (config['ADMISSION_AUTH_LIMIT'], config['ADMISSION_AUTH_MAX']),
+        }
+        self.presupuestos = {
+            nombre: Presupuesto(
+                nombre, inicial, config['ADMISSION_MIN_LIMIT'], maximo, config['ADMISSION_QUEUE_SIZE'],
+                config['ADMISSION_QUEUE_TIMEOUT'], config['ADMISSION_LATENCY_TOLERANCE'],
+            )
+            for nombre, (inicial, maximo) in limites.items()
+        }
+        if config['AUTH_RATE_LIMIT'] > 0:
+            self.limitador = LimitadorTasa(
+                config['AUTH_RATE_LIMIT'] / 60.0, config['AUTH_RATE_BURST'], config['AUTH_RATE_MAX_CLIENTS']
+            )
+        app.extensions['admision'] = self
+        if not self.activo and self.limitador is None:
+            return
+        # Se registra después de Metricas para que las solicitudes rechazadas se cuenten
+        app.before_request(self._antes)
+        app.after_request(self._despues)
+        app.teardown_request(self._al_terminar)
+
+    def estado(self):
+        """
+        Devuelve el estado de cada presupuesto y del límite de intentos del proceso actual.
+        """
+        return {
+            "activo": self.activo,
+            "presupuestos": {nombre: presupuesto.estado() for nombre, presupuesto in self.presupuestos.items()},
+            "intentos": None if self.limitador is None else self.limitador.estado(),
+        }
+
+    # Hooks de la solicitud
+
+    def _antes(self):
+        if self.limitador is not None and request.endpoint in LIMITADOS_POR_CLIENTE:
+            espera = self.limitador.consumir(request.remote_addr or '')
+            if espera:
+                return (jsonify({"error": "Demasiados intentos, intente más tarde"}), 429,
+                        {"Retry-After": str(math.ceil(espera))})
+        if not self.activo:
+            return None
+        grupo = grupo_de(request.blueprint, request.endpoint, request.method)
+        if grupo is None:
+            return None
+        presupuesto = self.presupuestos[grupo]
+        if not presupuesto.adquirir():
+            return jsonify({"error": "Servicio saturado, intente de nuevo"}), 503, {"Retry-After": str(self.retry_after)}
+        g.admision = (presupuesto, time.perf_counter())
+        g.admision_sobrecarga = False
+        return None
+
+    def _despues(self, respuesta):
+        if 'admision' in g and respuesta.status_code == 503:
+            g.admision_sobrecarga = True
+        return respuesta
+
+    def _al_terminar(self, error=None):
+        # Se ejecuta siempre, incluso si la solicitud terminó con una excepción
+        admision = g.pop('admision', None)
+        if admision is None:
+            return
+        presupuesto, inicio = admision
+        presupuesto.liberar(time.perf_counter() - inicio, g.pop('admision_sobrecarga', False))
+
+
+def get_admision():
+    """
+    Devuelve el control de admisión de la aplicación actual.
+    """
+    return current_app.extensions['admision']
@@ -2,31 +2,20 @@
 Propósito: Define rutas para autenticación de usuarios (inicio de sesión, registro y verificación).
 Funcionalidad: Proporciona endpoints /login, /register y /me para autenticar, registrar y 
 obtener información del usuario autenticado usando JWT. Valida campos, hashea contraseñas con bcrypt 
-y genera/verifica tokens JWT.
+en un pool de procesos dedicado (rehasheando al iniciar sesión si cambió el costo configurado)
+y genera/verifica tokens JWT, que llevan el perfil del usuario como claim para que /me responda
+sin consultar la base (o, si no lo llevan, desde la caché de perfiles).
 """
 
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, verify_jwt_in_request  # Añade create_access_token
-import mysql.connector
-import bcrypt
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request  # Añade create_access_token
+from ..hashing import get_hashing
+from ..perfiles import get_perfiles
+from ..repositorios import RepositorioError, get_repos
 
 # Crea el Blueprint para autenticación
 auth_bp = Blueprint('auth', __name__)
 
-def get_db_connection():
-    """
-    Establece una conexión a la base de datos MySQL usando configuraciones de la app.
-    
-    Returns:
-        mysql.connector.connection: Conexión a la base de datos.
-    """
-    return mysql.connector.connect(
-        host=current_app.config['MYSQL_HOST'],
-        user=current_app.config['MYSQL_USER'],
-        password=current_app.config['MYSQL_PASSWORD'],
-        database=current_app.config['MYSQL_DATABASE']
-    )
-
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)  # Requiere un token de refresco
 def refresh():
@@ -37,7 +26,16 @@ def refresh():
         JSON: Nuevo token de acceso o mensaje de error.
     """
     user_id = get_jwt_identity()
-    access_token = create_access_token(identity=user_id)
+    perfiles = get_perfiles()
+    try:
+        # Perfil actual (caché con TTL o base), no el del token de refresco, que puede tener días
+        perfil = perfiles.obtener(user_id)
+    except RepositorioError as err:
+        return jsonify({"error": "Error al renovar el token"}), 500
+    if perfil is None:
+        # El usuario se eliminó después de emitir el token de refresco
+        return jsonify({"error": "Usuario no encontrado"}), 404
+    access_token = create_access_token(identity=user_id, additional_claims=perfiles.claims_de(perfil))
     return jsonify({"access_token": access_token}), 200
 
 @auth_bp.route('/login', methods=['POST'])
@@ -60,20 +58,25 @@ def login():
     if not all([numero, contrasena]):
         return jsonify({"error": "Número y contraseña son requeridos"}), 400
 
-    connection = get_db_connection()
-    cursor = connection.cursor(dictionary=True)
+    usuarios = get_repos().usuarios
     try:
         # Busca el usuario por número
-        cursor.execute("SELECT * FROM usuario WHERE numero = %s", (numero,))
-        usuario = cursor.fetchone()
+        usuario = usuarios.por_numero(numero)
         
         if not usuario:
             return jsonify({"error": "Usuario no encontrado"}), 404
         
-        # Verifica la contraseña
-        if bcrypt.checkpw(contrasena.encode('utf-8'), usuario['contrasena'].encode('utf-8')):
-            access_token = create_access_token(identity=usuario['id'])
-            refresh_token = create_refresh_token(identity=usuario['id'])  # Genera token de refresco
+        # Verifica la contraseña en el pool de hashing
+        hashing = get_hashing()
+        if hashing.verificar(contrasena, usuario['contrasena']):
+            # Rehashea la contraseña si se guardó con un costo distinto del configurado
+            if hashing.requiere_rehash(usuario['contrasena']):
+                usuarios.actualizar_contrasena(usuario['id'], hashing.hashear(contrasena))
+            # Incluye el perfil en los tokens para que /me no consulte la base
+            claims = get_perfiles().claims_de(usuario)
+            # La identidad (sub) va como texto: PyJWT rechaza los tokens con sub numérico
+            access_token = create_access_token(identity=str(usuario['id']), additional_claims=claims)
+            refresh_token = create_refresh_token(identity=str(usuario['id']), additional_claims=claims)  # Genera token de refresco
             return jsonify({
                 "message": "Inicio de sesión exitoso",
                 "access_token": access_token,
@@ -87,11 +90,8 @@ def login():
             }), 200
         else:
             return jsonify({"error": "Contraseña incorrecta"}), 401
-    except mysql.connector.Error as err:
+    except RepositorioError as err:
         return jsonify({"error": "Error al procesar el inicio de sesión"}), 500
-    finally:
-        cursor.close()
-        connection.close()
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -121,28 +121,22 @@ def register():
     if len(contrasena) < 6:
         return jsonify({"error": "La contraseña debe tener al menos 6 caracteres"}), 400
 
-    connection = get_db_connection()
-    cursor = connection.cursor()
+    usuarios = get_repos().usuarios
     try:
         # Verifica si el número ya está registrado
-        cursor.execute("SELECT id FROM usuario WHERE numero = %s", (numero,))
-        if cursor.fetchone():
+        if usuarios.existe_numero(numero):
             return jsonify({"error": "El número ya está registrado"}), 409
 
-        # Hashea la contraseña
-        hashed_password = bcrypt.hashpw(contrasena.encode('utf-8'), bcrypt.gensalt())
+        # Hashea la contraseña en el pool de hashing
+        hashed_password = get_hashing().hashear(contrasena)
 
         # Inserta el nuevo usuario
-        cursor.execute(
-            "INSERT INTO usuario (numero, nombre, apellido, contrasena) VALUES (%s, %s, %s, %s)",
-            (numero, nombre, apellido, hashed_password)
-        )
-        connection.commit()
-        id = cursor.lastrowid
+        id = usuarios.crear(numero, nombre, apellido, hashed_password)
 
-        # Genera un token JWT para el nuevo usuario
-        access_token = create_access_token(identity=id)
-        refresh_token = create_refresh_token(identity=id)  # Genera token de refresco
+        # Genera un token JWT para el nuevo usuario, con su perfil como claim
+        claims = get_perfiles().claims_de({"id": id, "numero": numero, "nombre": nombre, "apellido": apellido})
+        access_token = create_access_token(identity=str(id), additional_claims=claims)
+        refresh_token = create_refresh_token(identity=str(id), additional_claims=claims)  # Genera token de refresco
         return jsonify({
             "message": "Usuario registrado exitosamente",
             "access_token": access_token,
@@ -154,11 +148,8 @@ def register():
                 "apellido": apellido
             }
         }), 201
-    except mysql.connector.Error as err:
+    except RepositorioError as err:
         return jsonify({"error": "Error al registrar el usuario"}), 500
-    finally:
-        cursor.close()
-        connection.close()
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()  # Protege esta ruta con JWT
@@ -170,11 +161,17 @@ def get_current_user():
         JSON: Datos del usuario o mensaje de error.
     """
     user_id = get_jwt_identity()  # Obtiene el ID del usuario desde el token
-    connection = get_db_connection()
-    cursor = connection.cursor(dictionary=True)
+    perfiles = get_perfiles()
+    # Responde con el perfil incluido en el token, sin consultar la base
+    usuario = perfiles.desde_claims(get_jwt())
+    if usuario is not None and str(usuario.get('id')) == str(user_id):
+        return jsonify({
+            "message": "Usuario encontrado",
+            "usuario": usuario
+        }), 200
     try:
-        cursor.execute("SELECT id, numero, nombre, apellido FROM usuario WHERE id = %s", (user_id,))
-        usuario = cursor.fetchone()
+        # Lee el perfil desde la caché de perfiles o, si no está, desde la base
+        usuario = perfiles.obtener(user_id)
         if usuario:
             return jsonify({
                 "message": "Usuario encontrado",
@@ -182,8 +179,5 @@ def get_current_user():
             }), 200
         else:
             return jsonify({"error": "Usuario no encontrado"}), 404
-    except mysql.connector.Error as err:
-        return jsonify({"error": "Error al obtener el usuario"}), 500
-    finally:
-        cursor.close()
-        connection.close()
\ No newline at end of file
+    except RepositorioError as err:
+        return jsonify({"error": "Error al obtener el usuario"}), 500
\ No newline at end of file
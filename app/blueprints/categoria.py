@@ -1,79 +1,130 @@
 # Propósito: Contiene las rutas y lógica para las operaciones CRUD de la tabla categortia.
 # Funcionalidad: Define un Blueprint (categoria_bp) que agrupa las rutas relacionadas con 
 # categorías (por ejemplo, /categorias, /categorias/<id>). Incluye funciones para obtener todas las categorías, 
-# obtener una categoría específica, crear, actualizar y eliminar categorías, con manejo de errores
-# y conexión a la base de datos usando mysql.connector.
+# obtener una categoría específica, consultar las estadísticas de productos por categoría (/categorias/stats),
+# crear, actualizar y eliminar categorías, con manejo de errores.
+# El acceso a datos se hace a través del repositorio de categorías.
 
 
-# Importa Blueprint, request, jsonify y current_app desde Flask
-from flask import Blueprint, request, jsonify, current_app
+# Importa Blueprint, request y jsonify desde Flask
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required  # Importa jwt_required
-# Importa mysql.connector para conectar con la base de datos
-import mysql.connector
+# Importa el repositorio de categorías y sus errores
+from ..repositorios import COLUMNAS_CATEGORIA, RepositorioError, get_repos
+# Importa las utilidades de paginación por cursor
+from ..paginacion import Pagina, ParametroInvalido, leer_campos
+# Importa la caché de lectura del catálogo
+from ..cache import clave_listado, get_cache
+# Importa la serialización de listados con filas precodificadas
+from ..serializacion import respuesta_listado
+# Importa la notificación de escrituras y los ETags por versión de tabla
+from ..cambios import notificar_cambio
+# Importa las estadísticas por categoría mantenidas en memoria
+from ..estadisticas import get_estadisticas
+from ..versiones import con_etag, etag_vigente, get_versiones, no_modificado
 
 # Crea un Blueprint llamado 'categoria'
 categoria_bp = Blueprint('categoria', __name__)
 
-# Define una función para establecer la conexión con la base de datos
-def get_db_connection():
-    # Establece la conexión usando las configuraciones de current_app
-    connection = mysql.connector.connect(
-        host=current_app.config['MYSQL_HOST'],      # Host desde la configuración
-        user=current_app.config['MYSQL_USER'],      # Usuario desde la configuración
-        password=current_app.config['MYSQL_PASSWORD'],  # Contraseña desde la configuración
-        database=current_app.config['MYSQL_DATABASE']  # Base de datos desde la configuración
-    )
-    return connection
-
-# Ruta para obtener todas las categorías
+# Ruta para obtener las categorías paginadas por cursor, con filtros y ordenamiento
 @categoria_bp.route('/', methods=['GET'])
 def get_categorias():
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor que devuelve resultados como diccionarios
-    cursor = connection.cursor(dictionary=True)
     try:
-        # Ejecuta la consulta para obtener todas las categorías
-        cursor.execute("SELECT * FROM categortia")
-        # Obtiene todos los resultados
-        categorias = cursor.fetchall()
-        # Devuelve las categorías en formato JSON
-        return jsonify(categorias)
-    except mysql.connector.Error as err:
+        # Lee limit, cursor y sort de la consulta
+        pagina = Pagina(request.args)
+        # Lee el filtro opcional por prefijo del nombre
+        filtros = {'nombre': request.args.get('nombre')}
+        # Lee las columnas pedidas con fields (None = todas)
+        campos = leer_campos(request.args, COLUMNAS_CATEGORIA)
+    except ParametroInvalido as err:
+        # Devuelve un error si algún parámetro no es válido
+        return jsonify({"error": str(err)}), 400
+    # Responde 304 sin consultar ni serializar si el cliente ya tiene esta versión
+    etag = get_versiones().etag('categoria', clave=request.full_path)
+    if etag_vigente(etag):
+        return no_modificado(etag)
+    # Devuelve la página desde la caché si está disponible
+    cache = get_cache()
+    clave = clave_listado('categoria', request.args)
+    resultado = cache.obtener(clave)
+    if resultado is not None:
+        return con_etag(respuesta_listado(resultado, 'categoria', campos), etag)
+    generacion = ('categoria', cache.generacion('categoria'))
+    try:
+        # Consulta la página solicitada leyendo solo las columnas pedidas
+        resultado = pagina.resultado(get_repos().categorias.listar(filtros, pagina, campos))
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al obtener categorías"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    # Guarda la página junto con el rango de ids que cubre
+    cache.guardar(clave, resultado, generacion, ('categoria',) + pagina.rango(resultado))
+    # Devuelve la página y el cursor de la siguiente en formato JSON (filas precodificadas)
+    return con_etag(respuesta_listado(resultado, 'categoria', campos), etag)
+
+# Ruta para obtener la cantidad de productos y el precio mínimo, promedio y máximo de cada categoría
+@categoria_bp.route('/stats', methods=['GET'])
+def get_categorias_stats():
+    try:
+        # Lee el resumen mantenido en memoria (no recorre la tabla de productos)
+        resultado = get_estadisticas().categorias()
+    except RepositorioError as err:
+        # Devuelve un error si falla la primera carga del resumen
+        return jsonify({"error": "Error al obtener las estadísticas"}), 500
+    # Devuelve las estadísticas en formato JSON
+    return jsonify(resultado)
+
+# Ruta para obtener las estadísticas de productos de una categoría
+@categoria_bp.route('/<int:id>/stats', methods=['GET'])
+def get_categoria_stats(id):
+    try:
+        # Lee el resumen de la categoría mantenido en memoria
+        estadisticas = get_estadisticas().categoria(id)
+        if estadisticas is None:
+            # Sin productos: verifica que la categoría exista
+            if get_cache().obtener_item('categoria', id) is None and get_repos().categorias.obtener(id) is None:
+                # Si no existe, devuelve un error 404
+                return jsonify({"error": "Categoría no encontrada"}), 404
+            estadisticas = {"categortia_id": id, "productos": 0, "precio_min": None, "precio_max": None,
+                            "precio_promedio": None}
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta
+        return jsonify({"error": "Error al obtener las estadísticas"}), 500
+    # Devuelve las estadísticas de la categoría en formato JSON
+    return jsonify(estadisticas)
 
 # Ruta para obtener una categoría específica por ID
 @categoria_bp.route('/<int:id>', methods=['GET'])
 def get_categoria(id):
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor que devuelve resultados como diccionarios
-    cursor = connection.cursor(dictionary=True)
     try:
-        # Ejecuta la consulta para obtener la categoría por ID
-        cursor.execute("SELECT * FROM categortia WHERE id = %s", (id,))
-        # Obtiene el primer resultado
-        categoria = cursor.fetchone()
-        if categoria:
-            # Si existe, devuelve la categoría en formato JSON
-            return jsonify(categoria)
-        else:
-            # Si no existe, devuelve un error 404
-            return jsonify({"error": "Categoría no encontrada"}), 404
-    except mysql.connector.Error as err:
+        # Lee las columnas pedidas con fields (None = todas)
+        campos = leer_campos(request.args, COLUMNAS_CATEGORIA)
+    except ParametroInvalido as err:
+        # Devuelve un error si fields no es válido
+        return jsonify({"error": str(err)}), 400
+    # Responde 304 sin consultar ni serializar si el cliente ya tiene esta versión
+    etag = get_versiones().etag('categoria', clave=request.path + ("?fields=" + ",".join(campos) if campos else ''))
+    if etag_vigente(etag):
+        return no_modificado(etag)
+    # Devuelve la categoría desde la caché si está disponible (o la proyecta desde la completa)
+    cache = get_cache()
+    categoria = cache.obtener_item('categoria', id, campos)
+    if categoria is not None:
+        return con_etag(jsonify(categoria), etag)
+    generacion = ('categoria', cache.generacion('categoria'))
+    try:
+        # Obtiene la categoría por ID leyendo solo las columnas pedidas
+        categoria = get_repos().categorias.obtener(id, campos)
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al obtener la categoría"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    if categoria:
+        # Guarda la categoría en la caché
+        cache.guardar_item('categoria', id, campos, categoria, generacion)
+        # Si existe, devuelve la categoría en formato JSON
+        return con_etag(jsonify(categoria), etag)
+    else:
+        # Si no existe, devuelve un error 404
+        return jsonify({"error": "Categoría no encontrada"}), 404
 
 # Ruta para crear una nueva categoría
 @categoria_bp.route('/', methods=['POST'])
@@ -86,27 +137,16 @@ def create_categoria():
     if not nombre:
         # Devuelve un error si falta el nombre
         return jsonify({"error": "El nombre es requerido"}), 400
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor
-    cursor = connection.cursor()
     try:
-        # Inserta la nueva categoría en la base de datos
-        cursor.execute("INSERT INTO categortia (nombre) VALUES (%s)", (nombre,))
-        # Confirma los cambios
-        connection.commit()
-        # Obtiene el ID de la nueva categoría
-        id = cursor.lastrowid
-        # Devuelve la categoría creada con código 201
-        return jsonify("Categoría agregada",{"id": id, "nombre": nombre}), 201
-    except mysql.connector.Error as err:
+        # Inserta la nueva categoría y obtiene su ID
+        id = get_repos().categorias.crear(nombre)
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al crear la categoría"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    # Invalida las páginas de listado que cubren el nuevo ID
+    notificar_cambio('categoria', [id])
+    # Devuelve la categoría creada con código 201
+    return jsonify("Categoría agregada",{"id": id, "nombre": nombre}), 201
 
 # Ruta para actualizar una categoría existente
 @categoria_bp.route('/<int:id>', methods=['PUT'])
@@ -119,54 +159,38 @@ def update_categoria(id):
     if not nombre:
         # Devuelve un error si falta el nombre
         return jsonify({"error": "El nombre es requerido"}), 400
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor
-    cursor = connection.cursor()
     try:
         # Actualiza la categoría en la base de datos
-        cursor.execute("UPDATE categortia SET nombre = %s WHERE id = %s", (nombre, id))
-        # Confirma los cambios
-        connection.commit()
-        if cursor.rowcount:
-            # Si se actualizó, devuelve la categoría actualizada
-            return jsonify("Categoría actualizada",{"id": id, "nombre": nombre})
-        else:
-            # Si no se encontró, devuelve un error 404
-            return jsonify({"error": "Categoría no encontrada"}), 404
-    except mysql.connector.Error as err:
+        actualizada = get_repos().categorias.actualizar(id, nombre)
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al actualizar la categoría"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    if actualizada:
+        # Invalida la categoría y las páginas de listado que la contienen
+        notificar_cambio('categoria', [id])
+        # Si se actualizó, devuelve la categoría actualizada
+        return jsonify("Categoría actualizada",{"id": id, "nombre": nombre})
+    else:
+        # Si no se encontró, devuelve un error 404
+        return jsonify({"error": "Categoría no encontrada"}), 404
 
 # Ruta para eliminar una categoría
 @categoria_bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()  # Protege esta ruta
 def delete_categoria(id):
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor
-    cursor = connection.cursor()
     try:
-        # Elimina la categoría de la base de datos
-        cursor.execute("DELETE FROM categortia WHERE id = %s", (id,))
-        # Confirma los cambios
-        connection.commit()
-        if cursor.rowcount:
-            # Si se eliminó, devuelve un mensaje de éxito
-            return jsonify({"message": "Categoría eliminada"})
-        else:
-            # Si no se encontró, devuelve un error 404
-            return jsonify({"error": "Categoría no encontrada"}), 404
-    except mysql.connector.Error as err:
+        # Elimina la categoría y obtiene los productos eliminados en cascada
+        eliminada, productos = get_repos().categorias.eliminar(id)
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al eliminar la categoría"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
\ No newline at end of file
+    if eliminada:
+        # Invalida la categoría, sus productos en cascada y las páginas que los contenían
+        notificar_cambio('categoria', [id])
+        if productos:
+            notificar_cambio('producto', productos)
+        # Si se eliminó, devuelve un mensaje de éxito
+        return jsonify({"message": "Categoría eliminada"})
+    else:
+        # Si no se encontró, devuelve un error 404
+        return jsonify({"error": "Categoría no encontrada"}), 404
\ No newline at end of file
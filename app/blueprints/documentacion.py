@@ -1,5 +1,12 @@
-from flask import send_from_directory, render_template_string, Blueprint
-import os
+"""
+Propósito: Sirve la documentación de la API.
+Funcionalidad: Proporciona swagger.json, la página de Swagger UI y sus recursos desde la
+memoria de la extensión Documentacion, precomprimidos y con ETag y Cache-Control.
+"""
+
+from flask import Blueprint, jsonify, request
+
+from ..documentos import get_documentacion
 
 documentacion_bp = Blueprint('documentacion', __name__)
 
@@ -7,38 +14,22 @@ documentacion_bp = Blueprint('documentacion', __name__)
 
 @documentacion_bp.route('/swagger.json')
 def swagger_json():
-    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    print(f"Intentando servir swagger.json desde: {os.path.join(root_dir, 'swagger.json')}")  # Depuración
-    if not os.path.exists(os.path.join(root_dir, 'swagger.json')):
-        return {"error": "Archivo swagger.json no encontrado"}, 404
-    return send_from_directory(root_dir, 'swagger.json')
+    # Especificación OpenAPI cargada al iniciar (se recarga si cambió en disco)
+    swagger = get_documentacion().especificacion()
+    if swagger is None:
+        return jsonify({"error": "Archivo swagger.json no encontrado"}), 404
+    return swagger.respuesta()
 
 @documentacion_bp.route("/docs")
 def swagger_ui():
-    return render_template_string("""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Swagger UI</title>
-        <link rel="stylesheet" href="/static/swagger-ui/swagger-ui.css" />
-    </head>
-    <body>
-        <div id="swagger-ui"></div>
-        <script src="/static/swagger-ui/swagger-ui-bundle.js"></script>
-        <script src="/static/swagger-ui/swagger-ui-standalone-preset.js"></script>
-        <script>
-            window.onload = () => {
-                window.ui = SwaggerUIBundle({
-                    url: '/documentacion/swagger.json',
-                    dom_id: '#swagger-ui',
-                    presets: [
-                        SwaggerUIBundle.presets.apis,
-                        SwaggerUIStandalonePreset
-                    ],
-                    layout: "StandaloneLayout",
-                });
-            };
-        </script>
-    </body>
-    </html>
-    """)
\ No newline at end of file
+    # Página HTML en memoria, regenerada solo cuando cambia la versión de un recurso
+    return get_documentacion().pagina().respuesta()
+
+@documentacion_bp.route('/swagger-ui/<path:nombre>')
+def swagger_ui_recurso(nombre):
+    # CSS, JavaScript e imágenes de Swagger UI
+    documentacion = get_documentacion()
+    recurso = documentacion.recurso(nombre)
+    if recurso is None:
+        return jsonify({"error": "Recurso no encontrado"}), 404
+    return documentacion.respuesta_recurso(recurso, request.args.get('v'))
@@ -0,0 +1,23 @@
+"""
+Propósito: Expone las métricas de la aplicación para Prometheus.
+Funcionalidad: Proporciona el endpoint /metrics con la latencia por endpoint, los códigos de
+estado, las solicitudes en curso, el tiempo de base de datos y de serialización y las filas
+leídas, sumados entre todos los workers de gunicorn, en el formato de texto de Prometheus.
+"""
+
+from flask import Blueprint, Response
+
+from ..metricas import get_metricas
+
+# Crea el Blueprint para las métricas
+metricas_bp = Blueprint('metricas', __name__)
+
+@metricas_bp.route('', methods=['GET'])
+def metrics():
+    """
+    Obtiene las métricas agregadas de todos los workers.
+
+    Returns:
+        text/plain: Métricas en el formato de exposición de Prometheus 0.0.4.
+    """
+    return Response(get_metricas().exposicion(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,104 @@
+"""
+Propósito: Define rutas de monitoreo del estado interno de la aplicación.
+Funcionalidad: Proporciona el endpoint /pool con las estadísticas del pool de conexiones
+(conexiones en uso y ociosas, esperas y tiempo de espera) para dimensionarlo, el endpoint
+/cache con los contadores de aciertos, fallos y desalojos de la caché de lectura, el endpoint
+/perfiles con los de la caché de perfiles de usuario, el endpoint /busqueda con el tamaño y el
+estado del índice de búsqueda, el endpoint /eventos con las conexiones de /productos/stream, el
+endpoint /admision con los límites de concurrencia y los rechazos del control de admisión, el
+endpoint /compresion con la caché de respuestas comprimidas y el endpoint /consultas-lentas,
+solo para administradores, con las consultas lentas recientes y sus planes.
+"""
+
+from flask import Blueprint, jsonify, current_app
+
+from ..consultas_lentas import get_consultas_lentas
+from ..permisos import admin_requerido
+
+# Crea el Blueprint para monitoreo
+monitoreo_bp = Blueprint('monitoreo', __name__)
+
+@monitoreo_bp.route('/pool', methods=['GET'])
+def pool_stats():
+    """
+    Obtiene las estadísticas del pool de conexiones del proceso actual.
+
+    Returns:
+        JSON: Estadísticas del pool.
+    """
+    return jsonify(current_app.extensions['db_pool'].estadisticas()), 200
+
+@monitoreo_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    """
+    Obtiene los contadores de la caché de lectura del proceso actual.
+
+    Returns:
+        JSON: Entradas, aciertos, fallos, desalojos e invalidaciones.
+    """
+    return jsonify(current_app.extensions['cache'].estadisticas()), 200
+
+
+@monitoreo_bp.route('/perfiles', methods=['GET'])
+def perfiles_stats():
+    """
+    Obtiene los contadores de la caché de perfiles de usuario del proceso actual.
+
+    Returns:
+        JSON: Entradas, aciertos, fallos, desalojos e invalidaciones.
+    """
+    return jsonify(current_app.extensions['perfiles'].estadisticas()), 200
+
+
+@monitoreo_bp.route('/busqueda', methods=['GET'])
+def busqueda_stats():
+    """
+    Obtiene el tamaño y el estado del índice de búsqueda del proceso actual.
+
+    Returns:
+        JSON: Modo, productos y términos indexados y si hay una reconstrucción pendiente.
+    """
+    return jsonify(current_app.extensions['busqueda'].estadisticas()), 200
+
+@monitoreo_bp.route('/eventos', methods=['GET'])
+def eventos_stats():
+    """
+    Obtiene las conexiones Server-Sent Events abiertas en el proceso actual.
+
+    Returns:
+        JSON: Conexiones abiertas y última secuencia difundida.
+    """
+    return jsonify(current_app.extensions['eventos'].estado()), 200
+
+@monitoreo_bp.route('/admision', methods=['GET'])
+def admision_stats():
+    """
+    Obtiene el estado del control de admisión del proceso actual.
+
+    Returns:
+        JSON: Límite, solicitudes en curso y en cola y rechazos de cada grupo, y los clientes
+        con límite de intentos.
+    """
+    return jsonify(current_app.extensions['admision'].estado()), 200
+
+@monitoreo_bp.route('/compresion', methods=['GET'])
+def compresion_stats():
+    """
+    Obtiene el tamaño y los contadores de la caché de respuestas comprimidas del proceso actual.
+
+    Returns:
+        JSON: Entradas, bytes ocupados y máximos, aciertos y fallos.
+    """
+    return jsonify(current_app.extensions['compresion'].estadisticas()), 200
+
+@monitoreo_bp.route('/consultas-lentas', methods=['GET'])
+@admin_requerido  # Solo usuarios de ADMIN_USUARIOS
+def consultas_lentas():
+    """
+    Obtiene las consultas lentas recientes del proceso actual y los planes de ejecución
+    capturados con EXPLAIN.
+
+    Returns:
+        JSON: Umbral, consultas recientes (la más reciente primero) y planes por plantilla.
+    """
+    return jsonify(get_consultas_lentas().recientes()), 200
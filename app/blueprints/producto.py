@@ -1,79 +1,302 @@
 # Propósito: Contiene las rutas y lógica para las operaciones CRUD de la tabla producto.
 # Funcionalidad: Define un Blueprint (producto_bp) que agrupa las rutas relacionadas 
 # con productos (por ejemplo, /productos, /productos/<id>). Incluye funciones para obtener todos los productos, 
-# obtener un producto específico, crear, actualizar y eliminar productos, con validaciones 
-# como verificar la existencia de categorías y manejo de errores.
+# obtener varios por ID en una sola consulta (?ids=) con su categoría incluida (?include=categoria),
+# exportar el catálogo completo en streaming, recibir los cambios en vivo (Server-Sent Events en /productos/stream),
+# buscar por texto completo, obtener un producto específico, crear, actualizar y eliminar
+# productos (uno a uno o en lotes transaccionales en /productos/bulk), con validaciones como verificar
+# la existencia de categorías y manejo de errores. El acceso a datos se hace a través del repositorio de productos.
 
 
-# Importa Blueprint, request, jsonify y current_app desde Flask
-from flask import Blueprint, request, jsonify, current_app
-# Importa mysql.connector para conectar con la base de datos
+# Importa Blueprint, request y jsonify desde Flask
+from flask import Blueprint, Response, current_app, request, jsonify
 from flask_jwt_extended import jwt_required  # Importa jwt_required
-import mysql.connector
+# Importa el repositorio de productos y sus errores
+from ..repositorios import (
+    ACTUALIZADO, COLUMNAS_PRODUCTO, SIN_CATEGORIA, CategoriaInexistente, RepositorioError, get_repos,
+)
+# Importa las utilidades de paginación por cursor
+from ..paginacion import (
+    Pagina, ParametroInvalido, leer_campos, leer_decimal, leer_entero, leer_ids, leer_incluir, leer_limite,
+)
+# Importa la búsqueda de texto completo
+from ..busqueda import decodificar_cursor, get_busqueda, tokenizar
+# Importa la caché de lectura del catálogo
+from ..cache import clave_listado, get_cache
+# Importa la serialización de listados con filas precodificadas
+from ..serializacion import respuesta_listado
+# Importa la difusión de cambios en vivo
+from ..eventos import LimiteSuscriptores, get_eventos
+# Importa la notificación de escrituras y los ETags por versión de tabla
+from ..cambios import notificar_cambio
+from ..versiones import con_etag, etag_vigente, get_versiones, no_modificado
 
 # Crea un Blueprint llamado 'producto'
 producto_bp = Blueprint('producto', __name__)
 
-# Define una función para establecer la conexión con la base de datos
-def get_db_connection():
-    # Establece la conexión usando las configuraciones de current_app
-    connection = mysql.connector.connect(
-        host=current_app.config['MYSQL_HOST'],      # Host desde la configuración
-        user=current_app.config['MYSQL_USER'],      # Usuario desde la configuración
-        password=current_app.config['MYSQL_PASSWORD'],  # Contraseña desde la configuración
-        database=current_app.config['MYSQL_DATABASE']  # Base de datos desde la configuración
-    )
-    return connection
-
-# Ruta para obtener todos los productos
+# Ruta para obtener los productos paginados por cursor, con filtros y ordenamiento
 @producto_bp.route('/', methods=['GET'])
 def get_productos():
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor que devuelve resultados como diccionarios
-    cursor = connection.cursor(dictionary=True)
-    try:
-        # Ejecuta la consulta para obtener todos los productos
-        cursor.execute("SELECT * FROM producto")
-        # Obtiene todos los resultados
-        productos = cursor.fetchall()
-        # Devuelve los productos en formato JSON
-        return jsonify(productos)
-    except mysql.connector.Error as err:
+    try:
+        # Lee las relaciones a incluir y las columnas pedidas con fields (None = todas)
+        incluir = leer_incluir(request.args, RELACIONES)
+        campos = leer_campos(request.args, COLUMNAS_PRODUCTO, requeridos_para(incluir))
+        # Con ids se devuelven esos productos en lugar de una página
+        ids = leer_ids(request.args)
+        if ids is not None:
+            return get_productos_por_ids(ids, campos, incluir)
+        # Lee limit, cursor y sort de la consulta
+        pagina = Pagina(request.args)
+        # Lee los filtros opcionales (categoría, rango de precio y prefijo del nombre)
+        filtros = {
+            'categortia_id': leer_entero(request.args, 'categortia_id'),
+            'precio_min': leer_decimal(request.args, 'precio_min'),
+            'precio_max': leer_decimal(request.args, 'precio_max'),
+            'nombre': request.args.get('nombre'),
+        }
+    except ParametroInvalido as err:
+        # Devuelve un error si algún parámetro no es válido
+        return jsonify({"error": str(err)}), 400
+    # Responde 304 sin consultar ni serializar si el cliente ya tiene esta versión
+    etag = get_versiones().etag(*tablas_de(incluir), clave=request.full_path)
+    if etag_vigente(etag):
+        return no_modificado(etag)
+    # Devuelve la página desde la caché si está disponible
+    cache = get_cache()
+    clave = clave_listado('producto', request.args)
+    resultado = cache.obtener(clave)
+    if resultado is None:
+        generacion = ('producto', cache.generacion('producto'))
+        try:
+            # Consulta la página solicitada leyendo solo las columnas pedidas
+            resultado = pagina.resultado(get_repos().productos.listar(filtros, pagina, campos))
+        except RepositorioError as err:
+            # Devuelve un error si falla la consulta
+            return jsonify({"error": "Error al obtener los productos"}), 500
+        # Guarda la página (sin las relaciones incluidas) junto con el rango de ids que cubre
+        cache.guardar(clave, resultado, generacion, ('producto',) + pagina.rango(resultado))
+    if incluir:
+        try:
+            # Agrega la categoría de cada producto con una sola consulta para todas
+            resultado = dict(resultado, data=incluir_categorias(resultado['data']))
+        except RepositorioError as err:
+            # Devuelve un error si falla la consulta
+            return jsonify({"error": "Error al obtener los productos"}), 500
+    # Devuelve la página y el cursor de la siguiente en formato JSON (filas precodificadas)
+    return con_etag(respuesta_listado(resultado, 'producto', variante(campos, incluir)), etag)
+
+# Relaciones que se pueden incluir en las respuestas de productos con include
+RELACIONES = ('categoria',)
+
+# Columnas que hay que leer para poder incluir las relaciones pedidas
+def requeridos_para(incluir):
+    return ('categortia_id',) if 'categoria' in incluir else ()
+
+# Tablas de las que depende la respuesta (para el ETag)
+def tablas_de(incluir):
+    return ('producto', 'categoria') if 'categoria' in incluir else ('producto',)
+
+# Identifica la forma de la respuesta (columnas y relaciones) en los ETags y en la caché de filas
+def variante(campos, incluir):
+    if not incluir:
+        return campos
+    return (campos or COLUMNAS_PRODUCTO) + tuple(sorted(incluir))
+
+# Devuelve los productos pedidos con ids, en el mismo orden, e informa los que no existen
+def get_productos_por_ids(ids, campos, incluir):
+    # Responde 304 sin consultar ni serializar si el cliente ya tiene esta versión
+    etag = get_versiones().etag(*tablas_de(incluir), clave=request.full_path)
+    if etag_vigente(etag):
+        return no_modificado(etag)
+    # Toma de la caché los productos disponibles
+    cache = get_cache()
+    productos = {}
+    for id in ids:
+        producto = cache.obtener_item('producto', id, campos)
+        if producto is not None:
+            productos[id] = producto
+    faltan = [id for id in ids if id not in productos]
+    try:
+        if faltan:
+            # Lee el resto con una sola consulta IN y los guarda en la caché
+            generacion = ('producto', cache.generacion('producto'))
+            for producto in get_repos().productos.obtener_varios(faltan, campos):
+                productos[producto['id']] = producto
+                cache.guardar_item('producto', producto['id'], campos, producto, generacion)
+        # Conserva el orden pedido
+        filas = [productos[id] for id in ids if id in productos]
+        if incluir:
+            # Agrega la categoría de cada producto con una sola consulta para todas
+            filas = incluir_categorias(filas)
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al obtener los productos"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    resultado = {"data": filas, "missing": [id for id in ids if id not in productos]}
+    # Devuelve los productos encontrados y los IDs inexistentes en formato JSON
+    return con_etag(respuesta_listado(resultado, 'producto', variante(campos, incluir)), etag)
+
+# Agrega a cada producto su categoría; las categorías que no están en la caché se leen juntas
+def incluir_categorias(productos):
+    cache = get_cache()
+    categorias = {}
+    faltan = []
+    for id in {producto['categortia_id'] for producto in productos}:
+        categoria = cache.obtener_item('categoria', id)
+        if categoria is not None:
+            categorias[id] = categoria
+        else:
+            faltan.append(id)
+    if faltan:
+        generacion = ('categoria', cache.generacion('categoria'))
+        for categoria in get_repos().categorias.obtener_varios(faltan):
+            categorias[categoria['id']] = categoria
+            cache.guardar_item('categoria', categoria['id'], None, categoria, generacion)
+    # Copias: las filas originales pueden estar en la caché
+    return [dict(producto, categoria=categorias.get(producto['categortia_id'])) for producto in productos]
+
+# Ruta para buscar productos por nombre y descripción, ordenados por relevancia
+@producto_bp.route('/search', methods=['GET'])
+def search_productos():
+    # Normaliza la consulta: minúsculas, sin acentos y separada en términos
+    terminos = tokenizar(request.args.get('q', ''))
+    if not terminos:
+        # Devuelve un error si la consulta está vacía
+        return jsonify({"error": "El parámetro q es requerido"}), 400
+    try:
+        # Lee las relaciones a incluir
+        incluir = leer_incluir(request.args, RELACIONES)
+        # Lee limit y el cursor de la página anterior
+        limite = leer_limite(request.args)
+        cursor = request.args.get('cursor')
+        despues = decodificar_cursor(cursor) if cursor else None
+    except ParametroInvalido as err:
+        # Devuelve un error si algún parámetro no es válido
+        return jsonify({"error": str(err)}), 400
+    # Responde 304 sin buscar ni serializar si el cliente ya tiene esta versión
+    etag = get_versiones().etag(*tablas_de(incluir), clave=request.full_path)
+    if etag_vigente(etag):
+        return no_modificado(etag)
+    try:
+        # Busca en el índice invertido (o en el índice FULLTEXT de MySQL)
+        resultado = get_busqueda().buscar(terminos, limite, despues)
+        if incluir:
+            # Agrega la categoría de cada producto con una sola consulta para todas
+            resultado = dict(resultado, data=incluir_categorias(resultado['data']))
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta
+        return jsonify({"error": "Error al buscar los productos"}), 500
+    # Devuelve la página y el cursor de la siguiente en formato JSON
+    return con_etag(jsonify(resultado), etag)
+
+# Formatos de exportación admitidos y su tipo de contenido
+FORMATOS_EXPORTACION = {'ndjson': 'application/x-ndjson', 'json': 'application/json'}
+
+# Ruta para exportar el catálogo completo en streaming con memoria constante
+@producto_bp.route('/export', methods=['GET'])
+def export_productos():
+    formato = request.args.get('format', 'ndjson')
+    if formato not in FORMATOS_EXPORTACION:
+        # Devuelve un error si el formato no es válido
+        return jsonify({"error": "format debe ser ndjson o json"}), 400
+    # Lee la configuración y el serializador antes de salir del contexto de la solicitud
+    tamano_lote = current_app.config['EXPORT_CHUNK_SIZE']
+    dumps = current_app.json.dumps
+    # El repositorio recorre la tabla en lotes; el generador conserva la conexión hasta terminar
+    lotes = get_repos().productos.iterar(tamano_lote)
+    try:
+        # Lee el primer lote antes de responder para poder devolver 500 si falla la consulta
+        primer_lote = next(lotes, [])
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta
+        return jsonify({"error": "Error al exportar los productos"}), 500
+
+    def generar():
+        try:
+            primero = True
+            if formato == 'json':
+                yield '['
+            filas = primer_lote
+            while filas:
+                if formato == 'ndjson':
+                    yield ''.join(dumps(fila) + '\n' for fila in filas)
+                else:
+                    lote = ','.join(dumps(fila) for fila in filas)
+                    yield lote if primero else ',' + lote
+                primero = False
+                # Lee el siguiente lote de filas
+                filas = next(lotes, [])
+            if formato == 'json':
+                yield ']'
+        finally:
+            # Libera la conexión también si el cliente se desconecta antes del final
+            lotes.close()
+
+    # X-Accel-Buffering evita que un proxy nginx acumule la respuesta completa
+    return Response(generar(), mimetype=FORMATOS_EXPORTACION[formato], headers={"X-Accel-Buffering": "no"})
+
+# Ruta para recibir los cambios de productos y categorías en vivo (Server-Sent Events)
+@producto_bp.route('/stream', methods=['GET'])
+def stream_productos():
+    # Lee la última secuencia recibida: cabecera de EventSource al reconectar o parámetro de consulta
+    ultimo = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        desde = int(ultimo) if ultimo else None
+    except ValueError:
+        # Devuelve un error si no es un entero
+        return jsonify({"error": "Last-Event-ID debe ser un entero"}), 400
+    try:
+        # Registra la conexión; el generador no usa la base salvo para recuperar lo perdido
+        flujo = get_eventos().suscribir(desde)
+    except LimiteSuscriptores:
+        # Devuelve un error si el worker ya no admite más conexiones
+        return jsonify({"error": "Servicio saturado, intente de nuevo"}), 503, {"Retry-After": "5"}
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta de la marca inicial
+        return jsonify({"error": "Error al abrir el flujo de cambios"}), 500
+    # no-cache y X-Accel-Buffering evitan que un proxy guarde o acumule los eventos
+    return Response(flujo, mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # Ruta para obtener un producto específico por ID
 @producto_bp.route('/<int:id>', methods=['GET'])
 def get_producto(id):
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor que devuelve resultados como diccionarios
-    cursor = connection.cursor(dictionary=True)
-    try:
-        # Ejecuta la consulta para obtener el producto por ID
-        cursor.execute("SELECT * FROM producto WHERE id = %s", (id,))
-        # Obtiene el primer resultado
-        producto = cursor.fetchone()
-        if producto:
-            # Si existe, devuelve el producto en formato JSON
-            return jsonify(producto)
-        else:
-            # Si no existe, devuelve un error 404
-            return jsonify({"error": "Producto no encontrado"}), 404
-    except mysql.connector.Error as err:
+    try:
+        # Lee las relaciones a incluir y las columnas pedidas con fields (None = todas)
+        incluir = leer_incluir(request.args, RELACIONES)
+        campos = leer_campos(request.args, COLUMNAS_PRODUCTO, requeridos_para(incluir))
+    except ParametroInvalido as err:
+        # Devuelve un error si fields o include no son válidos
+        return jsonify({"error": str(err)}), 400
+    # Responde 304 sin consultar ni serializar si el cliente ya tiene esta versión
+    forma = variante(campos, incluir)
+    etag = get_versiones().etag(
+        *tablas_de(incluir), clave=request.path + ("?fields=" + ",".join(forma) if forma else '')
+    )
+    if etag_vigente(etag):
+        return no_modificado(etag)
+    # Busca el producto en la caché (o lo proyecta desde el completo)
+    cache = get_cache()
+    producto = cache.obtener_item('producto', id, campos)
+    try:
+        if producto is None:
+            generacion = ('producto', cache.generacion('producto'))
+            # Obtiene el producto por ID leyendo solo las columnas pedidas
+            producto = get_repos().productos.obtener(id, campos)
+            if producto:
+                # Guarda el producto en la caché
+                cache.guardar_item('producto', id, campos, producto, generacion)
+        if producto and incluir:
+            # Agrega la categoría del producto
+            producto = incluir_categorias([producto])[0]
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al obtener el producto"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    if producto:
+        # Si existe, devuelve el producto en formato JSON
+        return con_etag(jsonify(producto), etag)
+    else:
+        # Si no existe, devuelve un error 404
+        return jsonify({"error": "Producto no encontrado"}), 404
 
 # Ruta para crear un nuevo producto
 @producto_bp.route('/', methods=['POST'])
@@ -89,35 +312,19 @@ def create_producto():
     if not all([nombre, precio, categortia_id]):
         # Devuelve un error si faltan campos requeridos
         return jsonify({"error": "Nombre, precio y categortia_id son requeridos"}), 400
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor
-    cursor = connection.cursor()
-    try:
-        # Verifica si la categoría existe
-        cursor.execute("SELECT id FROM categortia WHERE id = %s", (categortia_id,))
-        if not cursor.fetchone():
-            # Devuelve un error si la categoría no existe
-            return jsonify({"error": "Categoría no encontrada"}), 404
-        # Inserta el nuevo producto en la base de datos
-        cursor.execute(
-            "INSERT INTO producto (nombre, precio, descripcion, categortia_id) VALUES (%s, %s, %s, %s)",
-            (nombre, precio, descripcion, categortia_id)
-        )
-        # Confirma los cambios
-        connection.commit()
-        # Obtiene el ID del nuevo producto
-        id = cursor.lastrowid
-        # Devuelve el producto creado con código 201
-        return jsonify("Producto agregado",{"id": id, "nombre": nombre, "precio": precio, "descripcion": descripcion, "categortia_id": categortia_id}), 201
-    except mysql.connector.Error as err:
+    try:
+        # Inserta el nuevo producto y obtiene su ID
+        id = get_repos().productos.crear(nombre, precio, descripcion, categortia_id)
+    except CategoriaInexistente:
+        # Devuelve un error si la categoría no existe
+        return jsonify({"error": "Categoría no encontrada"}), 404
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al crear el producto"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    # Invalida las páginas de listado que cubren el nuevo ID
+    notificar_cambio('producto', [id])
+    # Devuelve el producto creado con código 201
+    return jsonify("Producto agregado",{"id": id, "nombre": nombre, "precio": precio, "descripcion": descripcion, "categortia_id": categortia_id}), 201
 
 # Ruta para actualizar un producto existente
 @producto_bp.route('/<int:id>', methods=['PUT'])
@@ -133,62 +340,165 @@ def update_producto(id):
     if not all([nombre, precio, categortia_id]):
         # Devuelve un error si faltan campos requeridos
         return jsonify({"error": "Nombre, precio y categortia_id son requeridos"}), 400
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor
-    cursor = connection.cursor()
-    try:
-        # Verifica si la categoría existe
-        cursor.execute("SELECT id FROM categortia WHERE id = %s", (categortia_id,))
-        if not cursor.fetchone():
-            # Devuelve un error si la categoría no existe
-            return jsonify({"error": "Categoría no encontrada"}), 404
+    try:
         # Actualiza el producto en la base de datos
-        cursor.execute(
-            "UPDATE producto SET nombre = %s, precio = %s, descripcion = %s, categortia_id = %s WHERE id = %s",
-            (nombre, precio, descripcion, categortia_id, id)
-        )
-        # Confirma los cambios
-        connection.commit()
-        if cursor.rowcount:
-            # Si se actualizó, devuelve el producto actualizado
-            return jsonify("Producto actualizado",{"id": id, "nombre": nombre, "precio": precio, "descripcion": descripcion, "categortia_id": categortia_id})
-        else:
-            # Si no se encontró, devuelve un error 404
-            return jsonify({"error": "Producto no encontrado"}), 404
-    except mysql.connector.Error as err:
+        actualizado = get_repos().productos.actualizar(id, nombre, precio, descripcion, categortia_id)
+    except CategoriaInexistente:
+        # Devuelve un error si la categoría no existe
+        return jsonify({"error": "Categoría no encontrada"}), 404
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al actualizar el producto"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
+    if actualizado:
+        # Invalida el producto y las páginas de listado que lo contienen
+        notificar_cambio('producto', [id])
+        # Si se actualizó, devuelve el producto actualizado
+        return jsonify("Producto actualizado",{"id": id, "nombre": nombre, "precio": precio, "descripcion": descripcion, "categortia_id": categortia_id})
+    else:
+        # Si no se encontró, devuelve un error 404
+        return jsonify({"error": "Producto no encontrado"}), 404
 
 # Ruta para eliminar un producto
 @producto_bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()  # Protege esta ruta
 def delete_producto(id):
-    # Establece la conexión con la base de datos
-    connection = get_db_connection()
-    # Crea un cursor
-    cursor = connection.cursor()
     try:
         # Elimina el producto de la base de datos
-        cursor.execute("DELETE FROM producto WHERE id = %s", (id,))
-        # Confirma los cambios
-        connection.commit()
-        if cursor.rowcount:
-            # Si se eliminó, devuelve un mensaje de éxito
-            return jsonify({"message": "Producto eliminado"})
-        else:
-            # Si no se encontró, devuelve un error 404
-            return jsonify({"error": "Producto no encontrado"}), 404
-    except mysql.connector.Error as err:
+        eliminado = get_repos().productos.eliminar(id)
+    except RepositorioError as err:
         # Devuelve un error si falla la consulta
         return jsonify({"error": "Error al eliminar el producto"}), 500
-    finally:
-        # Cierra el cursor
-        cursor.close()
-        # Cierra la conexión
-        connection.close()
\ No newline at end of file
+    if eliminado:
+        # Invalida el producto y las páginas de listado que lo contenían
+        notificar_cambio('producto', [id])
+        # Si se eliminó, devuelve un mensaje de éxito
+        return jsonify({"message": "Producto eliminado"})
+    else:
+        # Si no se encontró, devuelve un error 404
+        return jsonify({"error": "Producto no encontrado"}), 404
+
+# Lee y valida el arreglo de una solicitud masiva; devuelve (items, error)
+def leer_lote():
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"error": "Se requiere un arreglo JSON no vacío"}), 400)
+    maximo = current_app.config['BULK_MAX_ITEMS']
+    if len(items) > maximo:
+        return None, (jsonify({"error": f"El lote admite como máximo {maximo} elementos"}), 413)
+    return items, None
+
+# Valida los campos de un producto del lote; devuelve la tupla de valores o un mensaje de error
+def validar_producto(item):
+    if not isinstance(item, dict):
+        return None, "Cada elemento debe ser un objeto"
+    nombre = item.get('nombre')
+    precio = item.get('precio')
+    descripcion = item.get('descripcion')
+    categortia_id = item.get('categortia_id')
+    if not all([nombre, precio, categortia_id]):
+        return None, "Nombre, precio y categortia_id son requeridos"
+    try:
+        # Se normaliza para compararlo con los IDs devueltos por la consulta IN
+        categortia_id = int(categortia_id)
+    except (TypeError, ValueError):
+        return None, "categortia_id debe ser un entero"
+    return (nombre, precio, descripcion, categortia_id), None
+
+# Ruta para crear varios productos en una sola transacción
+@producto_bp.route('/bulk', methods=['POST'])
+@jwt_required()  # Protege esta ruta
+def create_productos_bulk():
+    items, error = leer_lote()
+    if error:
+        return error
+    # Valida cada elemento; los inválidos se informan y no se insertan
+    resultados = [None] * len(items)
+    validos = []
+    for indice, item in enumerate(items):
+        valores, mensaje = validar_producto(item)
+        if mensaje:
+            resultados[indice] = {"indice": indice, "status": 400, "error": mensaje}
+        else:
+            validos.append((indice, valores))
+    try:
+        # Inserta los válidos en una transacción; None indica categoría inexistente
+        ids = get_repos().productos.crear_lote([valores for _, valores in validos]) if validos else []
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta; la transacción se revierte completa
+        return jsonify({"error": "Error al crear los productos"}), 500
+    creados = []
+    for (indice, _), id in zip(validos, ids):
+        if id is None:
+            resultados[indice] = {"indice": indice, "status": 404, "error": "Categoría no encontrada"}
+        else:
+            creados.append(id)
+            resultados[indice] = {"indice": indice, "status": 201, "id": id}
+    if creados:
+        notificar_cambio('producto', creados)
+    # Devuelve el resultado de cada elemento
+    return jsonify({"creados": len(creados), "errores": len(items) - len(creados), "resultados": resultados}), 200
+
+# Ruta para actualizar varios productos en una sola transacción
+@producto_bp.route('/bulk', methods=['PUT'])
+@jwt_required()  # Protege esta ruta
+def update_productos_bulk():
+    items, error = leer_lote()
+    if error:
+        return error
+    # Valida cada elemento; los inválidos se informan y no se actualizan
+    resultados = [None] * len(items)
+    validos = []
+    for indice, item in enumerate(items):
+        valores, mensaje = validar_producto(item)
+        id = item.get('id') if isinstance(item, dict) else None
+        # type() y no isinstance(): bool es subclase de int y true no es un ID
+        if not mensaje and type(id) is not int:
+            mensaje = "id es requerido"
+        if mensaje:
+            resultados[indice] = {"indice": indice, "status": 400, "error": mensaje}
+        else:
+            validos.append((indice, id, valores))
+    try:
+        # Actualiza los válidos en una transacción y obtiene el estado de cada uno
+        estados = get_repos().productos.actualizar_lote([(id, valores) for _, id, valores in validos]) if validos else []
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta; la transacción se revierte completa
+        return jsonify({"error": "Error al actualizar los productos"}), 500
+    actualizados = []
+    for (indice, id, _), estado in zip(validos, estados):
+        if estado == ACTUALIZADO:
+            actualizados.append(id)
+            resultados[indice] = {"indice": indice, "status": 200, "id": id}
+        elif estado == SIN_CATEGORIA:
+            resultados[indice] = {"indice": indice, "status": 404, "error": "Categoría no encontrada"}
+        else:
+            resultados[indice] = {"indice": indice, "status": 404, "error": "Producto no encontrado"}
+    if actualizados:
+        notificar_cambio('producto', actualizados)
+    # Devuelve el resultado de cada elemento
+    return jsonify({"actualizados": len(actualizados), "errores": len(items) - len(actualizados), "resultados": resultados}), 200
+
+# Ruta para eliminar varios productos en una sola transacción
+@producto_bp.route('/bulk', methods=['DELETE'])
+@jwt_required()  # Protege esta ruta
+def delete_productos_bulk():
+    ids, error = leer_lote()
+    if error:
+        return error
+    if not all(type(id) is int for id in ids):
+        return jsonify({"error": "Se requiere un arreglo de IDs enteros"}), 400
+    try:
+        # Elimina los productos existentes con una sola sentencia
+        existentes = get_repos().productos.eliminar_lote(ids)
+    except RepositorioError as err:
+        # Devuelve un error si falla la consulta; la transacción se revierte completa
+        return jsonify({"error": "Error al eliminar los productos"}), 500
+    if existentes:
+        notificar_cambio('producto', existentes)
+    resultados = [
+        {"indice": indice, "status": 200, "id": id} if id in existentes
+        else {"indice": indice, "status": 404, "id": id, "error": "Producto no encontrado"}
+        for indice, id in enumerate(ids)
+    ]
+    # Devuelve el resultado de cada elemento
+    return jsonify({"eliminados": len(existentes), "errores": len(ids) - sum(r["status"] == 200 for r in resultados), "resultados": resultados}), 200
@@ -0,0 +1,46 @@
+"""
+Propósito: Expone el registro de cambios del catálogo para la sincronización incremental.
+Funcionalidad: Proporciona el endpoint /changes, con el que un cliente que guarda una copia de
+productos y categorías pide solo lo que cambió desde la última secuencia que aplicó (since):
+el estado actual de cada registro creado o actualizado, lápidas de los eliminados y la nueva
+marca de agua. Responde 410 con resync_required cuando since es anterior a lo que conserva el
+registro y el cliente debe descargar el catálogo completo.
+"""
+
+from flask import Blueprint, jsonify, request
+
+from ..paginacion import ParametroInvalido, leer_entero, leer_limite
+from ..registro_cambios import ResincronizacionRequerida, get_registro_cambios
+from ..repositorios import RepositorioError
+
+# Crea el Blueprint para la sincronización
+sincronizacion_bp = Blueprint('sincronizacion', __name__)
+
+@sincronizacion_bp.route('', methods=['GET'])
+def get_cambios():
+    """
+    Obtiene los cambios posteriores a la secuencia since.
+
+    Returns:
+        JSON: changes, high_water_mark (since de la próxima solicitud) y has_more.
+    """
+    try:
+        desde = leer_entero(request.args, 'since')
+        limite = leer_limite(request.args)
+    except ParametroInvalido as err:
+        return jsonify({"error": str(err)}), 400
+    if desde is None:
+        desde = 0
+    if desde < 0:
+        return jsonify({"error": "since no puede ser negativo"}), 400
+    try:
+        resultado = get_registro_cambios().leer(desde, limite)
+    except ResincronizacionRequerida as err:
+        return jsonify({
+            "error": "since es anterior al registro conservado; descargue el catálogo completo",
+            "resync_required": True,
+            "high_water_mark": err.marca_agua,
+        }), 410
+    except RepositorioError as err:
+        return jsonify({"error": "Error al obtener los cambios"}), 500
+    return jsonify(resultado)
@@ -0,0 +1,495 @@
+"""
+Propósito: Búsqueda de texto completo en el catálogo de productos.
+Funcionalidad: Define la extensión BusquedaProductos con dos modos. En el modo 'indice' (por
+defecto) mantiene en la memoria del proceso un índice invertido del nombre y la descripción de
+los productos: se construye al iniciar y se actualiza de forma incremental con cada escritura
+notificada por cambios.notificar_cambio() y, para las de otros workers o procesos (flask
+catalog), con las entradas del registro de cambios posteriores a la última aplicada. En el modo 'fulltext' delega en el índice FULLTEXT
+de MySQL. La normalización ignora mayúsculas y acentos ("cámara" coincide con "camara"), cada
+término se compara como prefijo y los resultados se ordenan por relevancia y se paginan con un
+cursor opaco.
+"""
+
+import base64
+import binascii
+import bisect
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from flask import current_app
+
+from .paginacion import ParametroInvalido
+from .repositorios import RepositorioError
+
+logger = logging.getLogger(__name__)
+
+_PALABRA = re.compile(r'[^\W_]+')
+# Peso de cada aparición de un término según el campo
+PESO_NOMBRE = 3
+PESO_DESCRIPCION = 1
+# Factor de una coincidencia por prefijo frente a una palabra completa
+FACTOR_PREFIJO = 0.7
+# Grupos (palabra, peso) cuyo conjunto de ids se conserva para intersecciones (LRU)
+MAX_CONJUNTOS = 256
+
+
+def tokenizar(texto):
+    """
+    Divide un texto en términos en minúsculas y sin acentos.
+    """
+    if not texto:
+        return []
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return _PALABRA.findall(texto)
+
+
+def codificar_cursor(relevancia, ultimo_id):
+    """
+    Codifica la posición (relevancia, id) de la última fila devuelta como un cursor opaco.
+    """
+    crudo = json.dumps({"r": relevancia, "id": ultimo_id}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor de búsqueda.
+
+    Returns:
+        tuple[float, int]: Relevancia e ID de la última fila de la página anterior.
+
+    Raises:
+        ParametroInvalido: Si el cursor está mal formado.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        relevancia, ultimo_id = float(datos['r']), datos['id']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ParametroInvalido("Cursor inválido")
+    if type(ultimo_id) is not int:
+        raise ParametroInvalido("Cursor inválido")
+    return relevancia, ultimo_id
+
+
+class IndiceInvertido:
+    """
+    Índice invertido de productos.
+
+    Para cada término guarda el peso de cada producto (término -> {id: peso}) y, ordenadas por
+    impacto, las listas de ids de cada peso (término -> {peso: [ids ordenados]}). La búsqueda
+    recorre primero los grupos de mayor puntaje del término más selectivo y se detiene en
+    cuanto ningún producto pendiente puede entrar en la página, sin puntuar todo el catálogo.
+
+    No es seguro para múltiples hilos por sí mismo; BusquedaProductos lo protege con un lock.
+    """
+
+    def __init__(self):
+        self.terminos = {}  # término -> {id: peso}
+        self.impactos = {}  # término -> {peso: [ids ordenados]}
+        self.vocabulario = []  # términos ordenados, para buscar por prefijo
+        self.documentos = {}  # id -> términos del producto, para quitarlo al actualizar
+        self.conjuntos = OrderedDict()  # (término, peso) -> set de ids, de los grupos más usados
+
+    def agregar(self, producto):
+        """
+        Agrega o reemplaza un producto.
+        """
+        id = producto['id']
+        if id in self.documentos:
+            self.quitar(id)
+        pesos = {}
+        for termino in tokenizar(producto.get('nombre')):
+            pesos[termino] = pesos.get(termino, 0) + PESO_NOMBRE
+        for termino in tokenizar(producto.get('descripcion')):
+            pesos[termino] = pesos.get(termino, 0) + PESO_DESCRIPCION
+        for termino, peso in pesos.items():
+            lista = self.terminos.get(termino)
+            if lista is None:
+                lista = self.terminos[termino] = {}
+                self.impactos[termino] = {}
+                bisect.insort(self.vocabulario, termino)
+            lista[id] = peso
+            # Los ids nuevos son crecientes: insort casi siempre agrega al final
+            bisect.insort(self.impactos[termino].setdefault(peso, []), id)
+            self.conjuntos.pop((termino, peso), None)
+        self.documentos[id] = tuple(pesos)
+
+    def quitar(self, id):
+        """
+        Quita un producto si está en el índice.
+        """
+        for termino in self.documentos.pop(id, ()):
+            lista = self.terminos[termino]
+            peso = lista.pop(id)
+            grupos = self.impactos[termino]
+            ids = grupos[peso]
+            del ids[bisect.bisect_left(ids, id)]
+            self.conjuntos.pop((termino, peso), None)
+            if not ids:
+                del grupos[peso]
+            if not lista:
+                del self.terminos[termino]
+                del self.impactos[termino]
+                del self.vocabulario[bisect.bisect_left(self.vocabulario, termino)]
+
+    def expansiones(self, termino, max_expansiones, min_prefijo=1):
+        """
+        Palabras del índice que coinciden con el término (completo o como prefijo) y su factor.
+        Los términos más cortos que min_prefijo solo coinciden con la palabra completa.
+
+        Returns:
+            list[tuple[str, float]]: (palabra, idf multiplicado por el factor de coincidencia).
+        """
+        total = len(self.documentos) or 1
+        resultado = []
+        if len(termino) < min_prefijo:
+            max_expansiones = 1
+        inicio = bisect.bisect_left(self.vocabulario, termino)
+        for palabra in self.vocabulario[inicio:inicio + max_expansiones]:
+            if not palabra.startswith(termino) or (max_expansiones == 1 and palabra != termino):
+                break
+            idf = math.log(1 + total / len(self.terminos[palabra]))
+            resultado.append((palabra, idf * (1.0 if palabra == termino else FACTOR_PREFIJO)))
+        return resultado
+
+    def conjunto(self, palabra, peso):
+        """
+        Conjunto de ids de un grupo (palabra, peso), conservado mientras el grupo no cambie.
+        """
+        clave = (palabra, peso)
+        conjunto = self.conjuntos.get(clave)
+        if conjunto is None:
+            conjunto = self.conjuntos[clave] = set(self.impactos[palabra][peso])
+            if len(self.conjuntos) > MAX_CONJUNTOS:
+                self.conjuntos.popitem(last=False)
+        else:
+            self.conjuntos.move_to_end(clave)
+        return conjunto
+
+    def buscar(self, terminos, limite, despues, max_expansiones, min_prefijo=1):
+        """
+        Devuelve hasta limite pares (id, relevancia) que contienen todos los términos, ordenados
+        por relevancia descendente e id ascendente, después de la posición despues.
+
+        Cada término se divide en grupos (palabra, peso) con un puntaje fijo. Las combinaciones
+        de un grupo por término se recorren de mayor a menor puntaje total; los productos de
+        una combinación son la intersección de sus listas de ids. Un producto aparece por
+        primera vez en la combinación de su mejor puntaje, así que el recorrido termina en
+        cuanto se completa la página.
+        """
+        por_termino = []
+        for termino in terminos:
+            grupos = sorted(
+                ((peso * factor, palabra, peso)
+                 for palabra, factor in self.expansiones(termino, max_expansiones, min_prefijo)
+                 for peso in self.impactos[palabra]),
+                reverse=True
+            )
+            if not grupos:
+                return []
+            por_termino.append(grupos)
+        # Con prefijos un producto puede estar en varios grupos del mismo término
+        repetidos = any(len({palabra for _, palabra, _ in grupos}) > 1 for grupos in por_termino)
+
+        def puntaje(combinacion):
+            return sum(por_termino[i][j][0] for i, j in enumerate(combinacion))
+
+        def interseccion(combinacion):
+            grupos = [por_termino[i][j][1:] for i, j in enumerate(combinacion)]
+            if len(grupos) == 1:
+                palabra, peso = grupos[0]
+                return self.impactos[palabra][peso]
+            # Se parte del grupo más pequeño: cada intersección cuesta lo que el menor conjunto
+            grupos.sort(key=lambda g: len(self.impactos[g[0]][g[1]]))
+            resultado = self.conjunto(*grupos[0])
+            for grupo in grupos[1:]:
+                resultado = resultado & self.conjunto(*grupo)
+                if not resultado:
+                    break
+            return resultado
+
+        inicial = (0,) * len(por_termino)
+        pendientes = [(-puntaje(inicial), inicial)]
+        visitadas = {inicial}
+        vistos = set()
+        resultados = []
+        while pendientes:
+            # Toma todas las combinaciones con la misma relevancia (redondeada)
+            total = round(-pendientes[0][0], 6)
+            nivel = []
+            while pendientes and round(-pendientes[0][0], 6) == total:
+                _, combinacion = heapq.heappop(pendientes)
+                nivel.append(combinacion)
+                for i in range(len(combinacion)):
+                    if combinacion[i] + 1 < len(por_termino[i]):
+                        siguiente = combinacion[:i] + (combinacion[i] + 1,) + combinacion[i + 1:]
+                        if siguiente not in visitadas:
+                            visitadas.add(siguiente)
+                            heapq.heappush(pendientes, (-puntaje(siguiente), siguiente))
+            anterior = despues is not None and total > despues[0]
+            if anterior and not repetidos:
+                # Nivel ya devuelto en páginas anteriores
+                continue
+            if len(nivel) == 1 and not repetidos:
+                ids = interseccion(nivel[0])
+                # Un solo grupo ya es una lista ordenada: no se copia
+                ids = ids if isinstance(ids, list) else sorted(ids)
+            else:
+                ids = set()
+                for combinacion in nivel:
+                    ids.update(interseccion(combinacion))
+                if repetidos:
+                    ids -= vistos
+                    vistos.update(ids)
+                if anterior:
+                    continue
+                ids = sorted(ids)
+            if despues is not None and total == despues[0]:
+                ids = ids[bisect.bisect_right(ids, despues[1]):]
+            for producto in ids[:limite - len(resultados)]:
+                resultados.append((producto, total))
+            if len(resultados) == limite:
+                break
+        return resultados
+
+
+class BusquedaProductos:
+    """
+    Extensión de Flask con la búsqueda de productos.
+
+    En el modo 'indice' cada worker tiene su propio índice. Las escrituras del propio worker
+    se aplican al momento; si el contador de versión compartido revela escrituras de otro
+    worker, se leen las entradas del registro de cambios posteriores a la última secuencia
+    aplicada y se vuelven a leer solo esos productos. El índice se reconstruye en segundo plano
+    (como mucho una vez cada SEARCH_REBUILD_INTERVAL segundos, mientras se sigue respondiendo
+    con el anterior) solo si esas entradas ya se compactaron o la construcción falló.
+    """
+
+    def __init__(self, app=None):
+        self.modo = 'indice'
+        self.max_expansiones = 50
+        self.min_prefijo = 2
+        self.intervalo = 30.0
+        self.tamano_lote = 1000
+        self._repos = None
+        self._versiones = None
+        self._indice = None
+        self._lock = threading.Lock()
+        self._primera_construccion = threading.Lock()
+        self._sincronizacion = threading.Lock()
+        self._construyendo = False
+        self._desfasado = False
+        self._visto = None  # versión de la tabla producto que refleja el índice
+        self._seq = 0  # última secuencia del registro de cambios que refleja el índice
+        self._ultima_construccion = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.modo = config['SEARCH_BACKEND']
+        if self.modo not in ('indice', 'fulltext'):
+            raise ValueError(f"SEARCH_BACKEND desconocido: {self.modo}")
+        if self.modo == 'fulltext' and config['REPOSITORY_BACKEND'] != 'mysql':
+            raise ValueError("SEARCH_BACKEND = 'fulltext' requiere REPOSITORY_BACKEND = 'mysql'")
+        self.max_expansiones = config['SEARCH_MAX_EXPANSIONS']
+        self.min_prefijo = config['SEARCH_MIN_PREFIX']
+        self.intervalo = config['SEARCH_REBUILD_INTERVAL']
+        self.tamano_lote = config['EXPORT_CHUNK_SIZE']
+        # Requiere que Repositorios y VersionesTablas se hayan inicializado antes
+        self._repos = app.extensions['repositorios']
+        self._versiones = app.extensions['versiones']
+        # La instancia es global: una aplicación nueva no hereda el índice de otra base
+        with self._lock:
+            self._indice = None
+            self._visto = None
+            self._seq = 0
+        app.extensions['busqueda'] = self
+        if self.modo == 'indice' and config['SEARCH_INDEX_PRELOAD']:
+            # Construido antes del fork (gunicorn --preload), los workers heredan el índice
+            try:
+                self._construir()
+            except RepositorioError as err:
+                logger.warning("No se pudo construir el índice de búsqueda al iniciar: %s", err)
+
+    def buscar(self, terminos, limite, despues=None):
+        """
+        Busca productos que contengan todos los términos (como prefijo).
+
+        Args:
+            terminos (list[str]): Términos ya normalizados con tokenizar().
+            limite (int): Tamaño de la página.
+            despues (tuple | None): Posición decodificada del cursor.
+
+        Returns:
+            dict: {"data": productos con su relevancia, "next_cursor": cursor o None}.
+        """
+        if self.modo == 'fulltext':
+            filas = self._repos.productos.buscar(terminos, limite + 1, despues)
+        else:
+            filas = self._buscar_indice(terminos, limite + 1, despues)
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = codificar_cursor(filas[-1]['relevancia'], filas[-1]['id'])
+        return {"data": filas, "next_cursor": siguiente}
+
+    def actualizar(self, ids, versiones):
+        """
+        Aplica al índice una escritura confirmada sobre productos.
+
+        Args:
+            ids (iterable[int]): IDs creados, actualizados o eliminados.
+            versiones (tuple[int, int]): Versión de la tabla producto antes y después.
+        """
+        if self.modo != 'indice' or self._indice is None:
+            return
+        ids = list(ids)
+        anterior, nueva = versiones
+        try:
+            productos = self._repos.productos.obtener_varios(ids)
+        except RepositorioError as err:
+            # La escritura ya se confirmó: se aplicará desde el registro de cambios en la
+            # siguiente búsqueda en lugar de fallar la solicitud
+            logger.warning("No se pudo actualizar el índice de búsqueda: %s", err)
+            return
+        with self._lock:
+            indice = self._indice
+            self._aplicar_en(indice, ids, productos)
+            # Sin escrituras de otros workers en medio, el índice sigue al día; si las hubo,
+            # _sincronizar() las leerá del registro (junto con esta, que se aplica de nuevo)
+            if self._visto == anterior:
+                self._visto = nueva
+
+    def _buscar_indice(self, terminos, limite, despues):
+        if self._indice is None:
+            # Primera búsqueda del worker sin índice precargado: las demás esperan a que termine
+            with self._primera_construccion:
+                if self._indice is None:
+                    self._construir()
+        self._sincronizar()
+        with self._lock:
+            pares = self._indice.buscar(terminos, limite, despues, self.max_expansiones, self.min_prefijo)
+        if not pares:
+            return []
+        # El índice solo guarda términos: las filas se leen por clave primaria
+        filas = {fila['id']: fila for fila in self._repos.productos.obtener_varios([id for id, _ in pares])}
+        return [dict(filas[id], relevancia=relevancia) for id, relevancia in pares if id in filas]
+
+    def _sincronizar(self):
+        # Si otro worker escribió en la tabla, se aplican sus cambios; una sola solicitud a la
+        # vez los lee y las demás responden con el índice tal como está
+        actual = self._versiones.leer('producto')
+        if actual != self._visto and not self._desfasado and self._sincronizacion.acquire(blocking=False):
+            try:
+                self._aplicar_registro(actual)
+            except RepositorioError as err:
+                logger.warning("No se pudieron leer los cambios para el índice de búsqueda: %s", err)
+            finally:
+                self._sincronizacion.release()
+        with self._lock:
+            reconstruir = (
+                self._desfasado and not self._construyendo
+                and time.monotonic() - self._ultima_construccion >= self.intervalo
+            )
+            if reconstruir:
+                self._construyendo = True
+        if reconstruir:
+            threading.Thread(target=self._construir, args=(True,), daemon=True).start()
+
+    def _aplicar_registro(self, actual):
+        # Aplica las entradas del registro posteriores a self._seq; actual es la versión de la
+        # tabla leída antes que ellas, que el índice refleja al terminar
+        with self._lock:
+            indice, seq = self._indice, self._seq
+        while True:
+            filas = self._repos.cambios.leer(seq, self.tamano_lote)
+            # El horizonte se lee después de las entradas, como en RegistroCambios.leer()
+            horizonte = self._repos.cambios.limites()[0]
+            if seq < horizonte:
+                # Las entradas posteriores a seq ya se compactaron: solo queda reconstruir
+                with self._lock:
+                    if self._indice is indice:
+                        self._desfasado = True
+                return
+            ids = {fila['registro_id'] for fila in filas if fila['tabla'] == 'producto'}
+            productos = self._repos.productos.obtener_varios(ids) if ids else []
+            with self._lock:
+                if self._indice is not indice:
+                    # Una reconstrucción reemplazó el índice mientras se leían los cambios
+                    return
+                self._aplicar_en(indice, ids, productos)
+                if filas:
+                    seq = self._seq = filas[-1]['seq']
+                if len(filas) < self.tamano_lote:
+                    self._visto = actual
+                    return
+
+    def _construir(self, en_segundo_plano=False):
+        with self._lock:
+            self._desfasado = False
+        inicio = time.monotonic()
+        try:
+            # El índice refleja al menos las escrituras anteriores a esta versión y secuencia; las
+            # posteriores (de este worker o de otros) se aplican desde el registro de cambios
+            visto = self._versiones.leer('producto')
+            seq = self._repos.cambios.limites()[1]
+            indice = IndiceInvertido()
+            for lote in self._repos.productos.iterar(self.tamano_lote):
+                for producto in lote:
+                    indice.agregar(producto)
+        except RepositorioError as err:
+            with self._lock:
+                self._desfasado = True
+                self._construyendo = False
+                self._ultima_construccion = time.monotonic()
+            if not en_segundo_plano:
+                raise
+            logger.warning("No se pudo reconstruir el índice de búsqueda: %s", err)
+            return
+        with self._lock:
+            self._indice = indice
+            self._visto = visto
+            self._seq = seq
+            self._construyendo = False
+            self._ultima_construccion = time.monotonic()
+        logger.info("Índice de búsqueda construido: %d productos en %.2f s",
+                    len(indice.documentos), time.monotonic() - inicio)
+
+    @staticmethod
+    def _aplicar_en(indice, ids, productos):
+        # Debe llamarse con el lock tomado
+        for id in ids:
+            indice.quitar(id)
+        for producto in productos:
+            indice.agregar(producto)
+
+    def estadisticas(self):
+        """
+        Devuelve el tamaño y el estado del índice.
+        """
+        with self._lock:
+            indice = self._indice
+            return {
+                "modo": self.modo,
+                "productos": len(indice.documentos) if indice else 0,
+                "terminos": len(indice.terminos) if indice else 0,
+                "desfasado": self._desfasado,
+                "construyendo": self._construyendo,
+            }
+
+
+def get_busqueda():
+    """
+    Devuelve la búsqueda de productos de la aplicación actual.
+    """
+    return current_app.extensions['busqueda']
@@ -0,0 +1,310 @@
+"""
+Propósito: Caché de lectura (read-through) para las consultas de productos y categorías.
+Funcionalidad: Define la interfaz BackendCache para almacenes intercambiables, una
+implementación en memoria del proceso con expiración por TTL y desalojo LRU (la opción por
+defecto) y la extensión CacheCatalogo, que los Blueprints usan para leer y guardar entradas e
+invalidar con precisión: al escribir un registro se eliminan su entrada individual y solo las
+páginas de listado cuyo rango de ids lo contiene. Las escrituras hechas por otros workers se
+detectan con los contadores de versión compartidos (versiones.py) y vacían la caché local.
+Lleva contadores de aciertos, fallos y desalojos.
+"""
+
+import bisect
+import importlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class BackendCache:
+    """
+    Interfaz de un almacén de caché.
+
+    Un backend compartido (por ejemplo, Redis) implementa estos mismos métodos y se
+    selecciona con CACHE_BACKEND = 'modulo:Clase'. Las páginas de listado se guardan junto con
+    el rango de ids que cubren para que claves_en_rango() pueda encontrarlas al invalidar.
+    """
+
+    def get(self, clave):
+        """
+        Devuelve el valor guardado o None si no existe o expiró.
+        """
+        raise NotImplementedError
+
+    def set(self, clave, valor, rango=None):
+        """
+        Guarda un valor. rango = (tabla, desde, hasta) marca la entrada como página de listado
+        que cubre los ids de desde a hasta (None indica un extremo abierto).
+        """
+        raise NotImplementedError
+
+    def delete_many(self, claves):
+        """
+        Elimina las claves indicadas si existen.
+        """
+        raise NotImplementedError
+
+    def claves_en_rango(self, tabla, ids):
+        """
+        Devuelve las claves de las páginas de la tabla cuyo rango contiene alguno de los ids.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Elimina todas las entradas.
+        """
+        raise NotImplementedError
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores del backend.
+        """
+        raise NotImplementedError
+
+
+class CacheMemoria(BackendCache):
+    """
+    Caché en memoria del proceso con TTL y desalojo LRU, segura para múltiples hilos.
+
+    Args:
+        max_entradas (int): Número máximo de entradas antes de desalojar la menos usada.
+        ttl (float): Segundos de vida de cada entrada.
+    """
+
+    def __init__(self, max_entradas=1024, ttl=60.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # clave -> (expira, valor)
+        self._rangos = {}  # tabla -> {clave: (desde, hasta)}
+        self._aciertos = 0
+        self._fallos = 0
+        self._desalojos = 0
+        self._expiraciones = 0
+        self._invalidaciones = 0
+
+    def get(self, clave):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+            if entrada[0] <= ahora:
+                self._quitar(clave)
+                self._expiraciones += 1
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self._aciertos += 1
+            return entrada[1]
+
+    def set(self, clave, valor, rango=None):
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (time.monotonic() + self.ttl, valor)
+            if rango is not None:
+                tabla, desde, hasta = rango
+                self._rangos.setdefault(tabla, {})[clave] = (desde, hasta)
+            # Desaloja las entradas menos usadas recientemente
+            while len(self._entradas) > self.max_entradas:
+                self._quitar(next(iter(self._entradas)))
+                self._desalojos += 1
+
+    def delete_many(self, claves):
+        with self._lock:
+            for clave in claves:
+                if clave in self._entradas:
+                    self._quitar(clave)
+                    self._invalidaciones += 1
+
+    def claves_en_rango(self, tabla, ids):
+        ids = sorted(ids)
+        with self._lock:
+            rangos = list(self._rangos.get(tabla, {}).items())
+        claves = []
+        for clave, (desde, hasta) in rangos:
+            # Primer id mayor o igual que el inicio del rango; basta ver si no pasa del final
+            i = 0 if desde is None else bisect.bisect_left(ids, desde)
+            if i < len(ids) and (hasta is None or ids[i] <= hasta):
+                claves.append(clave)
+        return claves
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._rangos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "desalojos": self._desalojos,
+                "expiraciones": self._expiraciones,
+                "invalidaciones": self._invalidaciones,
+            }
+
+    def _quitar(self, clave):
+        # Debe llamarse con el lock tomado
+        del self._entradas[clave]
+        for rangos in self._rangos.values():
+            rangos.pop(clave, None)
+
+
+class CacheCatalogo:
+    """
+    Extensión de Flask con la caché de lectura del catálogo.
+
+    Cada tabla tiene una generación que aumenta en cada invalidación: una lectura que empezó
+    antes de una escritura no guarda su resultado, evitando reintroducir datos viejos.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.activa = False
+        self._versiones = None
+        self._vistas = {}
+        self._generaciones = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.activa = config['CACHE_ENABLED']
+        nombre = config['CACHE_BACKEND']
+        if nombre == 'memoria':
+            self.backend = CacheMemoria(config['CACHE_MAX_ENTRIES'], config['CACHE_TTL'])
+        else:
+            # Backend externo indicado como 'paquete.modulo:Clase'; recibe la configuración
+            modulo, _, clase = nombre.partition(':')
+            self.backend = getattr(importlib.import_module(modulo), clase)(config)
+        # Requiere que VersionesTablas se haya inicializado antes
+        self._versiones = app.extensions['versiones']
+        app.extensions['cache'] = self
+
+    def generacion(self, tabla):
+        """
+        Devuelve la generación actual de la tabla; se pasa a guardar() tras leer de la base.
+        """
+        return self._generaciones.get(tabla, 0)
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor cacheado o None si no está (o si la caché está desactivada).
+        """
+        if not self.activa:
+            return None
+        self._sincronizar(clave.split(':', 1)[0])
+        return self.backend.get(clave)
+
+    def guardar(self, clave, valor, generacion, rango=None):
+        """
+        Guarda un valor leído de la base si la tabla no se modificó durante la lectura.
+
+        Args:
+            clave (str): Clave de la entrada.
+            valor: Valor a guardar.
+            generacion (tuple[str, int]): Tabla y generación obtenida antes de leer.
+            rango (tuple | None): (tabla, desde, hasta) si la entrada es una página de listado.
+        """
+        if not self.activa:
+            return
+        tabla, numero = generacion
+        if self.generacion(tabla) != numero:
+            return
+        self.backend.set(clave, valor, rango)
+
+    def obtener_item(self, tabla, id, campos=None):
+        """
+        Devuelve un registro cacheado; si se piden campos y solo está el registro completo, lo
+        proyecta a esas columnas sin ir a la base.
+        """
+        valor = self.obtener(clave_item(tabla, id, campos))
+        if valor is None and campos:
+            completo = self.obtener(clave_item(tabla, id))
+            if completo is not None:
+                valor = {campo: completo[campo] for campo in campos}
+        return valor
+
+    def guardar_item(self, tabla, id, campos, valor, generacion):
+        """
+        Guarda un registro leído de la base. Las proyecciones (campos) se guardan con el rango
+        (id, id), para que invalidar() las encuentre junto con las páginas que contienen el id.
+        """
+        if campos:
+            self.guardar(clave_item(tabla, id, campos), valor, generacion, (tabla, id, id))
+        else:
+            self.guardar(clave_item(tabla, id), valor, generacion)
+
+    def invalidar(self, tabla, ids, versiones):
+        """
+        Elimina las entradas individuales de los ids y las páginas de listado que los cubren.
+
+        Args:
+            tabla (str): 'producto' o 'categoria'.
+            ids (iterable[int]): IDs escritos (creados, actualizados o eliminados).
+            versiones (tuple[int, int]): Versión de la tabla antes y después de la escritura.
+        """
+        ids = list(ids)
+        with self._lock:
+            self._generaciones[tabla] = self._generaciones.get(tabla, 0) + 1
+        self._sincronizar(tabla, *versiones)
+        if not self.activa or not ids:
+            return
+        claves = [clave_item(tabla, id) for id in ids]
+        claves.extend(self.backend.claves_en_rango(tabla, ids))
+        self.backend.delete_many(claves)
+
+    def _sincronizar(self, tabla, anterior=None, nueva=None):
+        # Si la versión compartida avanzó sin que este proceso escribiera, otro worker
+        # modificó la tabla: se vacía la caché local porque no se sabe qué registros cambiaron
+        if anterior is None:
+            anterior = nueva = self._versiones.leer(tabla)
+        with self._lock:
+            vista = self._vistas.get(tabla)
+            self._vistas[tabla] = nueva
+            if vista is None or vista == anterior:
+                return
+            for nombre in list(self._generaciones):
+                self._generaciones[nombre] += 1
+            self._generaciones[tabla] = self._generaciones.get(tabla, 0) + 1
+        self.backend.clear()
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de aciertos, fallos y desalojos del backend.
+        """
+        return dict(self.backend.estadisticas(), activa=self.activa)
+
+
+def clave_item(tabla, id, campos=None):
+    """
+    Clave de la entrada individual de un registro, o de su proyección a las columnas de campos.
+    """
+    if campos:
+        return f"{tabla}:{id}:" + ",".join(campos)
+    return f"{tabla}:{id}"
+
+
+def clave_listado(tabla, args):
+    """
+    Clave de una página de listado a partir de los parámetros de consulta en orden canónico.
+    """
+    return f"{tabla}:lista:" + "&".join(f"{k}={v}" for k, v in sorted(args.items(multi=True)))
+
+
+def get_cache():
+    """
+    Devuelve la caché del catálogo de la aplicación actual.
+    """
+    return current_app.extensions['cache']
@@ -0,0 +1,29 @@
+"""
+Propósito: Punto único de notificación de escrituras sobre el catálogo.
+Funcionalidad: Define notificar_cambio(), que los manejadores de escritura llaman después de
+confirmar (commit) una transacción. Incrementa el contador de versión compartido de la tabla
+(usado por los ETags), invalida en la caché de lectura los registros escritos y las páginas
+de listado que los contienen y actualiza el índice de búsqueda y las estadísticas por categoría
+de los productos.
+"""
+
+from .busqueda import get_busqueda
+from .cache import get_cache
+from .estadisticas import get_estadisticas
+from .versiones import get_versiones
+
+
+def notificar_cambio(tabla, ids):
+    """
+    Propaga una escritura confirmada a las estructuras derivadas del catálogo.
+
+    Args:
+        tabla (str): 'producto', 'categoria' o 'usuario'.
+        ids (iterable[int]): IDs creados, actualizados o eliminados.
+    """
+    versiones = get_versiones().incrementar(tabla)
+    if tabla in ('producto', 'categoria'):
+        get_cache().invalidar(tabla, ids, versiones)
+    if tabla == 'producto':
+        get_busqueda().actualizar(ids, versiones)
+        get_estadisticas().actualizar(ids, versiones)
@@ -0,0 +1,328 @@
+"""
+Propósito: Comandos de línea de órdenes (flask catalog) para cargar y descargar el catálogo.
+Funcionalidad: Define el grupo catalogo_cli, que create_app() registra en app.cli, con los
+comandos import y export. La importación lee archivos CSV o NDJSON de cualquier tamaño registro
+por registro, resuelve los nombres de categoría con un mapa cargado una sola vez, inserta en
+lotes de IMPORT_CHUNK_SIZE filas por transacción (executemany, o LOAD DATA LOCAL INFILE si
+MYSQL_LOCAL_INFILE está habilitado) y guarda en la misma transacción cuántos registros del
+archivo procesó, de modo que una importación interrumpida continúa desde el último lote
+confirmado. La exportación recorre la tabla en lotes con memoria constante. Ambos informan el
+avance en filas por segundo.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from .repositorios import COLUMNAS_CATEGORIA, COLUMNAS_PRODUCTO, RepositorioError, get_repos
+from .versiones import get_versiones
+
+# Grupo de comandos flask catalog
+catalogo_cli = AppGroup('catalog', help="Importación y exportación masiva del catálogo.")
+
+# Tabla de cada opción --tabla y nombre de su contador de versión
+TABLAS = {'productos': 'producto', 'categorias': 'categoria'}
+
+# Errores de registros rechazados que se muestran antes de resumir el resto
+MAX_ERRORES_MOSTRADOS = 20
+
+# Límites de las columnas de tienda_online.sql: nombre varchar(50) y precio decimal(8,2)
+MAX_NOMBRE = 50
+MAX_PRECIO = Decimal('999999.99')
+_CENTAVOS = Decimal('0.01')
+
+# Bytes del comienzo del archivo que forman parte de la clave de importación
+BLOQUE_CLAVE = 64 * 1024
+
+
+class RegistroInvalido(ValueError):
+    """
+    Registro del archivo que no se puede importar; se informa y se omite.
+    """
+
+
+class Avance:
+    """
+    Informa el avance de un comando en filas por segundo, como mucho una vez por segundo.
+    """
+
+    def __init__(self, accion):
+        self.accion = accion
+        self.filas = 0
+        self._inicio = time.monotonic()
+        self._ultimo = self._inicio
+
+    def sumar(self, filas):
+        self.filas += filas
+        ahora = time.monotonic()
+        if ahora - self._ultimo >= 1.0:
+            self._ultimo = ahora
+            click.echo(f"{self.filas} filas {self.accion} ({self.tasa():.0f} filas/s)", err=True)
+
+    def tasa(self):
+        return self.filas / max(time.monotonic() - self._inicio, 1e-9)
+
+    def terminar(self):
+        segundos = time.monotonic() - self._inicio
+        click.echo(f"{self.filas} filas {self.accion} en {segundos:.1f} s ({self.tasa():.0f} filas/s)", err=True)
+
+
+def formato_de(ruta, formato):
+    """
+    Devuelve el formato indicado o el que corresponde a la extensión del archivo.
+    """
+    if formato:
+        return formato
+    if ruta.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if ruta.lower().endswith('.csv'):
+        return 'csv'
+    raise click.UsageError("No se reconoce el formato por la extensión; indique --formato csv o ndjson")
+
+
+def leer_registros(archivo, formato):
+    """
+    Recorre los registros de un archivo CSV (con encabezado) o NDJSON como diccionarios.
+    """
+    if formato == 'csv':
+        yield from csv.DictReader(archivo)
+        return
+    for numero, linea in enumerate(archivo, 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError:
+            raise click.ClickException(f"Línea {numero}: JSON inválido")
+        if not isinstance(registro, dict):
+            raise click.ClickException(f"Línea {numero}: se esperaba un objeto JSON")
+        yield registro
+
+
+def clave_importacion(ruta, tabla):
+    """
+    Identifica una importación por archivo y tabla, para reanudarla. Del archivo se toman la ruta
+    absoluta, el tamaño, la fecha de modificación y el hash de su primer bloque: otro archivo
+    guardado con la misma ruta y el mismo tamaño empieza desde el principio.
+    """
+    estado = os.stat(ruta)
+    clave = hashlib.blake2b(digest_size=16)
+    clave.update(f"{os.path.abspath(ruta)}\0{estado.st_size}\0{estado.st_mtime_ns}\0{tabla}\0".encode('utf-8'))
+    with open(ruta, 'rb') as archivo:
+        clave.update(archivo.read(BLOQUE_CLAVE))
+    return clave.hexdigest()
+
+
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _nombre(registro, campo):
+    nombre = _texto(registro, campo)
+    if nombre is not None and len(nombre) > MAX_NOMBRE:
+        raise RegistroInvalido(f"{campo} de más de {MAX_NOMBRE} caracteres")
+    return nombre
+
+
+class ConversorProductos:
+    """
+    Convierte registros en filas de producto, resolviendo la categoría por ID (categortia_id) o
+    por nombre (categoria) con el mapa de categorías cargado al empezar.
+
+    Args:
+        repos (ConjuntoRepositorios): Repositorios de la aplicación.
+        crear_categorias (bool): Crea las categorías que no existen en lugar de rechazar el registro.
+    """
+
+    def __init__(self, repos, crear_categorias=False):
+        self.repos = repos
+        self.crear_categorias = crear_categorias
+        self.ids = set()
+        self.por_nombre = {}
+        for lote in repos.categorias.iterar(current_app.config['EXPORT_CHUNK_SIZE']):
+            for fila in lote:
+                self.ids.add(fila['id'])
+                # Si un nombre se repite, queda la categoría más antigua
+                self.por_nombre.setdefault(fila['nombre'], fila['id'])
+        self.creadas = 0
+
+    def convertir(self, registro):
+        nombre = _nombre(registro, 'nombre')
+        if nombre is None:
+            raise RegistroInvalido("falta nombre")
+        precio = _texto(registro, 'precio')
+        if precio is not None:
+            try:
+                precio = Decimal(precio)
+            except InvalidOperation:
+                raise RegistroInvalido(f"precio inválido: {precio}")
+            if not precio.is_finite():
+                raise RegistroInvalido("precio inválido")
+            # Fuera de rango se rechaza el registro en lugar de hacer fallar el lote completo;
+            # dentro, se redondea a centavos como lo guarda la columna
+            if abs(precio) > MAX_PRECIO:
+                raise RegistroInvalido(f"precio fuera de rango: {precio}")
+            precio = precio.quantize(_CENTAVOS, rounding=ROUND_HALF_UP)
+        return nombre, precio, _texto(registro, 'descripcion'), self._categoria(registro)
+
+    def _categoria(self, registro):
+        id = _texto(registro, 'categortia_id')
+        if id is not None:
+            try:
+                id = int(id)
+            except ValueError:
+                raise RegistroInvalido(f"categortia_id inválido: {id}")
+            if id not in self.ids:
+                raise RegistroInvalido(f"la categoría {id} no existe")
+            return id
+        nombre = _nombre(registro, 'categoria')
+        if nombre is None:
+            raise RegistroInvalido("falta categortia_id o categoria")
+        id = self.por_nombre.get(nombre)
+        if id is None:
+            if not self.crear_categorias:
+                raise RegistroInvalido(f"la categoría '{nombre}' no existe")
+            id = self.repos.categorias.crear(nombre)
+            get_versiones().incrementar('categoria')
+            self.por_nombre[nombre] = id
+            self.ids.add(id)
+            self.creadas += 1
+        return id
+
+
+def convertir_categoria(registro):
+    """
+    Convierte un registro en el nombre de una categoría.
+    """
+    nombre = _nombre(registro, 'nombre')
+    if nombre is None:
+        raise RegistroInvalido("falta nombre")
+    return nombre
+
+
+@catalogo_cli.command('import')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--tabla', type=click.Choice(sorted(TABLAS)), default='productos', show_default=True)
+@click.option('--formato', type=click.Choice(['csv', 'ndjson']), help="Por defecto, según la extensión.")
+@click.option('--lote', type=click.IntRange(min=1), help="Filas por transacción (IMPORT_CHUNK_SIZE).")
+@click.option('--reanudar/--desde-el-principio', default=True, show_default=True,
+              help="Continúa desde el último lote confirmado de una importación anterior del mismo archivo.")
+@click.option('--crear-categorias', is_flag=True, help="Crea las categorías nombradas que no existen.")
+def importar(archivo, tabla, formato, lote, reanudar, crear_categorias):
+    """
+    Importa productos o categorías desde un archivo CSV o NDJSON.
+
+    Los productos indican su categoría con categortia_id o con el nombre en la columna categoria.
+    """
+    formato = formato_de(archivo, formato)
+    lote = lote or current_app.config['IMPORT_CHUNK_SIZE']
+    repos = get_repos()
+    repo = repos.productos if tabla == 'productos' else repos.categorias
+    clave = clave_importacion(archivo, tabla)
+    try:
+        omitir = repos.importaciones.progreso(clave) if reanudar else 0
+        conversor = ConversorProductos(repos, crear_categorias) if tabla == 'productos' else None
+    except RepositorioError as err:
+        raise click.ClickException(f"Error de la base de datos: {err}")
+    if omitir:
+        click.echo(f"Reanudando después de {omitir} registros ya importados", err=True)
+    avance = Avance('importadas')
+    convertir = conversor.convertir if conversor is not None else convertir_categoria
+    rechazados = 0
+    procesados = confirmados = omitir
+    filas = []
+    with open(archivo, newline='', encoding='utf-8-sig') as entrada:
+        for numero, registro in enumerate(leer_registros(entrada, formato), 1):
+            if numero <= omitir:
+                continue
+            procesados = numero
+            try:
+                filas.append(convertir(registro))
+            except RegistroInvalido as err:
+                rechazados += 1
+                if rechazados <= MAX_ERRORES_MOSTRADOS:
+                    click.echo(f"Registro {procesados} omitido: {err}", err=True)
+            except RepositorioError as err:
+                raise click.ClickException(f"Error de la base de datos en el registro {procesados}: {err}")
+            if len(filas) >= lote:
+                _confirmar(repo, tabla, filas, clave, procesados, avance)
+                filas, confirmados = [], procesados
+        if procesados > confirmados:
+            # Último lote (o solo el progreso, si todos sus registros se rechazaron)
+            _confirmar(repo, tabla, filas, clave, procesados, avance)
+    avance.terminar()
+    if conversor is not None and conversor.creadas:
+        click.echo(f"{conversor.creadas} categorías creadas", err=True)
+    if rechazados:
+        click.echo(f"{rechazados} registros omitidos", err=True)
+
+
+def _confirmar(repo, tabla, filas, clave, procesados, avance):
+    try:
+        repo.importar(filas, (clave, procesados))
+    except RepositorioError as err:
+        raise click.ClickException(
+            f"Error de la base de datos; se puede reanudar con el mismo comando: {err}"
+        )
+    # Los workers detectan la escritura con el contador compartido (caché, ETags, búsqueda,
+    # estadísticas y /productos/stream)
+    if filas:
+        get_versiones().incrementar(TABLAS[tabla])
+    avance.sumar(len(filas))
+
+
+@catalogo_cli.command('export')
+@click.argument('archivo', type=click.Path(dir_okay=False, writable=True, allow_dash=True))
+@click.option('--tabla', type=click.Choice(sorted(TABLAS)), default='productos', show_default=True)
+@click.option('--formato', type=click.Choice(['csv', 'ndjson']), help="Por defecto, según la extensión.")
+@click.option('--categoria-por-nombre', is_flag=True,
+              help="Escribe el nombre de la categoría (columna categoria) en lugar de categortia_id.")
+def exportar(archivo, tabla, formato, categoria_por_nombre):
+    """
+    Exporta productos o categorías a un archivo CSV o NDJSON ('-' para la salida estándar).
+    """
+    formato = formato_de(archivo, formato) if archivo != '-' or formato else 'ndjson'
+    repos = get_repos()
+    columnas = list(COLUMNAS_PRODUCTO if tabla == 'productos' else COLUMNAS_CATEGORIA)
+    nombres = None
+    if tabla == 'productos' and categoria_por_nombre:
+        columnas[columnas.index('categortia_id')] = 'categoria'
+        nombres = {
+            fila['id']: fila['nombre']
+            for lote in repos.categorias.iterar(current_app.config['EXPORT_CHUNK_SIZE']) for fila in lote
+        }
+    repo = repos.productos if tabla == 'productos' else repos.categorias
+    dumps = current_app.json.dumps
+    avance = Avance('exportadas')
+    salida = sys.stdout if archivo == '-' else open(archivo, 'w', newline='', encoding='utf-8')
+    try:
+        escritor = csv.DictWriter(salida, columnas, extrasaction='ignore') if formato == 'csv' else None
+        if escritor is not None:
+            escritor.writeheader()
+        for filas in repo.iterar(current_app.config['EXPORT_CHUNK_SIZE']):
+            if nombres is not None:
+                for fila in filas:
+                    fila['categoria'] = nombres.get(fila.pop('categortia_id'))
+            if escritor is not None:
+                escritor.writerows(filas)
+            else:
+                salida.write(''.join(dumps(fila) + '\n' for fila in filas))
+            avance.sumar(len(filas))
+    except RepositorioError as err:
+        raise click.ClickException(f"Error de la base de datos: {err}")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    avance.terminar()
@@ -0,0 +1,175 @@
+"""
+Propósito: Compresión de las respuestas de toda la aplicación.
+Funcionalidad: Define la extensión Compresion, que registra en create_app() un hook after_request
+que comprime con gzip (o brotli, si el paquete está instalado y el cliente lo acepta) las
+respuestas de texto y JSON que superan COMPRESS_MIN_SIZE bytes, con niveles configurables. Los
+bytes comprimidos de las respuestas GET con ETag se guardan en una caché LRU limitada por tamaño:
+el ETag ya identifica la versión de los datos, así que las páginas más pedidas se comprimen una
+sola vez por versión. También ofrece la negociación de Accept-Encoding y la compresión que usa la
+documentación precomprimida (documentos.py).
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+# Codificaciones en orden de preferencia cuando el cliente acepta varias con la misma calidad
+PREFERENCIA = ('br', 'gzip', 'identity')
+
+
+def codificaciones_disponibles():
+    """
+    Devuelve las codificaciones que puede producir este proceso.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def comprimir(datos, codificacion, nivel):
+    """
+    Comprime los bytes con gzip o brotli.
+
+    Args:
+        datos (bytes): Contenido sin comprimir.
+        codificacion (str): 'gzip' o 'br'.
+        nivel (int): Nivel de gzip (1-9) o calidad de brotli (0-11).
+    """
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=nivel)
+    # mtime=0 hace que el resultado no dependa del momento de la compresión
+    return gzip.compress(datos, compresslevel=nivel, mtime=0)
+
+
+def negociar_codificacion(disponibles):
+    """
+    Elige, entre las codificaciones disponibles, la aceptada con mayor calidad según
+    Accept-Encoding; en empate, la de PREFERENCIA. Sin Accept-Encoding devuelve 'identity'.
+    """
+    aceptadas = request.accept_encodings
+    mejor, calidad_mejor = 'identity', 0
+    for codificacion in PREFERENCIA:
+        if codificacion != 'identity' and codificacion not in disponibles:
+            continue
+        calidad = 1 if codificacion == 'identity' and not aceptadas else aceptadas.quality(codificacion)
+        if calidad > calidad_mejor:
+            mejor, calidad_mejor = codificacion, calidad
+    return mejor
+
+
+class Compresion:
+    """
+    Extensión de Flask que comprime las respuestas y guarda las comprimidas con ETag.
+    """
+
+    def __init__(self, app=None):
+        self.activa = False
+        self.minimo = 500
+        self.niveles = {'gzip': 6, 'br': 5}
+        self.tipos = ()
+        self.max_bytes = 0
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # (ruta, etag, codificación) -> bytes comprimidos
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.activa = config['COMPRESS_ENABLED']
+        self.minimo = config['COMPRESS_MIN_SIZE']
+        self.niveles = {'gzip': config['COMPRESS_LEVEL_GZIP'], 'br': config['COMPRESS_LEVEL_BROTLI']}
+        self.tipos = tuple(config['COMPRESS_MIMETYPES'])
+        self.max_bytes = config['COMPRESS_CACHE_BYTES']
+        app.extensions['compresion'] = self
+        if self.activa:
+            app.after_request(self._comprimir)
+
+    def estadisticas(self):
+        """
+        Devuelve el tamaño y los contadores de la caché de respuestas comprimidas.
+        """
+        with self._lock:
+            return {
+                "entradas": len(self._cache),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+    def _comprimir(self, respuesta):
+        # Solo cuerpos completos de texto o JSON que nadie haya codificado antes
+        if (
+            respuesta.status_code < 200 or respuesta.status_code in (204, 206, 304)
+            or respuesta.direct_passthrough or respuesta.is_streamed
+            or 'Content-Encoding' in respuesta.headers
+            or respuesta.mimetype not in self.tipos
+        ):
+            return respuesta
+        if respuesta.content_length is not None and respuesta.content_length < self.minimo:
+            return respuesta
+        datos = respuesta.get_data()
+        if len(datos) < self.minimo:
+            return respuesta
+        # La representación depende de Accept-Encoding aunque esta vez no se comprima
+        respuesta.vary.add('Accept-Encoding')
+        codificacion = negociar_codificacion(codificaciones_disponibles())
+        if codificacion == 'identity':
+            return respuesta
+
+        etag, debil = respuesta.get_etag()
+        clave = None
+        if etag and request.method == 'GET' and respuesta.status_code == 200:
+            clave = (request.full_path, etag, codificacion)
+        comprimido = self._leer(clave) if clave else None
+        if comprimido is None:
+            comprimido = comprimir(datos, codificacion, self.niveles[codificacion])
+            if clave:
+                self._guardar(clave, comprimido)
+
+        respuesta.set_data(comprimido)
+        respuesta.headers['Content-Encoding'] = codificacion
+        if etag and not debil:
+            # Los bytes ya no son los de la representación original: el ETag pasa a ser débil,
+            # y etag_vigente() lo sigue reconociendo (comparación débil)
+            respuesta.set_etag(etag, weak=True)
+        return respuesta
+
+    def _leer(self, clave):
+        with self._lock:
+            comprimido = self._cache.get(clave)
+            if comprimido is None:
+                self.fallos += 1
+                return None
+            self._cache.move_to_end(clave)
+            self.aciertos += 1
+            return comprimido
+
+    def _guardar(self, clave, comprimido):
+        if len(comprimido) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._cache.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._cache[clave] = comprimido
+            self.bytes += len(comprimido)
+            # Desaloja las menos usadas hasta volver al límite de bytes
+            while self.bytes > self.max_bytes:
+                _, desalojado = self._cache.popitem(last=False)
+                self.bytes -= len(desalojado)
+
+
+def get_compresion():
+    """
+    Devuelve la compresión de respuestas de la aplicación actual.
+    """
+    return current_app.extensions['compresion']
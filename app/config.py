@@ -17,6 +17,129 @@ class Config:
     MYSQL_USER = os.getenv('MYSQL_USER', 'root')
     MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', '')
     MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'tienda_online')
+    MYSQL_PORT = int(os.getenv('MYSQL_PORT', 3306))
+    MYSQL_LOCAL_INFILE = os.getenv('MYSQL_LOCAL_INFILE', '0') == '1'  # LOAD DATA LOCAL INFILE en flask catalog import
+    MYSQL_STATEMENT_CACHE_SIZE = int(os.getenv('MYSQL_STATEMENT_CACHE_SIZE', 100))  # Sentencias preparadas por conexión; 0 desactiva
+    MYSQL_PREPARE_THRESHOLD = int(os.getenv('MYSQL_PREPARE_THRESHOLD', 2))  # Ejecuciones de una consulta en una conexión antes de prepararla
+
+    # Backend de acceso a datos: 'mysql' (producción) o 'sqlite' (desarrollo y pruebas sin servidor)
+    REPOSITORY_BACKEND = os.getenv('REPOSITORY_BACKEND', 'mysql')
+    SQLITE_DATABASE = os.getenv('SQLITE_DATABASE', ':memory:')  # Ruta del archivo o ':memory:'
+    # Script con los datos iniciales que se cargan en una base SQLite vacía
+    SQLITE_SEED_FILE = os.getenv(
+        'SQLITE_SEED_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tienda_online.sql')
+    )
+    CATEGORY_IDS_TTL = float(os.getenv('CATEGORY_IDS_TTL', 300))  # Segundos entre recargas de los IDs de categoría conocidos
+
+    # Pool de conexiones compartido por todos los Blueprints
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))  # Conexiones máximas por proceso
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))  # Segundos de espera por una conexión libre
+    DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 1800))  # Segundos de vida de una conexión
+    DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', 30))  # Inactividad que fuerza un ping
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 10))  # Segundos para abrir una conexión
+
+    # Paginación por cursor de los listados
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))  # Filas por página si no se indica limit
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 500))  # Máximo de filas aceptado en limit
+
+    # Exportación en streaming e importación masiva del catálogo
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))  # Filas leídas por cada fetchmany
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))  # Filas por transacción en flask catalog import
+
+    # Caché de lectura de productos y categorías
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', '1') == '1'  # Activa la caché de lectura
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memoria')  # 'memoria' o 'paquete.modulo:Clase'
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 2048))  # Entradas antes de desalojar (LRU)
+    CACHE_TTL = float(os.getenv('CACHE_TTL', 60))  # Segundos de vida de cada entrada
+
+    # Operaciones masivas (/productos/bulk)
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 1000))  # Elementos máximos por solicitud
+
+    # Hashing de contraseñas con bcrypt en un pool de procesos
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # Costo (work factor) de los hashes nuevos
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', 2))  # Procesos del pool (0 = en el propio worker)
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 8))  # Trabajos en curso antes de responder 503
+    BCRYPT_TIMEOUT = float(os.getenv('BCRYPT_TIMEOUT', 10))  # Segundos máximos por operación
+    BCRYPT_RETRY_AFTER = int(os.getenv('BCRYPT_RETRY_AFTER', 1))  # Valor de Retry-After en el 503
+
+    # Control de admisión: solicitudes concurrentes por grupo de endpoints (por worker)
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', '1') == '1'  # Activa los presupuestos de concurrencia
+    ADMISSION_READ_LIMIT = int(os.getenv('ADMISSION_READ_LIMIT', 20))  # Límite inicial de lecturas del catálogo
+    ADMISSION_READ_MAX = int(os.getenv('ADMISSION_READ_MAX', 200))  # Límite máximo de lecturas del catálogo
+    ADMISSION_WRITE_LIMIT = int(os.getenv('ADMISSION_WRITE_LIMIT', 10))  # Límite inicial de escrituras del catálogo
+    ADMISSION_WRITE_MAX = int(os.getenv('ADMISSION_WRITE_MAX', 50))  # Límite máximo de escrituras del catálogo
+    ADMISSION_AUTH_LIMIT = int(os.getenv('ADMISSION_AUTH_LIMIT', 8))  # Límite inicial de /auth (bcrypt y usuarios)
+    ADMISSION_AUTH_MAX = int(os.getenv('ADMISSION_AUTH_MAX', 32))  # Límite máximo de /auth
+    ADMISSION_MIN_LIMIT = int(os.getenv('ADMISSION_MIN_LIMIT', 2))  # Límite mínimo de cada grupo
+    ADMISSION_LATENCY_TOLERANCE = float(os.getenv('ADMISSION_LATENCY_TOLERANCE', 2))  # Múltiplo de la latencia base antes de reducir el límite
+    ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', 50))  # Solicitudes en espera por grupo
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 0.5))  # Segundos máximos en la cola antes del 503
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 1))  # Valor de Retry-After en el 503
+    AUTH_RATE_LIMIT = float(os.getenv('AUTH_RATE_LIMIT', 10))  # Intentos por minuto y cliente en /auth/login y /auth/register; 0 desactiva
+    AUTH_RATE_BURST = int(os.getenv('AUTH_RATE_BURST', 5))  # Intentos seguidos permitidos antes de aplicar la tasa
+    AUTH_RATE_MAX_CLIENTS = int(os.getenv('AUTH_RATE_MAX_CLIENTS', 10000))  # Clientes recordados por worker
+
+    # Perfil del usuario autenticado (/auth/me)
+    PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', 300))  # Segundos de vida de cada perfil en caché; 0 desactiva
+    PROFILE_CACHE_MAX_ENTRIES = int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', 10000))  # Perfiles antes de desalojar (LRU)
+    AUTH_PROFILE_CLAIMS = os.getenv('AUTH_PROFILE_CLAIMS', '1') == '1'  # Incluye el perfil en los tokens de acceso
+
+    # Métricas por endpoint expuestas en /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'  # Activa la medición de solicitudes y consultas
+    METRICS_DIR = os.getenv('METRICS_DIR', '')  # Archivos por worker (gunicorn.conf.py lo vacía al iniciar); vacío = métricas solo del proceso
+    METRICS_PERSIST = os.getenv('METRICS_PERSIST', '1') == '1'  # Vuelca las métricas a METRICS_DIR para sumar las de todos los workers
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))  # Segundos entre volcados de cada worker
+
+    # Búsqueda de texto completo (/productos/search)
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'indice')  # 'indice' (en memoria) o 'fulltext' (MySQL)
+    SEARCH_INDEX_PRELOAD = os.getenv('SEARCH_INDEX_PRELOAD', '1') == '1'  # Construye el índice al iniciar
+    SEARCH_MAX_EXPANSIONS = int(os.getenv('SEARCH_MAX_EXPANSIONS', 50))  # Palabras por prefijo que se consideran
+    SEARCH_MIN_PREFIX = int(os.getenv('SEARCH_MIN_PREFIX', 2))  # Términos más cortos solo coinciden completos
+    SEARCH_REBUILD_INTERVAL = float(os.getenv('SEARCH_REBUILD_INTERVAL', 30))  # Segundos mínimos entre reconstrucciones
+
+    # Serialización JSON (orjson si está instalado)
+    JSON_DECIMAL = os.getenv('JSON_DECIMAL', 'string')  # Decimal como 'string' (exacto) o 'number'
+    JSON_ROW_CACHE_SIZE = int(os.getenv('JSON_ROW_CACHE_SIZE', 10000))  # Filas con bytes JSON guardados; 0 desactiva
+
+    # Compresión de respuestas (gzip, y brotli si el paquete está instalado)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', '1') == '1'  # Activa la compresión de respuestas
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))  # Bytes mínimos del cuerpo para comprimir
+    COMPRESS_LEVEL_GZIP = int(os.getenv('COMPRESS_LEVEL_GZIP', 6))  # Nivel de gzip (1-9)
+    COMPRESS_LEVEL_BROTLI = int(os.getenv('COMPRESS_LEVEL_BROTLI', 5))  # Calidad de brotli (0-11)
+    COMPRESS_CACHE_BYTES = int(os.getenv('COMPRESS_CACHE_BYTES', 16 * 1024 * 1024))  # Bytes máximos de respuestas comprimidas guardadas
+    # Tipos de contenido que se comprimen
+    COMPRESS_MIMETYPES = ['application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/css',
+                          'text/javascript', 'application/javascript']
+
+    # Documentación (/documentacion): swagger.json, Swagger UI y sus recursos servidos desde memoria
+    DOCS_RELOAD_INTERVAL = float(os.getenv('DOCS_RELOAD_INTERVAL', 2))  # Segundos entre revisiones de cambios; 0 = nunca
+    DOCS_ASSETS_MAX_AGE = int(os.getenv('DOCS_ASSETS_MAX_AGE', 86400))  # max-age de los recursos de Swagger UI pedidos con su versión (?v=hash)
+
+    # Estadísticas por categoría (/categorias/stats)
+    STATS_PRELOAD = os.getenv('STATS_PRELOAD', '1') == '1'  # Carga el resumen al iniciar
+    STATS_RECONCILE_INTERVAL = float(os.getenv('STATS_RECONCILE_INTERVAL', 300))  # Segundos entre conciliaciones con GROUP BY
+    STATS_SYNC_DELAY = float(os.getenv('STATS_SYNC_DELAY', 5))  # Segundos mínimos para conciliar tras escrituras de otro worker
+
+    # Registro de cambios para la sincronización incremental (/changes)
+    CHANGES_RETENTION = float(os.getenv('CHANGES_RETENTION', 604800))  # Segundos que se conservan las entradas (7 días)
+    CHANGES_COMPACT_INTERVAL = float(os.getenv('CHANGES_COMPACT_INTERVAL', 3600))  # Segundos mínimos entre compactaciones
+    CHANGES_COMPACT_BATCH = int(os.getenv('CHANGES_COMPACT_BATCH', 5000))  # Entradas reemplazadas eliminadas por compactación
+
+    # Cambios en vivo por Server-Sent Events (/productos/stream)
+    SSE_KEEPALIVE = float(os.getenv('SSE_KEEPALIVE', 15))  # Segundos sin eventos antes de enviar un keepalive
+    SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', 0.5))  # Segundos entre lecturas del contador de versión
+    SSE_MAX_CLIENTS = int(os.getenv('SSE_MAX_CLIENTS', 5000))  # Conexiones abiertas por worker
+    SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', 1000))  # Eventos pendientes por conexión antes de cerrarla
+    SSE_RETRY = int(os.getenv('SSE_RETRY', 3000))  # Milisegundos que espera el cliente antes de reconectar
+
+    # Registro de consultas lentas (/monitoreo/consultas-lentas)
+    SLOW_QUERY_THRESHOLD = float(os.getenv('SLOW_QUERY_THRESHOLD', 0.2))  # Segundos; 0 desactiva el registro
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 100))  # Consultas lentas recientes que se conservan
+    # IDs de usuario con acceso a los endpoints de administración, separados por comas
+    ADMIN_USUARIOS = [id.strip() for id in os.getenv('ADMIN_USUARIOS', '').split(',') if id.strip()]
+
+    # Archivo compartido por los workers con la versión de cada tabla (ETags); vacío = uno por base en el directorio temporal
+    TABLE_VERSIONS_FILE = os.getenv('TABLE_VERSIONS_FILE', '')
 
     SECRET_KEY = os.getenv('SECRET_KEY', secrets.token_hex(16)) # Genera una clave segura de 32 caracteres
     print(SECRET_KEY)
\ No newline at end of file
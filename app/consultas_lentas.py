@@ -0,0 +1,188 @@
+"""
+Propósito: Registro de consultas lentas con captura automática del plan de ejecución.
+Funcionalidad: Define la extensión ConsultasLentas, que la Fuente de los repositorios llama
+después de cada sentencia y al obtener una conexión. Las que superan SLOW_QUERY_THRESHOLD se
+registran en el log con la plantilla SQL, los parámetros (ocultos si la sentencia toca la tabla
+usuario), la duración y las filas, y se guardan en un búfer circular de las más recientes. La
+primera vez que aparece una plantilla se ejecuta EXPLAIN en un hilo aparte, sin demorar la
+solicitud, y se conserva el plan. El búfer se consulta en /monitoreo/consultas-lentas.
+"""
+
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+from flask import current_app, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# Plantilla de la espera por una conexión (obtenerla del pool o reconectar)
+OBTENER_CONEXION = '<obtener conexión>'
+
+# Sentencias admitidas por EXPLAIN en MySQL y SQLite
+_EXPLICABLES = ('SELECT', 'UPDATE', 'DELETE')
+# Listas IN (%s, %s, ...) de longitud variable: se agrupan en una sola plantilla
+_LISTA_MARCADORES = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_ESPACIOS = re.compile(r'\s+')
+_TABLA_USUARIO = re.compile(r'\busuario\b', re.IGNORECASE)
+# Longitud máxima de cada parámetro en el registro
+_MAX_PARAMETRO = 80
+
+
+class ConsultasLentas:
+    """
+    Extensión de Flask con el registro de consultas lentas del proceso.
+    """
+
+    def __init__(self, app=None):
+        self.umbral = 0.2
+        self.fuente = None
+        self._lock = threading.Lock()
+        self._recientes = deque(maxlen=100)
+        self._planes = {}  # plantilla -> filas de EXPLAIN
+        self._pendientes = set()  # plantillas con EXPLAIN en cola
+        self._cola = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.umbral = config['SLOW_QUERY_THRESHOLD']
+        self._recientes = deque(maxlen=config['SLOW_QUERY_LOG_SIZE'])
+        app.extensions['consultas_lentas'] = self
+        if self.umbral <= 0:
+            return
+        # Requiere que Repositorios se haya inicializado antes
+        self.fuente = app.extensions['repositorios'].fuente
+        self.fuente.registro_lentas = self
+
+    def registrar(self, sql, parametros, duracion, filas=None):
+        """
+        Registra una sentencia si su duración supera el umbral.
+
+        Args:
+            sql (str): Sentencia con marcadores %s, antes de adaptarla al dialecto.
+            parametros (tuple): Parámetros de la sentencia.
+            duracion (float): Segundos que tomó la sentencia.
+            filas (int | None): Filas devueltas o afectadas, si el driver las informa.
+        """
+        if duracion < self.umbral:
+            return
+        self._registrar(sql, tuple(parametros), None, duracion, filas)
+
+    def registrar_varios(self, sql, lote, duracion, filas=None):
+        """
+        Registra un executemany si su duración supera el umbral. En el registro se informa el
+        tamaño del lote y el plan se obtiene con los parámetros de su primera fila.
+
+        Args:
+            sql (str): Sentencia con marcadores %s, antes de adaptarla al dialecto.
+            lote (list[tuple]): Parámetros de cada ejecución.
+            duracion (float): Segundos que tomó el executemany completo.
+            filas (int | None): Filas afectadas, si el driver las informa.
+        """
+        if duracion < self.umbral:
+            return
+        self._registrar(sql, tuple(lote[0]) if lote else None, len(lote), duracion, filas)
+
+    def _registrar(self, sql, parametros, cantidad, duracion, filas):
+        # parametros: los de la sentencia (o de la primera fila del lote); None si no hay con
+        # qué obtener el plan. cantidad: filas del lote de un executemany
+        plantilla = _ESPACIOS.sub(' ', _LISTA_MARCADORES.sub('(%s, ...)', sql)).strip()
+        entrada = {
+            "plantilla": plantilla,
+            "parametros": _describir_parametros(plantilla, parametros, cantidad),
+            "duracion_ms": round(duracion * 1000, 3),
+            "filas": filas if filas is not None and filas >= 0 else None,
+            "endpoint": request.endpoint if has_request_context() else None,
+            "momento": time.time(),
+        }
+        logger.warning(
+            "Consulta lenta (%.1f ms, %s filas) en %s: %s %s", entrada["duracion_ms"], entrada["filas"],
+            entrada["endpoint"], plantilla, entrada["parametros"]
+        )
+        with self._lock:
+            self._recientes.append(entrada)
+            explicar = (
+                parametros is not None
+                and plantilla.split(' ', 1)[0].upper() in _EXPLICABLES
+                and plantilla not in self._planes and plantilla not in self._pendientes
+            )
+            if explicar:
+                self._pendientes.add(plantilla)
+        if explicar:
+            self._encolar((plantilla, sql, parametros))
+
+    def registrar_conexion(self, duracion):
+        """
+        Registra la espera por una conexión si supera el umbral.
+        """
+        self.registrar(OBTENER_CONEXION, (), duracion)
+
+    def recientes(self):
+        """
+        Devuelve las consultas lentas del búfer (la más reciente primero) y los planes capturados.
+        """
+        with self._lock:
+            return {
+                "umbral_ms": self.umbral * 1000,
+                "recientes": list(reversed(self._recientes)),
+                "planes": dict(self._planes),
+            }
+
+    def _encolar(self, trabajo):
+        # El hilo del EXPLAIN se crea en cada worker tras el fork
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._cola = queue.Queue()
+                    threading.Thread(target=self._explicar, args=(self._cola,), daemon=True).start()
+                    self._pid = os.getpid()
+        self._cola.put(trabajo)
+
+    def _explicar(self, cola):
+        while True:
+            plantilla, sql, parametros = cola.get()
+            try:
+                with self.fuente.lectura() as cursor:
+                    # Se usa el cursor directamente para que el EXPLAIN no se registre a sí mismo
+                    cursor.execute(self.fuente.traducir(self.fuente.explain + sql), parametros)
+                    plan = [{k: _valor_plan(v) for k, v in fila.items()} for fila in cursor.fetchall()]
+            except Exception as err:
+                # El hilo no debe terminar (pool agotado, sentencia no explicable, ...);
+                # se reintenta en la siguiente aparición de la plantilla
+                logger.info("No se pudo obtener el plan de %s: %s", plantilla, err)
+                with self._lock:
+                    self._pendientes.discard(plantilla)
+                continue
+            with self._lock:
+                self._planes[plantilla] = plan
+                self._pendientes.discard(plantilla)
+
+
+def _describir_parametros(plantilla, parametros, cantidad):
+    if cantidad is not None:
+        return f"{cantidad} filas"
+    if _TABLA_USUARIO.search(plantilla):
+        return ['***'] * len(parametros)
+    return [str(p)[:_MAX_PARAMETRO] for p in parametros]
+
+
+def _valor_plan(valor):
+    if valor is None or isinstance(valor, (int, float, str)):
+        return valor
+    if isinstance(valor, bytes):
+        return valor.decode('utf-8', 'replace')
+    return str(valor)
+
+
+def get_consultas_lentas():
+    """
+    Devuelve el registro de consultas lentas de la aplicación actual.
+    """
+    return current_app.extensions['consultas_lentas']
@@ -0,0 +1,311 @@
+"""
+Propósito: Centraliza el acceso a la base de datos MySQL de la aplicación.
+Funcionalidad: Define un pool de conexiones acotado y seguro frente a fork (gunicorn) que
+reutiliza las conexiones entre solicitudes en lugar de abrir una nueva por cada una. El pool
+tiene tamaño máximo configurable, tiempo de espera para obtener una conexión, verificación
+(ping) al prestar una conexión ociosa, vida máxima por conexión y estadísticas de uso. Las
+conexiones trabajan en autocommit y las escrituras abren su transacción explícitamente, de modo
+que al devolver una conexión solo se envía ROLLBACK si quedó una transacción abierta.
+Expone get_db_connection() para los Blueprints, con la misma interfaz que la conexión de
+mysql.connector: al llamar close() la conexión vuelve al pool en lugar de cerrarse. Cada
+conexión real lleva su caché de sentencias preparadas (repositorios/mysql.py), que se conserva
+mientras la conexión vive en el pool y empieza vacía en cada conexión nueva.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+import mysql.connector
+from mysql.connector import errors
+
+
+class PoolAgotadoError(errors.PoolError):
+    """
+    Se lanza cuando no se obtiene una conexión libre dentro del tiempo de espera.
+    """
+
+
+class ConexionPool:
+    """
+    Envoltura de una conexión prestada por el pool.
+
+    Delega todos los atributos en la conexión real de mysql.connector, excepto close(),
+    que devuelve la conexión al pool, y sentencias, la caché de sentencias preparadas de la
+    conexión real.
+    """
+
+    def __init__(self, pool, entrada):
+        self._pool = pool
+        self._entrada = entrada
+        self._devuelta = False
+        self.sentencias = entrada.sentencias
+
+    def __getattr__(self, nombre):
+        return getattr(self._entrada.conexion, nombre)
+
+    def close(self):
+        """
+        Devuelve la conexión al pool. Llamadas repetidas no tienen efecto.
+        """
+        if not self._devuelta:
+            self._devuelta = True
+            self._pool.devolver(self._entrada)
+
+
+class _Entrada:
+    """
+    Conexión real junto con sus marcas de tiempo de creación y último uso y su caché de
+    sentencias preparadas (se descarta con la conexión: el servidor las libera al cerrarla).
+    """
+
+    __slots__ = ('conexion', 'creada', 'usada', 'sentencias')
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.creada = time.monotonic()
+        self.usada = self.creada
+        self.sentencias = {}
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones MySQL acotado y seguro para múltiples hilos.
+
+    Args:
+        fabrica (callable): Función sin argumentos que abre una conexión nueva.
+        tamano (int): Número máximo de conexiones abiertas (prestadas + ociosas).
+        timeout (float): Segundos máximos de espera para obtener una conexión.
+        vida_maxima (float): Segundos tras los cuales una conexión se descarta (0 = sin límite).
+        intervalo_ping (float): Segundos de inactividad a partir de los cuales se hace ping
+            antes de prestar la conexión (0 = siempre).
+    """
+
+    def __init__(self, fabrica, tamano=10, timeout=5.0, vida_maxima=1800.0, intervalo_ping=30.0):
+        self._fabrica = fabrica
+        self.tamano = tamano
+        self.timeout = timeout
+        self.vida_maxima = vida_maxima
+        self.intervalo_ping = intervalo_ping
+        self._condicion = threading.Condition()
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        # Estado propio del proceso; se rehace tras un fork
+        self._pid = os.getpid()
+        self._ociosas = deque()
+        self._abiertas = 0
+        self._en_uso = 0
+        self._esperas = 0
+        self._tiempo_espera = 0.0
+        self._agotados = 0
+        self._creadas = 0
+        self._descartadas = 0
+
+    def reiniciar_tras_fork(self):
+        """
+        Olvida las conexiones heredadas del proceso padre.
+
+        Los sockets heredados pertenecen a la sesión del padre: no se cierran (close()
+        enviaría COM_QUIT y cortaría la sesión del padre), solo se abandonan.
+        """
+        self._condicion = threading.Condition()
+        self._reiniciar_estado()
+
+    def obtener(self):
+        """
+        Presta una conexión del pool, abriendo una nueva si hay capacidad libre.
+
+        Returns:
+            ConexionPool: Conexión prestada; close() la devuelve al pool.
+
+        Raises:
+            PoolAgotadoError: Si no hay conexión libre dentro del tiempo de espera.
+        """
+        if self._pid != os.getpid():
+            self.reiniciar_tras_fork()
+
+        with self._condicion:
+            inicio = None
+            while True:
+                entrada = self._tomar_ociosa()
+                if entrada is not None:
+                    break
+                if self._abiertas < self.tamano:
+                    # Reserva el hueco antes de abrir la conexión fuera del lock
+                    self._abiertas += 1
+                    break
+                if inicio is None:
+                    inicio = time.monotonic()
+                    self._esperas += 1
+                restante = self.timeout - (time.monotonic() - inicio)
+                if restante <= 0 or not self._condicion.wait(restante):
+                    if not self._ociosas and self._abiertas >= self.tamano:
+                        self._tiempo_espera += time.monotonic() - inicio
+                        self._agotados += 1
+                        raise PoolAgotadoError("No hay conexiones disponibles en el pool")
+            if inicio is not None:
+                self._tiempo_espera += time.monotonic() - inicio
+            self._en_uso += 1
+
+        if entrada is None or not self._sana(entrada):
+            entrada = self._abrir()
+        return ConexionPool(self, entrada)
+
+    def devolver(self, entrada):
+        """
+        Recibe una conexión prestada y la deja ociosa o la descarta si ya no es reutilizable.
+        """
+        if self._pid != os.getpid():
+            # Conexión prestada antes del fork: no pertenece a este pool
+            return
+        # Una consulta sin terminar de leer (cliente desconectado en un streaming) obligaría
+        # a consumir todas sus filas para reutilizar la conexión: es más barato descartarla
+        descartar = self._caducada(entrada) or bool(getattr(entrada.conexion, 'unread_result', False))
+        if not descartar and entrada.conexion.in_transaction:
+            try:
+                # Descarta la transacción que dejara abierta una escritura fallida; las lecturas
+                # (autocommit) no abren ninguna y se devuelven sin ir al servidor
+                entrada.conexion.rollback()
+            except errors.Error:
+                descartar = True
+        if descartar:
+            self._cerrar(entrada)
+        entrada.usada = time.monotonic()
+        with self._condicion:
+            self._en_uso -= 1
+            if descartar:
+                self._abiertas -= 1
+                self._descartadas += 1
+            else:
+                self._ociosas.append(entrada)
+            self._condicion.notify()
+
+    def estadisticas(self):
+        """
+        Devuelve una instantánea del estado del pool para dimensionarlo.
+
+        Returns:
+            dict: Tamaño, conexiones en uso y ociosas, esperas y tiempo total de espera.
+        """
+        with self._condicion:
+            return {
+                "tamano": self.tamano,
+                "abiertas": self._abiertas,
+                "en_uso": self._en_uso,
+                "ociosas": len(self._ociosas),
+                "esperas": self._esperas,
+                "tiempo_espera_total": round(self._tiempo_espera, 6),
+                "agotados": self._agotados,
+                "creadas": self._creadas,
+                "descartadas": self._descartadas,
+            }
+
+    def cerrar(self):
+        """
+        Cierra todas las conexiones ociosas del pool.
+        """
+        with self._condicion:
+            ociosas = list(self._ociosas)
+            self._ociosas.clear()
+            self._abiertas -= len(ociosas)
+        for entrada in ociosas:
+            self._cerrar(entrada)
+
+    def _tomar_ociosa(self):
+        # LIFO: reutiliza la conexión más reciente para que las antiguas caduquen
+        while self._ociosas:
+            entrada = self._ociosas.pop()
+            if not self._caducada(entrada):
+                return entrada
+            self._abiertas -= 1
+            self._descartadas += 1
+            self._cerrar(entrada)
+        return None
+
+    def _caducada(self, entrada):
+        return bool(self.vida_maxima) and time.monotonic() - entrada.creada >= self.vida_maxima
+
+    def _sana(self, entrada):
+        # Hace ping solo si la conexión estuvo ociosa más del intervalo configurado
+        if time.monotonic() - entrada.usada < self.intervalo_ping:
+            return True
+        try:
+            entrada.conexion.ping(reconnect=False)
+            return True
+        except errors.Error:
+            self._cerrar(entrada)
+            with self._condicion:
+                self._descartadas += 1
+            return False
+
+    def _abrir(self):
+        try:
+            entrada = _Entrada(self._fabrica())
+        except Exception:
+            # Libera el hueco reservado si la conexión no pudo abrirse
+            with self._condicion:
+                self._abiertas -= 1
+                self._en_uso -= 1
+                self._condicion.notify()
+            raise
+        with self._condicion:
+            self._creadas += 1
+        return entrada
+
+    @staticmethod
+    def _cerrar(entrada):
+        try:
+            entrada.conexion.close()
+        except errors.Error:
+            pass
+
+
+class BaseDatos:
+    """
+    Extensión de Flask que crea el pool de conexiones a partir de la configuración.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+
+        def fabrica():
+            return mysql.connector.connect(
+                host=config['MYSQL_HOST'],
+                port=config['MYSQL_PORT'],
+                user=config['MYSQL_USER'],
+                password=config['MYSQL_PASSWORD'],
+                database=config['MYSQL_DATABASE'],
+                connection_timeout=config['DB_CONNECT_TIMEOUT'],
+                allow_local_infile=config['MYSQL_LOCAL_INFILE'],
+                # Las lecturas no abren transacción; las escrituras la inician con start_transaction()
+                autocommit=True,
+            )
+
+        pool = PoolConexiones(
+            fabrica,
+            tamano=config['DB_POOL_SIZE'],
+            timeout=config['DB_POOL_TIMEOUT'],
+            vida_maxima=config['DB_POOL_MAX_LIFETIME'],
+            intervalo_ping=config['DB_POOL_PING_INTERVAL'],
+        )
+        # Los workers de gunicorn heredan el pool del maestro: se reinicia en el hijo
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=pool.reiniciar_tras_fork)
+        app.extensions['db_pool'] = pool
+
+
+def get_db_connection():
+    """
+    Presta una conexión del pool de la aplicación actual.
+
+    Returns:
+        ConexionPool: Conexión a la base de datos; close() la devuelve al pool.
+    """
+    return current_app.extensions['db_pool'].obtener()
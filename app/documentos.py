@@ -0,0 +1,234 @@
+"""
+Propósito: Sirve desde memoria la documentación de la API y los recursos de Swagger UI.
+Funcionalidad: Define la extensión Documentacion, que al iniciar carga swagger.json, genera la
+página HTML de /documentacion/docs y lee los recursos de app/static/swagger-ui. Cada recurso
+se guarda sin comprimir y precomprimido con gzip (y con brotli si el paquete está instalado),
+con un ETag fuerte por variante. Las respuestas eligen la variante según Accept-Encoding y
+responden 304 si el cliente ya la tiene. Los archivos se recargan solo si cambia su fecha de
+modificación, comprobada como mucho una vez cada DOCS_RELOAD_INTERVAL segundos. La página
+enlaza cada recurso con el hash de su contenido (?v=...): esas URLs se guardan en caché sin
+revalidar (DOCS_ASSETS_MAX_AGE) y, cuando un recurso cambia, la página se regenera con el hash
+nuevo; sin la versión correcta el recurso se revalida siempre con su ETag.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+
+from flask import Response, current_app
+from werkzeug.security import safe_join
+
+from .compresion import codificaciones_disponibles, comprimir, negociar_codificacion
+from .versiones import etag_vigente
+
+# Tipos de contenido que vale la pena comprimir
+_COMPRIMIBLES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+# Nivel máximo de cada codificación: la compresión se hace una sola vez por carga
+_NIVELES = {'gzip': 9, 'br': 11}
+
+# Página de Swagger UI; los recursos se sirven desde /documentacion/swagger-ui con la versión
+# (hash del contenido) de cada uno
+PAGINA_DOCS = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Swagger UI</title>
+    <link rel="stylesheet" href="/documentacion/swagger-ui/swagger-ui.css?v=%(swagger-ui.css)s" />
+</head>
+<body>
+    <div id="swagger-ui"></div>
+    <script src="/documentacion/swagger-ui/swagger-ui-bundle.js?v=%(swagger-ui-bundle.js)s"></script>
+    <script src="/documentacion/swagger-ui/swagger-ui-standalone-preset.js?v=%(swagger-ui-standalone-preset.js)s"></script>
+    <script>
+        window.onload = () => {
+            window.ui = SwaggerUIBundle({
+                url: '/documentacion/swagger.json',
+                dom_id: '#swagger-ui',
+                presets: [
+                    SwaggerUIBundle.presets.apis,
+                    SwaggerUIStandalonePreset
+                ],
+                layout: "StandaloneLayout",
+            });
+        };
+    </script>
+</body>
+</html>
+"""
+
+# Recursos de Swagger UI que usa la página y se cargan al iniciar; el resto se carga al pedirlo
+RECURSOS_PAGINA = ('swagger-ui.css', 'swagger-ui-bundle.js', 'swagger-ui-standalone-preset.js')
+
+
+class Recurso:
+    """
+    Contenido en memoria con sus variantes comprimidas.
+
+    Args:
+        tipo (str): Content-Type de la respuesta.
+        cache_control (str): Valor de Cache-Control.
+        ruta (str | None): Archivo de origen; None si el contenido se genera en memoria.
+        contenido (bytes | None): Contenido fijo cuando no hay archivo.
+    """
+
+    def __init__(self, tipo, cache_control, ruta=None, contenido=None):
+        self.tipo = tipo
+        self.cache_control = cache_control
+        self.ruta = ruta
+        self.mtime = None
+        self.revisado = 0.0
+        self.version = None  # hash del contenido sin comprimir
+        self.variantes = {}  # codificación -> (cuerpo, etag)
+        self._cargar(contenido)
+
+    def revisar(self, intervalo):
+        """
+        Recarga el archivo si cambió su fecha de modificación (como mucho una vez por intervalo).
+        """
+        ahora = time.monotonic()
+        if self.ruta is None or intervalo <= 0 or ahora - self.revisado < intervalo:
+            return
+        self.revisado = ahora
+        try:
+            mtime = os.stat(self.ruta).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self.mtime:
+            self._cargar()
+
+    def _cargar(self, contenido=None):
+        if self.ruta is not None:
+            with open(self.ruta, 'rb') as archivo:
+                contenido = archivo.read()
+            self.mtime = os.stat(self.ruta).st_mtime_ns
+        self.revisado = time.monotonic()
+        etag = hashlib.blake2b(contenido, digest_size=12).hexdigest()
+        variantes = {'identity': (contenido, etag)}
+        if self.tipo.startswith(_COMPRIMIBLES):
+            for codificacion in codificaciones_disponibles():
+                comprimido = comprimir(contenido, codificacion, _NIVELES[codificacion])
+                if len(comprimido) < len(contenido):
+                    variantes[codificacion] = (comprimido, f"{etag}-{codificacion}")
+        # Se reemplaza el diccionario completo: las solicitudes en curso ven una versión coherente
+        self.variantes = variantes
+        self.version = etag
+
+    def respuesta(self, cache_control=None):
+        """
+        Respuesta con la variante que prefiere el cliente, o 304 si ya la tiene.
+
+        Args:
+            cache_control (str | None): Cache-Control en lugar del propio del recurso.
+        """
+        codificacion = negociar_codificacion(self.variantes)
+        cuerpo, etag = self.variantes[codificacion]
+        if etag_vigente(etag):
+            respuesta = Response(status=304)
+        else:
+            respuesta = Response(cuerpo, content_type=self.tipo)
+            if codificacion != 'identity':
+                respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.set_etag(etag)
+        respuesta.headers['Cache-Control'] = cache_control or self.cache_control
+        respuesta.headers['Vary'] = 'Accept-Encoding'
+        return respuesta
+
+
+class Documentacion:
+    """
+    Extensión de Flask con la documentación y los recursos de Swagger UI en memoria.
+    """
+
+    def __init__(self, app=None):
+        self.intervalo = 2.0
+        self.cache_recursos = 'public, max-age=86400, immutable'
+        self.directorio_recursos = None
+        self.swagger = None
+        self._pagina = None
+        self._versiones_pagina = None  # versiones de los recursos enlazados en la página
+        self._recursos = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.intervalo = config['DOCS_RELOAD_INTERVAL']
+        # Solo para las URLs con la versión del contenido, que no cambian de contenido
+        self.cache_recursos = f"public, max-age={config['DOCS_ASSETS_MAX_AGE']}, immutable"
+        raiz = os.path.dirname(app.root_path)
+        ruta_swagger = os.path.join(raiz, 'swagger.json')
+        # swagger.json y la página se revalidan siempre con el ETag (cambian con cada despliegue)
+        if os.path.exists(ruta_swagger):
+            self.swagger = Recurso('application/json', 'no-cache', ruta=ruta_swagger)
+        self.directorio_recursos = os.path.join(app.root_path, 'static', 'swagger-ui')
+        self._recursos = {}
+        self._pagina = self._versiones_pagina = None
+        self.pagina()
+        app.extensions['documentacion'] = self
+
+    def especificacion(self):
+        """
+        Devuelve swagger.json (recargado si cambió en disco) o None si no existe.
+        """
+        if self.swagger is not None:
+            self.swagger.revisar(self.intervalo)
+        return self.swagger
+
+    def pagina(self):
+        """
+        Devuelve la página de Swagger UI, regenerada si cambió alguno de sus recursos.
+        """
+        versiones = {}
+        for nombre in RECURSOS_PAGINA:
+            recurso = self.recurso(nombre)
+            versiones[nombre] = recurso.version if recurso is not None else ''
+        if versiones != self._versiones_pagina:
+            with self._lock:
+                if versiones != self._versiones_pagina:
+                    contenido = (PAGINA_DOCS % versiones).encode('utf-8')
+                    self._pagina = Recurso('text/html; charset=utf-8', 'no-cache', contenido=contenido)
+                    self._versiones_pagina = versiones
+        return self._pagina
+
+    def recurso(self, nombre):
+        """
+        Devuelve el recurso de Swagger UI con ese nombre (cargándolo la primera vez) o None.
+        """
+        recurso = self._recursos.get(nombre)
+        if recurso is not None:
+            recurso.revisar(self.intervalo)
+            return recurso
+        ruta = safe_join(self.directorio_recursos, nombre)
+        if ruta is None or not os.path.isfile(ruta):
+            return None
+        with self._lock:
+            recurso = self._recursos.get(nombre)
+            if recurso is None:
+                tipo = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+                if tipo.startswith('text/') or tipo == 'application/javascript':
+                    tipo += '; charset=utf-8'
+                # Sin versión en la URL se revalida siempre; ver respuesta_recurso()
+                recurso = self._recursos[nombre] = Recurso(tipo, 'no-cache', ruta=ruta)
+        return recurso
+
+    def respuesta_recurso(self, recurso, version):
+        """
+        Respuesta de un recurso de Swagger UI. Pedido con la versión actual de su contenido
+        (la que enlaza la página) se guarda en caché sin revalidar; si no, se revalida con el ETag.
+
+        Args:
+            recurso (Recurso): Recurso devuelto por recurso().
+            version (str | None): Parámetro v de la URL.
+        """
+        if version is not None and version == recurso.version:
+            return recurso.respuesta(self.cache_recursos)
+        return recurso.respuesta()
+
+
+def get_documentacion():
+    """
+    Devuelve la documentación en memoria de la aplicación actual.
+    """
+    return current_app.extensions['documentacion']
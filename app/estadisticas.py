@@ -0,0 +1,324 @@
+"""
+Propósito: Estadísticas de productos por categoría mantenidas de forma incremental.
+Funcionalidad: Define la extensión EstadisticasCategorias, que guarda en la memoria del proceso,
+para cada categoría, el número de productos, la suma de precios y los precios ordenados (mínimo y
+máximo exactos también al eliminar). Se carga al iniciar, se actualiza con cada escritura
+notificada por cambios.notificar_cambio() leyendo solo los productos escritos y se concilia
+contra un GROUP BY en segundo plano: periódicamente (STATS_RECONCILE_INTERVAL) y cuando el
+contador de versión compartido revela escrituras de otro worker. Las categorías con diferencias
+se recargan; las lecturas de /categorias/stats nunca recorren la tabla.
+
+Para aplicar una actualización o eliminación hay que conocer la categoría y el precio anteriores
+del producto, así que cada worker guarda ambos por producto, con el precio en centavos enteros:
+unos 120 bytes por producto y worker (120 MB por millón de productos), más la lista de precios
+de cada categoría.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from decimal import Decimal
+
+from flask import current_app
+
+from .repositorios import RepositorioError
+
+logger = logging.getLogger(__name__)
+
+_CENTAVOS = Decimal('0.01')
+
+
+class Resumen:
+    """
+    Agregados de una categoría.
+
+    Attributes:
+        productos (int): Productos de la categoría (con o sin precio).
+        suma (int): Suma de los precios no nulos, en centavos.
+        precios (list[int]): Precios no nulos ordenados, en centavos.
+    """
+
+    __slots__ = ('productos', 'suma', 'precios')
+
+    def __init__(self):
+        self.productos = 0
+        self.suma = 0
+        self.precios = []
+
+    def agregar(self, precio):
+        self.productos += 1
+        if precio is not None:
+            self.suma += precio
+            bisect.insort(self.precios, precio)
+
+    def quitar(self, precio):
+        self.productos -= 1
+        if precio is not None:
+            self.suma -= precio
+            del self.precios[bisect.bisect_left(self.precios, precio)]
+
+    def como_dict(self, categoria):
+        precios = self.precios
+        return {
+            "categortia_id": categoria,
+            "productos": self.productos,
+            "precio_min": _decimal(precios[0]) if precios else None,
+            "precio_max": _decimal(precios[-1]) if precios else None,
+            "precio_promedio": (_decimal(self.suma) / len(precios)).quantize(_CENTAVOS) if precios else None,
+        }
+
+    def coincide(self, fila):
+        # Compara con una fila de resumen_por_categoria(); los backends difieren en el tipo numérico
+        precios = self.precios
+        return (
+            self.productos == fila['productos']
+            and (self.suma if precios else None) == _centavos(fila['suma'])
+            and (precios[0] if precios else None) == _centavos(fila['minimo'])
+            and (precios[-1] if precios else None) == _centavos(fila['maximo'])
+        )
+
+
+class EstadisticasCategorias:
+    """
+    Extensión de Flask con las estadísticas por categoría del proceso.
+
+    Cada worker tiene su propio resumen. Las escrituras del propio worker se aplican al momento;
+    las de otros workers se detectan con el contador de versión compartido y se corrigen con una
+    conciliación en segundo plano (como mucho una vez cada STATS_SYNC_DELAY segundos) mientras
+    se sigue respondiendo con el resumen anterior.
+    """
+
+    def __init__(self, app=None):
+        self.intervalo = 300.0
+        self.espera_sincronizacion = 5.0
+        self._repos = None
+        self._versiones = None
+        self._lock = threading.Lock()
+        self._productos = None  # id -> (categortia_id, centavos); None hasta la primera carga
+        self._resumenes = {}  # categortia_id -> Resumen
+        self._visto = None  # versión de la tabla producto que refleja el resumen
+        self._desfasado = False
+        self._conciliando = False
+        self._ultima_conciliacion = 0.0
+        self._conciliado_en = None  # time.time() de la última conciliación completa
+        self._escritos = None  # ids escritos por este worker durante una conciliación
+        self._primera_carga = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.intervalo = config['STATS_RECONCILE_INTERVAL']
+        self.espera_sincronizacion = config['STATS_SYNC_DELAY']
+        # Requiere que Repositorios y VersionesTablas se hayan inicializado antes
+        self._repos = app.extensions['repositorios']
+        self._versiones = app.extensions['versiones']
+        # La instancia es global: una aplicación nueva no hereda el resumen de otra base
+        with self._lock:
+            self._productos = None
+            self._resumenes = {}
+            self._visto = None
+            self._escritos = None
+        app.extensions['estadisticas'] = self
+        if config['STATS_PRELOAD']:
+            # Cargado antes del fork (gunicorn --preload), los workers heredan el resumen
+            try:
+                self._conciliar()
+            except RepositorioError as err:
+                logger.warning("No se pudieron cargar las estadísticas por categoría: %s", err)
+
+    def categorias(self):
+        """
+        Devuelve las estadísticas de todas las categorías con productos.
+
+        Returns:
+            dict: {"data": estadísticas por categoría, "conciliado_en": marca de tiempo}.
+        """
+        self._preparar()
+        with self._lock:
+            data = [resumen.como_dict(categoria) for categoria, resumen in sorted(self._resumenes.items())]
+            return {"data": data, "conciliado_en": self._conciliado_en}
+
+    def categoria(self, id):
+        """
+        Devuelve las estadísticas de una categoría, o None si no tiene productos.
+        """
+        self._preparar()
+        with self._lock:
+            resumen = self._resumenes.get(id)
+            return resumen.como_dict(id) if resumen is not None else None
+
+    def actualizar(self, ids, versiones):
+        """
+        Aplica al resumen una escritura confirmada sobre productos.
+
+        Args:
+            ids (iterable[int]): IDs creados, actualizados o eliminados.
+            versiones (tuple[int, int]): Versión de la tabla producto antes y después.
+        """
+        if self._productos is None and self._escritos is None:
+            return
+        ids = list(ids)
+        anterior, nueva = versiones
+        try:
+            productos = self._repos.productos.obtener_varios(ids, ('id', 'precio', 'categortia_id'))
+        except RepositorioError as err:
+            # La escritura ya se confirmó: se conciliará en lugar de fallar la solicitud
+            logger.warning("No se pudieron actualizar las estadísticas por categoría: %s", err)
+            with self._lock:
+                self._desfasado = True
+                self._visto = nueva
+            return
+        with self._lock:
+            if self._productos is not None:
+                self._aplicar(ids, productos)
+            if self._escritos is not None:
+                # Se vuelven a aplicar al terminar la conciliación en curso
+                self._escritos.update(ids)
+            if self._visto != anterior:
+                self._desfasado = True
+            self._visto = nueva
+
+    def estado(self):
+        """
+        Devuelve el tamaño y el estado del resumen.
+        """
+        with self._lock:
+            return {
+                "categorias": len(self._resumenes),
+                "productos": len(self._productos) if self._productos is not None else 0,
+                "desfasado": self._desfasado,
+                "conciliando": self._conciliando,
+                "conciliado_en": self._conciliado_en,
+            }
+
+    def _preparar(self):
+        if self._productos is None:
+            # Primera lectura del worker sin resumen precargado: las demás esperan a que termine
+            with self._primera_carga:
+                if self._productos is None:
+                    self._conciliar()
+        # Si otro worker escribió en la tabla, el resumen local está desfasado
+        actual = self._versiones.leer('producto')
+        ahora = time.monotonic()
+        with self._lock:
+            if actual != self._visto:
+                self._desfasado = True
+                self._visto = actual
+            transcurrido = ahora - self._ultima_conciliacion
+            conciliar = not self._conciliando and (
+                transcurrido >= self.intervalo
+                or (self._desfasado and transcurrido >= self.espera_sincronizacion)
+            )
+            if conciliar:
+                self._conciliando = True
+        if conciliar:
+            threading.Thread(target=self._conciliar, args=(True,), daemon=True).start()
+
+    def _conciliar(self, en_segundo_plano=False):
+        with self._lock:
+            self._conciliando = True
+            self._escritos = set()
+            self._desfasado = False
+            # El resultado refleja al menos las escrituras anteriores a esta versión
+            self._visto = self._versiones.leer('producto')
+            cargado = self._productos is not None
+        inicio = time.monotonic()
+        try:
+            if cargado:
+                # Solo se recargan las categorías cuyo GROUP BY no coincide con el resumen
+                filas = {fila['categortia_id']: fila for fila in self._repos.productos.resumen_por_categoria()}
+                with self._lock:
+                    distintas = [c for c in set(filas) | set(self._resumenes)
+                                 if c not in filas or c not in self._resumenes
+                                 or not self._resumenes[c].coincide(filas[c])]
+                productos = self._repos.productos.precios(distintas) if distintas else []
+            else:
+                distintas = None
+                productos = self._repos.productos.precios()
+            with self._lock:
+                escritos = self._escritos
+            # Las escrituras de este worker durante la conciliación se vuelven a leer
+            escritos_leidos = (
+                self._repos.productos.obtener_varios(escritos, ('id', 'precio', 'categortia_id'))
+                if escritos else []
+            )
+        except RepositorioError as err:
+            with self._lock:
+                self._escritos = None
+                self._desfasado = True
+                self._conciliando = False
+                self._ultima_conciliacion = time.monotonic()
+            if not en_segundo_plano:
+                raise
+            logger.warning("No se pudieron conciliar las estadísticas por categoría: %s", err)
+            return
+        with self._lock:
+            if distintas is None:
+                self._productos, self._resumenes = {}, {}
+            else:
+                self._reiniciar(distintas)
+            for producto in productos:
+                self._sumar(producto)
+            if escritos:
+                self._aplicar(escritos, escritos_leidos)
+            self._escritos = None
+            self._conciliando = False
+            self._ultima_conciliacion = time.monotonic()
+            self._conciliado_en = time.time()
+        if distintas:
+            logger.info("Estadísticas por categoría corregidas en %d categorías", len(distintas))
+        logger.debug("Estadísticas por categoría conciliadas en %.2f s", time.monotonic() - inicio)
+
+    def _reiniciar(self, categorias):
+        # Debe llamarse con el lock tomado; quita los productos de esas categorías
+        categorias = set(categorias)
+        for id in [id for id, (categoria, _) in self._productos.items() if categoria in categorias]:
+            del self._productos[id]
+        for categoria in categorias:
+            self._resumenes.pop(categoria, None)
+
+    def _aplicar(self, ids, productos):
+        # Debe llamarse con el lock tomado
+        for id in ids:
+            anterior = self._productos.pop(id, None)
+            if anterior is not None:
+                categoria, precio = anterior
+                resumen = self._resumenes[categoria]
+                resumen.quitar(precio)
+                if not resumen.productos:
+                    del self._resumenes[categoria]
+        for producto in productos:
+            self._sumar(producto)
+
+    def _sumar(self, producto):
+        # Debe llamarse con el lock tomado
+        id, categoria = producto['id'], producto['categortia_id']
+        if id in self._productos:
+            return
+        precio = _centavos(producto['precio'])
+        self._productos[id] = (categoria, precio)
+        resumen = self._resumenes.get(categoria)
+        if resumen is None:
+            resumen = self._resumenes[categoria] = Resumen()
+        resumen.agregar(precio)
+
+
+def _centavos(valor):
+    # Centavos enteros, redondeados como la columna precio DECIMAL(8,2)
+    if valor is None:
+        return None
+    return int(Decimal(str(valor)).quantize(_CENTAVOS) * 100)
+
+
+def _decimal(centavos):
+    # Decimal con dos decimales, igual que la columna precio DECIMAL(8,2)
+    return Decimal(centavos).scaleb(-2)
+
+
+def get_estadisticas():
+    """
+    Devuelve las estadísticas por categoría de la aplicación actual.
+    """
+    return current_app.extensions['estadisticas']
@@ -0,0 +1,252 @@
+"""
+Propósito: Difusión en vivo de los cambios del catálogo con Server-Sent Events.
+Funcionalidad: Define la extensión DifusorCambios, que alimenta GET /productos/stream. Un único
+hilo por worker vigila el contador de versión compartido (versiones.py), que todos los workers
+incrementan al escribir: el archivo mapeado en memoria hace de canal pub/sub local entre los
+procesos de gunicorn y el registro de cambios (registro_cambios.py) de almacén de mensajes.
+Solo cuando el contador cambia el hilo lee las entradas nuevas, una vez por worker sin importar
+cuántos clientes estén conectados, codifica cada evento una sola vez y lo copia en la cola de
+cada suscriptor. Un cliente que se reconecta con Last-Event-ID recibe primero lo que se perdió,
+leído del registro; las conexiones inactivas reciben un comentario de keepalive periódico.
+
+Cada conexión abierta ocupa un hilo del worker mientras dure; por eso gunicorn.conf.py usa el
+worker de gevent (worker_connections conexiones por worker), que convierte hilos, colas y
+esperas en greenlets sin cambios en este módulo.
+"""
+
+import collections
+import logging
+import threading
+import time
+
+from flask import current_app
+
+from .registro_cambios import ResincronizacionRequerida
+from .repositorios import RepositorioError
+
+logger = logging.getLogger(__name__)
+
+# Tablas cuyos contadores de versión anuncian cambios en el registro
+TABLAS_DIFUNDIDAS = ('producto', 'categoria')
+
+
+class LimiteSuscriptores(Exception):
+    """
+    Se lanza cuando el worker ya tiene SSE_MAX_CLIENTS conexiones; el Blueprint responde 503.
+    """
+
+
+class Suscriptor:
+    """
+    Cola de eventos pendientes de una conexión.
+
+    Attributes:
+        desbordado (bool): La conexión no leyó a tiempo y perdió eventos; debe cerrarse para que
+            el cliente se reconecte con Last-Event-ID.
+    """
+
+    def __init__(self, max_eventos):
+        self.max_eventos = max_eventos
+        self.desbordado = False
+        self._cola = collections.deque()
+        self._aviso = threading.Event()
+
+    def publicar(self, seq, marco):
+        if len(self._cola) >= self.max_eventos:
+            self.desbordado = True
+        else:
+            self._cola.append((seq, marco))
+        self._aviso.set()
+
+    def esperar(self, segundos):
+        """
+        Espera eventos y devuelve los pendientes como [(seq, bytes)]; vacía si pasó el tiempo.
+        """
+        self._aviso.wait(segundos)
+        self._aviso.clear()
+        eventos = []
+        while self._cola:
+            eventos.append(self._cola.popleft())
+        return eventos
+
+
+class DifusorCambios:
+    """
+    Extensión de Flask que reparte los cambios del catálogo entre las conexiones SSE del worker.
+    """
+
+    def __init__(self, app=None):
+        self.keepalive = 15.0
+        self.intervalo = 0.5
+        self.max_clientes = 5000
+        self.max_eventos = 1000
+        self.reintento = 3000
+        self.lote = 500
+        self._registro = None
+        self._versiones = None
+        self._codificar = None
+        self._lock = threading.Lock()
+        self._suscriptores = set()
+        self._marca = None  # última secuencia difundida; None hasta que arranca el hilo
+        self._hilo = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.keepalive = config['SSE_KEEPALIVE']
+        self.intervalo = config['SSE_POLL_INTERVAL']
+        self.max_clientes = config['SSE_MAX_CLIENTS']
+        self.max_eventos = config['SSE_QUEUE_SIZE']
+        self.reintento = config['SSE_RETRY']
+        self.lote = config['PAGE_SIZE_MAX']
+        # Requiere que RegistroCambios y VersionesTablas se hayan inicializado antes
+        self._registro = app.extensions['registro_cambios']
+        self._versiones = app.extensions['versiones']
+        # Los eventos se codifican fuera de la solicitud con el proveedor JSON de la aplicación
+        self._codificar = app.json.codificar
+        app.extensions['eventos'] = self
+
+    def suscribir(self, desde=None):
+        """
+        Registra una conexión y devuelve el generador de su flujo text/event-stream.
+
+        Args:
+            desde (int | None): Last-Event-ID del cliente; None = solo cambios nuevos.
+
+        Raises:
+            LimiteSuscriptores: Si el worker ya tiene SSE_MAX_CLIENTS conexiones.
+            RepositorioError: Si no se puede leer la marca inicial del registro.
+        """
+        self._arrancar()
+        suscriptor = Suscriptor(self.max_eventos)
+        with self._lock:
+            if len(self._suscriptores) >= self.max_clientes:
+                raise LimiteSuscriptores()
+            self._suscriptores.add(suscriptor)
+            marca = self._marca
+        return self._flujo(suscriptor, desde, marca)
+
+    def estado(self):
+        """
+        Devuelve las conexiones abiertas del worker y la última secuencia difundida.
+        """
+        with self._lock:
+            return {"conexiones": len(self._suscriptores), "marca": self._marca}
+
+    def _flujo(self, suscriptor, desde, marca):
+        try:
+            yield f"retry: {self.reintento}\n\n".encode('ascii')
+            enviado = marca if desde is None else desde
+            if desde is not None and desde < marca:
+                # Reanudación: lo perdido hasta la marca del hilo sale del registro; lo posterior
+                # ya está llegando a la cola
+                try:
+                    for seq, marco in self._recuperar(desde, marca):
+                        enviado = max(enviado, seq)
+                        yield marco
+                except RepositorioError as err:
+                    # Se cierra la conexión sin saltar cambios: el cliente reintenta con Last-Event-ID
+                    logger.warning("No se pudieron recuperar los cambios desde %d: %s", desde, err)
+                    return
+            while not suscriptor.desbordado:
+                eventos = suscriptor.esperar(self.keepalive)
+                if not eventos and not suscriptor.desbordado:
+                    yield b": keepalive\n\n"
+                for seq, marco in eventos:
+                    if seq > enviado:
+                        enviado = seq
+                        yield marco
+        finally:
+            with self._lock:
+                self._suscriptores.discard(suscriptor)
+
+    def _recuperar(self, desde, marca):
+        while desde < marca:
+            try:
+                resultado = self._registro.leer(desde, self.lote)
+            except ResincronizacionRequerida as err:
+                yield err.marca_agua, self._marco_resincronizacion(err.marca_agua)
+                return
+            for cambio in resultado['changes']:
+                if cambio['seq'] <= marca:
+                    yield cambio['seq'], self._marco(cambio)
+            if not resultado['has_more']:
+                return
+            desde = resultado['high_water_mark']
+
+    def _arrancar(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is not None:
+                return
+            # Parte de lo ya visible en el registro; lo anterior se recupera con Last-Event-ID
+            self._marca = self._registro.marca_visible()
+            self._hilo = threading.Thread(target=self._vigilar, daemon=True)
+            self._hilo.start()
+
+    def _vigilar(self):
+        vista = self._leer_versiones()
+        # Las escrituras confirmadas justo después de tomar la marca inicial
+        pendiente_hasta = time.monotonic() + self.intervalo
+        while True:
+            time.sleep(self.intervalo)
+            actual = self._leer_versiones()
+            ahora = time.monotonic()
+            if actual != vista:
+                vista = actual
+                # El contador se incrementa después de confirmar: se lee un intervalo más por si
+                # otra escritura confirmó entre la lectura y el aviso
+                pendiente_hasta = ahora + self.intervalo
+            if ahora > pendiente_hasta:
+                continue
+            with self._lock:
+                if not self._suscriptores:
+                    continue
+            try:
+                self._difundir()
+            except RepositorioError as err:
+                logger.warning("No se pudieron difundir los cambios del catálogo: %s", err)
+                pendiente_hasta = max(pendiente_hasta, ahora + self.intervalo)
+
+    def _difundir(self):
+        while True:
+            try:
+                resultado = self._registro.leer(self._marca, self.lote)
+            except ResincronizacionRequerida as err:
+                self._publicar([(err.marca_agua, self._marco_resincronizacion(err.marca_agua))], err.marca_agua)
+                return
+            eventos = [(cambio['seq'], self._marco(cambio)) for cambio in resultado['changes']]
+            self._publicar(eventos, resultado['high_water_mark'])
+            if not resultado['has_more']:
+                return
+
+    def _publicar(self, eventos, marca):
+        with self._lock:
+            self._marca = marca
+            suscriptores = list(self._suscriptores)
+        for seq, marco in eventos:
+            for suscriptor in suscriptores:
+                suscriptor.publicar(seq, marco)
+
+    def _leer_versiones(self):
+        return tuple(self._versiones.leer(tabla) for tabla in TABLAS_DIFUNDIDAS)
+
+    def _marco(self, cambio):
+        # Un evento por registro: event = tabla, id = secuencia, data = cambio en JSON
+        return (
+            f"id: {cambio['seq']}\nevent: {cambio['table']}\ndata: ".encode('ascii')
+            + self._codificar(cambio) + b"\n\n"
+        )
+
+    def _marco_resincronizacion(self, marca):
+        datos = self._codificar({"resync_required": True, "high_water_mark": marca})
+        return f"id: {marca}\nevent: resync\ndata: ".encode('ascii') + datos + b"\n\n"
+
+
+def get_eventos():
+    """
+    Devuelve el difusor de cambios de la aplicación actual.
+    """
+    return current_app.extensions['eventos']
@@ -0,0 +1,146 @@
+"""
+Propósito: Hashea y verifica contraseñas con bcrypt fuera del worker que atiende la solicitud.
+Funcionalidad: Define la extensión HashingContrasenas, que envía bcrypt.hashpw y bcrypt.checkpw a
+un pool de procesos dedicado y acotado. El costo (work factor) es configurable y la cola tiene un
+límite: cuando está llena se lanza HashingSaturado y la aplicación responde 503 con Retry-After
+en lugar de acumular trabajo. También indica si un hash guardado usa un costo distinto del
+configurado para rehashearlo de forma transparente al iniciar sesión.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+import bcrypt
+
+
+class HashingSaturado(Exception):
+    """
+    Se lanza cuando la cola de hashing está llena; la aplicación responde 503.
+    """
+
+
+def _hashear(contrasena, costo):
+    # Se ejecuta en un proceso del pool
+    return bcrypt.hashpw(contrasena, bcrypt.gensalt(rounds=costo)).decode('utf-8')
+
+
+def _verificar(contrasena, hash_guardado):
+    # Se ejecuta en un proceso del pool
+    return bcrypt.checkpw(contrasena, hash_guardado)
+
+
+class HashingContrasenas:
+    """
+    Extensión de Flask con el pool de procesos para bcrypt.
+
+    Con BCRYPT_WORKERS = 0 el hashing se hace en el propio worker (útil en desarrollo).
+    """
+
+    def __init__(self, app=None):
+        self.costo = 12
+        self.procesos = 0
+        self.timeout = 10.0
+        self._pid = None
+        self._pool = None
+        self._cupos = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.costo = config['BCRYPT_ROUNDS']
+        self.procesos = config['BCRYPT_WORKERS']
+        self.timeout = config['BCRYPT_TIMEOUT']
+        # Trabajos admitidos a la vez (en ejecución + en cola) antes de rechazar con 503
+        self._cupos = threading.BoundedSemaphore(config['BCRYPT_MAX_PENDING'])
+        app.extensions['hashing'] = self
+
+    def hashear(self, contrasena):
+        """
+        Genera el hash bcrypt de una contraseña con el costo configurado.
+
+        Returns:
+            str: Hash bcrypt.
+
+        Raises:
+            HashingSaturado: Si la cola de hashing está llena.
+        """
+        return self._ejecutar(_hashear, contrasena.encode('utf-8'), self.costo)
+
+    def verificar(self, contrasena, hash_guardado):
+        """
+        Verifica una contraseña contra su hash bcrypt.
+
+        Returns:
+            bool: True si la contraseña es correcta.
+
+        Raises:
+            HashingSaturado: Si la cola de hashing está llena.
+        """
+        return self._ejecutar(_verificar, contrasena.encode('utf-8'), hash_guardado.encode('utf-8'))
+
+    def requiere_rehash(self, hash_guardado):
+        """
+        Indica si el hash se generó con un costo distinto del configurado.
+        """
+        try:
+            return int(hash_guardado.split('$')[2]) != self.costo
+        except (IndexError, ValueError):
+            return False
+
+    def _ejecutar(self, funcion, *args):
+        if not self._cupos.acquire(blocking=False):
+            raise HashingSaturado("Cola de hashing llena")
+        futuro = None
+        try:
+            pool = self._obtener_pool()
+            if pool is None:
+                return funcion(*args)
+            futuro = pool.submit(funcion, *args)
+        except BrokenProcessPool:
+            self._reiniciar_pool()
+        finally:
+            if futuro is None:
+                self._cupos.release()
+        # El cupo se libera cuando el trabajo termina o se cancela, no cuando la solicitud deja
+        # de esperarlo: así BCRYPT_MAX_PENDING acota también los trabajos vencidos que siguen
+        # en el pool
+        futuro.add_done_callback(self._liberar_cupo)
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TimeoutError:
+            # Si todavía no empezó, no llega a ejecutarse
+            futuro.cancel()
+            raise HashingSaturado("Tiempo de espera de hashing agotado")
+        except BrokenProcessPool:
+            self._reiniciar_pool()
+
+    def _liberar_cupo(self, futuro):
+        self._cupos.release()
+
+    def _reiniciar_pool(self):
+        # Un proceso del pool murió: se recrea en la siguiente llamada
+        self._pid = None
+        raise HashingSaturado("Pool de hashing reiniciándose")
+
+    def _obtener_pool(self):
+        # El pool se crea en cada worker tras el fork; no se hereda del proceso maestro
+        if not self.procesos:
+            return None
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+                    self._pid = os.getpid()
+        return self._pool
+
+
+def get_hashing():
+    """
+    Devuelve el hashing de contraseñas de la aplicación actual.
+    """
+    return current_app.extensions['hashing']
@@ -0,0 +1,437 @@
+"""
+Propósito: Métricas de latencia, tiempo de base de datos y rendimiento por endpoint.
+Funcionalidad: Define la extensión Metricas, que registra en create_app() los hooks de cada
+solicitud (latencia por Blueprint/endpoint, códigos de estado y solicitudes en curso), mide
+cada cursor.execute de los repositorios (duración y filas devueltas) y, mediante el proveedor
+JSON de la aplicación (serializacion.py), separa el tiempo de serialización del tiempo de base
+de datos. Cada worker guarda sus valores en memoria y los vuelca periódicamente a un archivo
+propio en METRICS_DIR; el endpoint /metrics suma los archivos de todos los workers y responde
+en el formato de texto de Prometheus. Los hooks de gunicorn (gunicorn.conf.py) vacían el
+directorio cuando arranca el maestro (limpiar_directorio) y, cuando termina un worker, suman sus
+valores al archivo de los workers retirados y borran el suyo (retirar_worker), de modo que los
+contadores no incluyen ejecuciones anteriores ni bajan si un worker nuevo reutiliza el pid. Sin
+METRICS_DIR, o con la línea de órdenes de Flask, no se escribe en el directorio y /metrics
+muestra solo las métricas del proceso que responde.
+"""
+
+import atexit
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (segundos) de los histogramas de latencia
+BUCKETS_SOLICITUD = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Nombre -> (tipo, ayuda, etiquetas, buckets)
+DEFINICIONES = {
+    'http_requests_total': (
+        'counter', 'Solicitudes atendidas.', ('blueprint', 'endpoint', 'method', 'status'), None),
+    'http_requests_in_flight': (
+        'gauge', 'Solicitudes en curso.', ('blueprint', 'endpoint'), None),
+    'http_request_duration_seconds': (
+        'histogram', 'Latencia total de la solicitud.', ('blueprint', 'endpoint', 'method'),
+        BUCKETS_SOLICITUD),
+    'http_request_db_seconds': (
+        'histogram', 'Tiempo de base de datos por solicitud.', ('blueprint', 'endpoint'),
+        BUCKETS_SOLICITUD),
+    'http_request_serialization_seconds': (
+        'histogram', 'Tiempo de serialización JSON por solicitud.', ('blueprint', 'endpoint'),
+        BUCKETS_SOLICITUD),
+    'db_query_duration_seconds': (
+        'histogram', 'Duración de cada cursor.execute.', ('endpoint',), BUCKETS_CONSULTA),
+    'db_rows_returned_total': (
+        'counter', 'Filas leídas de la base de datos.', ('endpoint',), None),
+}
+
+# Etiqueta de endpoint para consultas hechas fuera de una solicitud (CLI, exportación en curso)
+FUERA_DE_SOLICITUD = '-'
+
+# Archivo con los valores acumulados de los workers que ya terminaron
+ARCHIVO_RETIRADOS = 'retirados.json'
+
+
+class _Medicion(threading.local):
+    # Estado de la solicitud en curso en este hilo
+    inicio = None
+    etiquetas = None
+    db = 0.0
+    serializacion = 0.0
+
+
+class Metricas:
+    """
+    Extensión de Flask que acumula las métricas del proceso y las agrega entre workers.
+
+    Las actualizaciones se hacen en memoria bajo un único lock (una suma y una búsqueda
+    binaria por observación); el volcado a disco ocurre como mucho una vez cada
+    METRICS_FLUSH_INTERVAL segundos.
+    """
+
+    def __init__(self, app=None):
+        self.activa = False
+        self.persistir = False
+        self.directorio = None
+        self.intervalo = 5.0
+        self._lock = threading.Lock()
+        self._medicion = _Medicion()
+        self._contadores = {}  # (nombre, etiquetas) -> valor
+        self._histogramas = {}  # (nombre, etiquetas) -> [conteos por bucket, suma]
+        self._en_curso = {}  # etiquetas -> solicitudes en curso
+        self._ultimo_volcado = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.activa = config['METRICS_ENABLED']
+        self.persistir = self.activa and config['METRICS_PERSIST']
+        self.intervalo = config['METRICS_FLUSH_INTERVAL']
+        self.directorio = config['METRICS_DIR'] or None
+        if self.persistir and not self.directorio:
+            # Un directorio temporal compartido mezclaría ejecuciones y servicios distintos: sin
+            # METRICS_DIR cada worker expone solo sus propias métricas
+            logger.warning("METRICS_DIR no está configurado: /metrics muestra solo las métricas de este proceso")
+            self.persistir = False
+        # La instancia es global: cada aplicación nueva empieza sin valores
+        with self._lock:
+            self._contadores = {}
+            self._histogramas = {}
+            self._en_curso = {}
+        app.extensions['metricas'] = self
+        if not self.activa:
+            return
+        app.before_request(self._antes)
+        app.after_request(self._despues)
+        app.teardown_request(self._al_terminar)
+        # Mide la serialización de jsonify y de current_app.json.dumps
+        # (requiere que create_app() haya instalado ProveedorJSON)
+        app.json.medidor = self
+        # Requiere que Repositorios se haya inicializado antes
+        app.extensions['repositorios'].fuente.medidor = self
+        if self.persistir:
+            os.makedirs(self.directorio, exist_ok=True)
+            atexit.register(self.volcar)
+
+    # Hooks de la solicitud
+
+    def _antes(self):
+        medicion = self._medicion
+        medicion.inicio = time.perf_counter()
+        medicion.etiquetas = (request.blueprint or '', request.endpoint or 'sin_ruta')
+        medicion.db = 0.0
+        medicion.serializacion = 0.0
+        with self._lock:
+            self._en_curso[medicion.etiquetas] = self._en_curso.get(medicion.etiquetas, 0) + 1
+
+    def _despues(self, respuesta):
+        medicion = self._medicion
+        if medicion.inicio is None:
+            return respuesta
+        ahora = time.perf_counter()
+        blueprint, endpoint = medicion.etiquetas
+        metodo = request.method
+        with self._lock:
+            self._sumar('http_requests_total', (blueprint, endpoint, metodo, str(respuesta.status_code)), 1)
+            self._observar('http_request_duration_seconds', (blueprint, endpoint, metodo), ahora - medicion.inicio)
+            self._observar('http_request_db_seconds', medicion.etiquetas, medicion.db)
+            self._observar('http_request_serialization_seconds', medicion.etiquetas, medicion.serializacion)
+        if self.persistir and ahora - self._ultimo_volcado >= self.intervalo:
+            self.volcar()
+        return respuesta
+
+    def _al_terminar(self, error=None):
+        # Se ejecuta siempre, incluso si la solicitud terminó con una excepción
+        medicion = self._medicion
+        if medicion.inicio is None:
+            return
+        with self._lock:
+            self._en_curso[medicion.etiquetas] -= 1
+        medicion.inicio = None
+        medicion.etiquetas = None
+
+    # Mediciones de base de datos y serialización
+
+    def cursor(self, cursor):
+        """
+        Envuelve un cursor de la base de datos para medir sus consultas.
+        """
+        return CursorMedido(cursor, self)
+
+    def consulta(self, segundos):
+        """
+        Registra la duración de un cursor.execute.
+        """
+        medicion = self._medicion
+        etiquetas = (medicion.etiquetas[1],) if medicion.etiquetas else (FUERA_DE_SOLICITUD,)
+        medicion.db += segundos
+        with self._lock:
+            self._observar('db_query_duration_seconds', etiquetas, segundos)
+
+    def lectura(self, filas, segundos):
+        """
+        Registra las filas leídas con un fetch y el tiempo que tomó leerlas.
+        """
+        medicion = self._medicion
+        etiquetas = (medicion.etiquetas[1],) if medicion.etiquetas else (FUERA_DE_SOLICITUD,)
+        medicion.db += segundos
+        with self._lock:
+            self._sumar('db_rows_returned_total', etiquetas, filas)
+
+    def serializacion(self, segundos):
+        """
+        Acumula tiempo de serialización en la solicitud en curso.
+        """
+        self._medicion.serializacion += segundos
+
+    def _sumar(self, nombre, etiquetas, valor):
+        # Debe llamarse con el lock tomado
+        clave = (nombre, etiquetas)
+        self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def _observar(self, nombre, etiquetas, valor):
+        # Debe llamarse con el lock tomado; guarda el conteo de cada bucket sin acumular
+        clave = (nombre, etiquetas)
+        histograma = self._histogramas.get(clave)
+        if histograma is None:
+            buckets = DEFINICIONES[nombre][3]
+            histograma = self._histogramas[clave] = [[0] * (len(buckets) + 1), 0.0]
+        histograma[0][bisect.bisect_left(DEFINICIONES[nombre][3], valor)] += 1
+        histograma[1] += valor
+
+    # Agregación entre workers
+
+    def instantanea(self):
+        """
+        Devuelve una copia serializable de los valores de este proceso.
+        """
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "contadores": [[n, list(e), v] for (n, e), v in self._contadores.items()],
+                "histogramas": [[n, list(e), list(h[0]), h[1]] for (n, e), h in self._histogramas.items()],
+                "en_curso": [[list(e), v] for e, v in self._en_curso.items()],
+            }
+
+    def volcar(self):
+        """
+        Escribe los valores de este proceso en su archivo de METRICS_DIR (reemplazo atómico).
+        """
+        if not self.persistir:
+            return
+        self._ultimo_volcado = time.perf_counter()
+        datos = self.instantanea()
+        try:
+            _escribir(os.path.join(self.directorio, f"worker_{datos['pid']}.json"), datos)
+        except OSError:
+            # Las métricas nunca deben hacer fallar una solicitud
+            pass
+
+    def agregar(self):
+        """
+        Suma los valores de todos los workers: los de este proceso en vivo, los demás desde sus
+        archivos y los de los workers retirados. Las solicitudes en curso solo se suman de los
+        workers vivos.
+        """
+        propio = self.instantanea()
+        contadores, histogramas, en_curso = {}, {}, {}
+        otros = self._leer_otros(propio['pid']) if self.persistir else []
+        for datos in [propio] + list(otros):
+            _acumular(contadores, histogramas, datos)
+            if datos is propio or (datos.get('pid') and _proceso_vivo(datos['pid'])):
+                for etiquetas, valor in datos['en_curso']:
+                    clave = ('http_requests_in_flight', tuple(etiquetas))
+                    en_curso[clave] = en_curso.get(clave, 0) + valor
+        contadores.update(en_curso)
+        return contadores, histogramas
+
+    def _leer_otros(self, pid):
+        rutas = glob.glob(os.path.join(self.directorio, 'worker_*.json'))
+        rutas.append(os.path.join(self.directorio, ARCHIVO_RETIRADOS))
+        for ruta in rutas:
+            if ruta.endswith(f"worker_{pid}.json"):
+                continue
+            datos = _leer(ruta)
+            if datos is not None:
+                yield datos
+
+    def exposicion(self):
+        """
+        Genera el texto de las métricas agregadas en el formato de exposición de Prometheus.
+        """
+        contadores, histogramas = self.agregar()
+        lineas = []
+        for nombre, (tipo, ayuda, nombres_etiquetas, buckets) in DEFINICIONES.items():
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            if tipo != 'histogram':
+                for (metrica, etiquetas), valor in sorted(contadores.items()):
+                    if metrica == nombre:
+                        lineas.append(f"{nombre}{_etiquetas(nombres_etiquetas, etiquetas)} {_numero(valor)}")
+                continue
+            for (metrica, etiquetas), (conteos, suma) in sorted(histogramas.items()):
+                if metrica != nombre:
+                    continue
+                acumulado = 0
+                for limite, conteo in zip(buckets + (float('inf'),), conteos):
+                    acumulado += conteo
+                    le = '+Inf' if limite == float('inf') else repr(limite)
+                    lineas.append(
+                        f"{nombre}_bucket{_etiquetas(nombres_etiquetas, etiquetas, le=le)} {acumulado}")
+                lineas.append(f"{nombre}_sum{_etiquetas(nombres_etiquetas, etiquetas)} {_numero(suma)}")
+                lineas.append(f"{nombre}_count{_etiquetas(nombres_etiquetas, etiquetas)} {acumulado}")
+        return '\n'.join(lineas) + '\n'
+
+
+class CursorMedido:
+    """
+    Envoltura de un cursor que mide execute/executemany y cuenta las filas de cada fetch.
+
+    Delega el resto de atributos (lastrowid, rowcount, close, ...) en el cursor real.
+    """
+
+    __slots__ = ('_cursor', '_metricas')
+
+    def __init__(self, cursor, metricas):
+        self._cursor = cursor
+        self._metricas = metricas
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def execute(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(*args, **kwargs)
+        finally:
+            self._metricas.consulta(time.perf_counter() - inicio)
+
+    def executemany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(*args, **kwargs)
+        finally:
+            self._metricas.consulta(time.perf_counter() - inicio)
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = self._cursor.fetchone()
+        self._metricas.lectura(0 if fila is None else 1, time.perf_counter() - inicio)
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchmany(*args, **kwargs)
+        self._metricas.lectura(len(filas), time.perf_counter() - inicio)
+        return filas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchall()
+        self._metricas.lectura(len(filas), time.perf_counter() - inicio)
+        return filas
+
+
+def limpiar_directorio(directorio):
+    """
+    Borra los archivos de métricas de ejecuciones anteriores. La llama el maestro de gunicorn
+    al arrancar (on_starting), antes de crear los workers.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    for ruta in glob.glob(os.path.join(directorio, 'worker_*.json*')) + [os.path.join(directorio, ARCHIVO_RETIRADOS)]:
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+def retirar_worker(directorio, pid):
+    """
+    Suma los valores de un worker terminado al archivo de los retirados y borra su archivo.
+    La llama el maestro de gunicorn (child_exit) antes de crear el reemplazo, de modo que un
+    worker nuevo con el mismo pid no sobrescribe contadores ya contados. Los valores que el
+    worker no llegó a volcar (terminado con SIGKILL) se pierden.
+    """
+    ruta = os.path.join(directorio, f"worker_{pid}.json")
+    datos = _leer(ruta)
+    if datos is not None:
+        retirados = os.path.join(directorio, ARCHIVO_RETIRADOS)
+        contadores, histogramas = {}, {}
+        for previo in (_leer(retirados), datos):
+            if previo is not None:
+                _acumular(contadores, histogramas, previo)
+        _escribir(retirados, {
+            "pid": None,
+            "contadores": [[n, list(e), v] for (n, e), v in contadores.items()],
+            "histogramas": [[n, list(e), h[0], h[1]] for (n, e), h in histogramas.items()],
+            "en_curso": [],
+        })
+    for sufijo in ('', '.tmp'):
+        try:
+            os.remove(ruta + sufijo)
+        except FileNotFoundError:
+            pass
+
+
+def _acumular(contadores, histogramas, datos):
+    for nombre, etiquetas, valor in datos['contadores']:
+        clave = (nombre, tuple(etiquetas))
+        contadores[clave] = contadores.get(clave, 0) + valor
+    for nombre, etiquetas, conteos, suma in datos['histogramas']:
+        clave = (nombre, tuple(etiquetas))
+        actual = histogramas.setdefault(clave, [[0] * len(conteos), 0.0])
+        actual[0] = [a + b for a, b in zip(actual[0], conteos)]
+        actual[1] += suma
+
+
+def _leer(ruta):
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir(ruta, datos):
+    # Reemplazo atómico: quien lee nunca ve un archivo a medio escribir
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, separators=(',', ':'))
+    os.replace(temporal, ruta)
+
+
+def _proceso_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _etiquetas(nombres, valores, **extra):
+    pares = list(zip(nombres, valores)) + list(extra.items())
+    if not pares:
+        return ''
+    escapar = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{n}="{escapar(v)}"' for n, v in pares) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def get_metricas():
+    """
+    Devuelve las métricas de la aplicación actual.
+    """
+    return current_app.extensions['metricas']
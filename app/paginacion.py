@@ -0,0 +1,238 @@
+"""
+Propósito: Utilidades compartidas de paginación por cursor (keyset), filtrado y ordenamiento.
+Funcionalidad: Lee y valida los parámetros limit, cursor, sort, fields, ids e include de la
+solicitud, codifica y decodifica el cursor opaco next_cursor y construye la cláusula
+WHERE/ORDER BY/LIMIT sobre la columna id, de modo que cada página se resuelve con un recorrido
+del índice primario en lugar de leer la tabla completa.
+"""
+
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+
+from flask import current_app
+
+# Ordenamientos admitidos: solo los que el índice primario (id) resuelve sin ordenar en memoria
+ORDENES = {'id': 'ASC', '-id': 'DESC'}
+
+
+class ParametroInvalido(ValueError):
+    """
+    Se lanza cuando un parámetro de consulta no es válido; los Blueprints responden 400.
+    """
+
+
+def codificar_cursor(ultimo_id, orden):
+    """
+    Codifica la posición de la última fila devuelta como un cursor opaco.
+
+    Args:
+        ultimo_id (int): ID de la última fila de la página.
+        orden (str): Ordenamiento con el que se generó la página.
+
+    Returns:
+        str: Cursor en base64 url-safe.
+    """
+    crudo = json.dumps({"id": ultimo_id, "s": orden}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, orden):
+    """
+    Decodifica un cursor opaco y verifica que corresponda al ordenamiento solicitado.
+
+    Returns:
+        int: ID de la última fila de la página anterior.
+
+    Raises:
+        ParametroInvalido: Si el cursor está mal formado o es de otro ordenamiento.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        ultimo_id = datos['id']
+        orden_cursor = datos['s']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ParametroInvalido("Cursor inválido")
+    if type(ultimo_id) is not int or orden_cursor != orden:
+        raise ParametroInvalido("Cursor inválido")
+    return ultimo_id
+
+
+def leer_entero(args, nombre):
+    """
+    Lee un parámetro entero opcional de la consulta.
+    """
+    valor = args.get(nombre)
+    if valor is None or valor == '':
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ParametroInvalido(f"El parámetro {nombre} debe ser un entero")
+
+
+def leer_decimal(args, nombre):
+    """
+    Lee un parámetro decimal opcional de la consulta.
+    """
+    valor = args.get(nombre)
+    if valor is None or valor == '':
+        return None
+    try:
+        numero = Decimal(valor)
+    except InvalidOperation:
+        raise ParametroInvalido(f"El parámetro {nombre} debe ser numérico")
+    if not numero.is_finite():
+        raise ParametroInvalido(f"El parámetro {nombre} debe ser numérico")
+    return numero
+
+
+def escapar_like(prefijo):
+    """
+    Escapa los comodines de LIKE para buscar el prefijo de forma literal.
+    """
+    return prefijo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def leer_campos(args, columnas, requeridos=()):
+    """
+    Lee el parámetro fields (columnas separadas por comas) y lo valida contra las permitidas.
+
+    Args:
+        args: Parámetros de la consulta.
+        columnas (tuple[str]): Columnas permitidas, en el orden de la tabla.
+        requeridos (tuple[str]): Columnas que se leen aunque no se pidan (por ejemplo, la
+            clave foránea de una relación incluida con include).
+
+    Returns:
+        tuple[str] | None: Columnas pedidas más id, en el orden de la tabla; None si no se
+        indicó fields o pide todas (equivale a SELECT *).
+    """
+    valor = args.get('fields')
+    if not valor:
+        return None
+    campos = {campo.strip() for campo in valor.split(',') if campo.strip()}
+    if not campos or not campos <= set(columnas):
+        raise ParametroInvalido("fields admite: " + ", ".join(columnas))
+    # id se incluye siempre: lo usan el cursor de la página siguiente y la invalidación de la caché
+    campos.add('id')
+    campos.update(requeridos)
+    if len(campos) == len(columnas):
+        return None
+    return tuple(columna for columna in columnas if columna in campos)
+
+
+def leer_ids(args, nombre='ids'):
+    """
+    Lee una lista de IDs separados por comas, sin repetidos y en el orden pedido.
+
+    Returns:
+        list[int] | None: IDs, o None si no se indicó el parámetro.
+    """
+    valor = args.get(nombre)
+    if valor is None:
+        return None
+    try:
+        ids = [int(id) for id in valor.split(',') if id.strip()]
+    except ValueError:
+        raise ParametroInvalido(f"{nombre} debe ser una lista de enteros separados por comas")
+    maximo = current_app.config['PAGE_SIZE_MAX']
+    if not 1 <= len(ids) <= maximo:
+        raise ParametroInvalido(f"{nombre} debe tener entre 1 y {maximo} IDs")
+    return list(dict.fromkeys(ids))
+
+
+def leer_incluir(args, relaciones):
+    """
+    Lee el parámetro include (relaciones separadas por comas) y lo valida.
+
+    Args:
+        relaciones (tuple[str]): Relaciones que se pueden incluir.
+
+    Returns:
+        frozenset[str]: Relaciones pedidas (vacío si no se indicó include).
+    """
+    incluir = frozenset(r.strip() for r in args.get('include', '').split(',') if r.strip())
+    if not incluir <= set(relaciones):
+        raise ParametroInvalido("include admite: " + ", ".join(relaciones))
+    return incluir
+
+
+def leer_limite(args):
+    """
+    Lee el parámetro limit, con el valor por defecto y el máximo de la configuración.
+    """
+    config = current_app.config
+    limite = leer_entero(args, 'limit')
+    if limite is None:
+        limite = config['PAGE_SIZE_DEFAULT']
+    if not 1 <= limite <= config['PAGE_SIZE_MAX']:
+        raise ParametroInvalido(f"limit debe estar entre 1 y {config['PAGE_SIZE_MAX']}")
+    return limite
+
+
+class Pagina:
+    """
+    Parámetros de paginación de una solicitud de listado.
+
+    Attributes:
+        limite (int): Número máximo de filas de la página.
+        orden (str): Ordenamiento ('id' o '-id').
+        despues_de (int | None): ID de la última fila de la página anterior.
+    """
+
+    def __init__(self, args):
+        self.limite = leer_limite(args)
+        self.orden = args.get('sort', 'id')
+        if self.orden not in ORDENES:
+            raise ParametroInvalido("sort debe ser uno de: " + ", ".join(ORDENES))
+        cursor = args.get('cursor')
+        self.despues_de = decodificar_cursor(cursor, self.orden) if cursor else None
+
+    def sql(self, condiciones, parametros):
+        """
+        Completa una consulta de listado con el rango del cursor, el orden y el límite.
+
+        Args:
+            condiciones (list[str]): Condiciones de filtro ya construidas (se modifica).
+            parametros (list): Parámetros de las condiciones (se modifica).
+
+        Returns:
+            str: Cláusula WHERE/ORDER BY/LIMIT. Pide una fila extra para saber si hay más.
+        """
+        direccion = ORDENES[self.orden]
+        if self.despues_de is not None:
+            condiciones.append("id > %s" if direccion == 'ASC' else "id < %s")
+            parametros.append(self.despues_de)
+        where = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+        parametros.append(self.limite + 1)
+        return f"{where} ORDER BY id {direccion} LIMIT %s"
+
+    def resultado(self, filas):
+        """
+        Recorta la fila extra y arma la respuesta con el cursor de la página siguiente.
+
+        Returns:
+            dict: {"data": filas, "next_cursor": cursor o None}.
+        """
+        siguiente = None
+        if len(filas) > self.limite:
+            filas = filas[:self.limite]
+            siguiente = codificar_cursor(filas[-1]['id'], self.orden)
+        return {"data": filas, "next_cursor": siguiente}
+
+    def rango(self, resultado):
+        """
+        Calcula el rango de ids que cubre una página, para invalidarla al escribir en él.
+
+        Returns:
+            tuple: (desde, hasta) inclusivos; None indica un extremo abierto.
+        """
+        filas = resultado['data']
+        limite_cursor = self.despues_de
+        fin = filas[-1]['id'] if resultado['next_cursor'] is not None else None
+        if ORDENES[self.orden] == 'ASC':
+            return (None if limite_cursor is None else limite_cursor + 1, fin)
+        return (fin, None if limite_cursor is None else limite_cursor - 1)
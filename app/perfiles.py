@@ -0,0 +1,107 @@
+"""
+Propósito: Caché de los perfiles de usuario para /auth/me y claims de perfil en los tokens.
+Funcionalidad: Define la extensión PerfilesUsuarios, que lee el perfil (id, numero, nombre y
+apellido) de un usuario por la identidad del JWT a través de una caché en memoria con TTL
+(CacheMemoria). Quien modifique o elimine un usuario debe llamar a invalidar(id); un cambio hecho
+directamente en la base se ve al vencer el TTL (PROFILE_CACHE_TTL). Con AUTH_PROFILE_CLAIMS el
+perfil se incluye como claim en los tokens emitidos en /login, /register y /refresh, que lo lee
+con obtener(): un token de acceso nuevo nunca lleva un perfil más antiguo que el TTL, y un
+usuario eliminado no obtiene más tokens. Así /auth/me responde sin consultar la base. El perfil
+de un token de acceso puede estar desactualizado hasta que el token expira.
+"""
+
+from flask import current_app
+
+from .cache import CacheMemoria
+
+# Columnas del perfil; ninguna es sensible (la contraseña nunca forma parte del perfil)
+CAMPOS_PERFIL = ('id', 'numero', 'nombre', 'apellido')
+
+# Nombre del claim de los tokens con el perfil
+CLAIM_PERFIL = 'perfil'
+
+
+class PerfilesUsuarios:
+    """
+    Extensión de Flask con la caché de perfiles de usuario.
+    """
+
+    def __init__(self, app=None):
+        self.activa = False
+        self.claims = False
+        self._cache = None
+        self._repos = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.activa = config['PROFILE_CACHE_TTL'] > 0
+        self.claims = config['AUTH_PROFILE_CLAIMS']
+        self._cache = CacheMemoria(config['PROFILE_CACHE_MAX_ENTRIES'], config['PROFILE_CACHE_TTL'])
+        # Requiere que Repositorios se haya inicializado antes
+        self._repos = app.extensions['repositorios']
+        app.extensions['perfiles'] = self
+
+    def obtener(self, id):
+        """
+        Devuelve el perfil de un usuario desde la caché o, si no está, desde la base.
+
+        Args:
+            id: Identidad del JWT (ID del usuario).
+
+        Returns:
+            dict | None: id, numero, nombre y apellido, o None si el usuario no existe.
+
+        Raises:
+            RepositorioError: Si falla la consulta.
+        """
+        clave = str(id)
+        if self.activa:
+            perfil = self._cache.get(clave)
+            if perfil is not None:
+                return perfil
+        perfil = self._repos.usuarios.perfil(id)
+        if perfil is not None and self.activa:
+            self._cache.set(clave, perfil)
+        return perfil
+
+    def invalidar(self, id):
+        """
+        Quita de la caché el perfil de un usuario modificado o eliminado.
+
+        Args:
+            id: ID del usuario.
+        """
+        self._cache.delete_many([str(id)])
+
+    def claims_de(self, perfil):
+        """
+        Devuelve los claims adicionales de los tokens de un usuario ({} si están desactivados o
+        no hay perfil).
+        """
+        if not self.claims or perfil is None:
+            return {}
+        return {CLAIM_PERFIL: {campo: perfil[campo] for campo in CAMPOS_PERFIL}}
+
+    def desde_claims(self, claims):
+        """
+        Devuelve el perfil incluido en los claims de un token o None si no lo tiene.
+        """
+        if not self.claims:
+            return None
+        perfil = claims.get(CLAIM_PERFIL)
+        return perfil if isinstance(perfil, dict) else None
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la caché de perfiles.
+        """
+        return dict(self._cache.estadisticas(), activa=self.activa, claims=self.claims)
+
+
+def get_perfiles():
+    """
+    Devuelve la caché de perfiles de la aplicación actual.
+    """
+    return current_app.extensions['perfiles']
@@ -0,0 +1,23 @@
+"""
+Propósito: Controles de acceso comunes a los Blueprints.
+Funcionalidad: Define el decorador admin_requerido, que exige un token JWT válido cuyo usuario
+figure en la lista ADMIN_USUARIOS de la configuración; en caso contrario responde 403.
+"""
+
+from functools import wraps
+
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+
+def admin_requerido(funcion):
+    """
+    Protege una ruta para que solo la usen los administradores (ADMIN_USUARIOS).
+    """
+    @wraps(funcion)
+    @jwt_required()
+    def envoltura(*args, **kwargs):
+        if str(get_jwt_identity()) not in current_app.config['ADMIN_USUARIOS']:
+            return jsonify({"error": "Acceso restringido a administradores"}), 403
+        return funcion(*args, **kwargs)
+    return envoltura
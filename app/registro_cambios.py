@@ -0,0 +1,173 @@
+"""
+Propósito: Sincronización incremental del catálogo (GET /changes).
+Funcionalidad: Define la extensión RegistroCambios, que lee el registro de cambios que los
+repositorios escriben en la tabla cambio dentro de la misma transacción que cada creación,
+actualización o eliminación de productos y categorías (incluidos los productos eliminados en
+cascada con su categoría). Un cliente pide los cambios posteriores a la última secuencia que
+aplicó y recibe, por registro, el estado actual (upsert) o una lápida (delete), junto con la
+nueva marca de agua. En segundo plano compacta el registro: quita las entradas reemplazadas por
+otra posterior del mismo registro y las más antiguas que CHANGES_RETENTION; si la secuencia del
+cliente es anterior a lo conservado, se le pide una resincronización completa.
+
+Garantía: las secuencias se reservan en la transacción de cada escritura con un contador de
+fila bloqueada (tabla cambio_secuencia), así que se confirman en orden y una entrada visible
+implica que todas las de secuencia menor ya están confirmadas o no existirán (transacción
+revertida). Un cliente que avanza hasta high_water_mark no salta ningún cambio; lo que sí puede
+perder son entradas compactadas, y entonces recibe 410 (resincronización).
+"""
+
+import logging
+import threading
+import time
+
+from flask import current_app
+
+from .repositorios import CAMBIO_DELETE, CAMBIO_UPSERT, RepositorioError
+
+logger = logging.getLogger(__name__)
+
+
+class ResincronizacionRequerida(Exception):
+    """
+    Se lanza cuando la secuencia del cliente es anterior a la última compactada; el cliente
+    debe volver a descargar el catálogo completo y continuar desde marca_agua.
+
+    Attributes:
+        marca_agua (int): Última secuencia registrada.
+    """
+
+    def __init__(self, marca_agua):
+        super().__init__("Resincronización requerida")
+        self.marca_agua = marca_agua
+
+
+class RegistroCambios:
+    """
+    Extensión de Flask con la lectura y la compactación del registro de cambios.
+
+    Las entradas se entregan en cuanto se confirman: el contador de secuencias serializa las
+    escrituras desde que registran su cambio hasta que confirman, de modo que nunca se confirma
+    una secuencia menor que otra ya visible.
+    """
+
+    def __init__(self, app=None):
+        self.retencion = 7 * 86400.0
+        self.intervalo = 3600.0
+        self.lote = 5000
+        self._repos = None
+        self._lock = threading.Lock()
+        self._compactando = False
+        self._ultima_compactacion = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.retencion = config['CHANGES_RETENTION']
+        self.intervalo = config['CHANGES_COMPACT_INTERVAL']
+        self.lote = config['CHANGES_COMPACT_BATCH']
+        # Requiere que Repositorios se haya inicializado antes
+        self._repos = app.extensions['repositorios']
+        # La primera compactación espera un intervalo completo desde el arranque
+        self._ultima_compactacion = time.monotonic()
+        app.extensions['registro_cambios'] = self
+
+    def leer(self, desde, limite):
+        """
+        Devuelve los cambios posteriores a una secuencia, uno por registro.
+
+        Args:
+            desde (int): Última secuencia que el cliente aplicó (0 = desde el principio).
+            limite (int): Entradas del registro a recorrer como máximo.
+
+        Returns:
+            dict: {"changes": [...], "high_water_mark": secuencia, "has_more": bool}. Cada cambio
+            tiene seq, table, id y op ('upsert' con data o 'delete').
+
+        Raises:
+            ResincronizacionRequerida: Si desde es anterior a lo conservado en el registro.
+        """
+        filas = self._repos.cambios.leer(desde, limite + 1)
+        # El horizonte se lee después de las entradas: una compactación entre ambas lecturas
+        # se detecta aquí en lugar de entregar una página con huecos
+        horizonte, ultima = self._repos.cambios.limites()
+        self._programar_compactacion()
+        if desde < horizonte or desde > ultima:
+            raise ResincronizacionRequerida(ultima)
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        # Solo interesa la última entrada de cada registro dentro de la página
+        ultimas = {}
+        for fila in filas:
+            ultimas[(fila['tabla'], fila['registro_id'])] = fila
+        escritos = {'producto': [], 'categoria': []}
+        for (tabla, id), fila in ultimas.items():
+            if fila['operacion'] == CAMBIO_UPSERT:
+                escritos[tabla].append(id)
+        actuales = {}
+        if escritos['producto']:
+            for producto in self._repos.productos.obtener_varios(escritos['producto']):
+                actuales[('producto', producto['id'])] = producto
+        if escritos['categoria']:
+            for categoria in self._repos.categorias.obtener_varios(escritos['categoria']):
+                actuales[('categoria', categoria['id'])] = categoria
+        cambios = []
+        for clave, fila in sorted(ultimas.items(), key=lambda item: item[1]['seq']):
+            cambio = {"seq": fila['seq'], "table": clave[0], "id": clave[1]}
+            actual = actuales.get(clave)
+            if actual is None:
+                # Eliminado, o actualizado y eliminado después en una entrada de otra página
+                cambio["op"] = CAMBIO_DELETE
+            else:
+                cambio["op"] = CAMBIO_UPSERT
+                cambio["data"] = actual
+            cambios.append(cambio)
+        return {
+            "changes": cambios,
+            "high_water_mark": filas[-1]['seq'] if filas else desde,
+            "has_more": hay_mas,
+        }
+
+    def marca_visible(self):
+        """
+        Devuelve la última secuencia que leer() ya puede entregar.
+        """
+        return self._repos.cambios.limites()[1]
+
+    def compactar(self):
+        """
+        Compacta el registro de inmediato.
+
+        Returns:
+            int: Entradas eliminadas.
+        """
+        antes_de = int((time.time() - self.retencion) * 1000)
+        eliminadas = self._repos.cambios.compactar(antes_de, self.lote)
+        if eliminadas:
+            logger.info("Registro de cambios compactado: %d entradas eliminadas", eliminadas)
+        return eliminadas
+
+    def _programar_compactacion(self):
+        ahora = time.monotonic()
+        with self._lock:
+            if self._compactando or ahora - self._ultima_compactacion < self.intervalo:
+                return
+            self._compactando = True
+        threading.Thread(target=self._compactar_en_segundo_plano, daemon=True).start()
+
+    def _compactar_en_segundo_plano(self):
+        try:
+            self.compactar()
+        except RepositorioError as err:
+            logger.warning("No se pudo compactar el registro de cambios: %s", err)
+        finally:
+            with self._lock:
+                self._compactando = False
+                self._ultima_compactacion = time.monotonic()
+
+
+def get_registro_cambios():
+    """
+    Devuelve el registro de cambios de la aplicación actual.
+    """
+    return current_app.extensions['registro_cambios']
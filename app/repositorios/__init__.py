@@ -0,0 +1,83 @@
+"""
+Propósito: Capa de repositorios que separa el acceso a datos de las rutas de la aplicación.
+Funcionalidad: Define la extensión Repositorios, que create_app() inicializa según la variable
+REPOSITORY_BACKEND ('mysql' o 'sqlite'), y get_repos(), con la que los Blueprints obtienen los
+repositorios de productos, categorías y usuarios, el registro de cambios y el progreso de las
+importaciones masivas de la aplicación actual.
+"""
+
+import logging
+
+from flask import current_app
+
+from .base import (
+    ACTUALIZADO, CAMBIO_DELETE, CAMBIO_UPSERT, COLUMNAS_CATEGORIA, COLUMNAS_PRODUCTO, SIN_CATEGORIA,
+    SIN_PRODUCTO, CambioRepo, CategoriaInexistente, CategoriaRepo, ImportacionRepo, ProductoRepo,
+    RepositorioError, UsuarioRepo,
+)
+from .sql import (
+    CambioRepoSQL, CategoriaRepoSQL, IdsCategorias, ImportacionRepoSQL, ProductoRepoSQL, UsuarioRepoSQL,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConjuntoRepositorios:
+    """
+    Repositorios de una aplicación sobre una misma fuente de datos.
+
+    Args:
+        fuente (Fuente): Origen de datos.
+        ttl_categorias (float): Segundos entre recargas de los IDs de categoría conocidos.
+    """
+
+    def __init__(self, fuente, ttl_categorias=300.0):
+        self.fuente = fuente
+        self.ids_categorias = IdsCategorias(fuente, ttl_categorias)
+        self.productos = ProductoRepoSQL(fuente, self.ids_categorias)
+        self.categorias = CategoriaRepoSQL(fuente, self.ids_categorias)
+        self.usuarios = UsuarioRepoSQL(fuente)
+        self.cambios = CambioRepoSQL(fuente)
+        self.importaciones = ImportacionRepoSQL(fuente)
+
+
+class Repositorios:
+    """
+    Extensión de Flask que crea los repositorios del backend configurado.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config['REPOSITORY_BACKEND']
+        if backend == 'mysql':
+            from .mysql import FuenteMySQL
+            # Requiere que BaseDatos haya creado el pool antes
+            fuente = FuenteMySQL(
+                app.extensions['db_pool'],
+                carga_local=app.config['MYSQL_LOCAL_INFILE'],
+                max_sentencias=app.config['MYSQL_STATEMENT_CACHE_SIZE'],
+                umbral_preparacion=app.config['MYSQL_PREPARE_THRESHOLD'],
+            )
+        elif backend == 'sqlite':
+            from .sqlite import FuenteSQLite
+            fuente = FuenteSQLite(app.config['SQLITE_DATABASE'], app.config['SQLITE_SEED_FILE'])
+        else:
+            raise ValueError(f"REPOSITORY_BACKEND desconocido: {backend}")
+        repos = ConjuntoRepositorios(fuente, app.config['CATEGORY_IDS_TTL'])
+        try:
+            # Carga los IDs de categoría al iniciar; si falla, se cargan en la primera escritura
+            repos.ids_categorias.cargar()
+        except RepositorioError as err:
+            logger.warning("No se pudieron cargar los IDs de categoría: %s", err)
+        app.extensions['repositorios'] = repos
+
+
+def get_repos():
+    """
+    Devuelve los repositorios de la aplicación actual.
+    """
+    return current_app.extensions['repositorios']
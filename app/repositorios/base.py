@@ -0,0 +1,329 @@
+"""
+Propósito: Define las interfaces de los repositorios de datos de la aplicación.
+Funcionalidad: Declara ProductoRepo, CategoriaRepo, UsuarioRepo, CambioRepo e ImportacionRepo con
+las operaciones que usan los Blueprints y los comandos de la CLI, junto con los errores comunes a todos los backends. Los Blueprints dependen solo
+de estas interfaces; la implementación (MySQL o SQLite) se elige en create_app().
+"""
+
+
+class RepositorioError(Exception):
+    """
+    Error del backend de datos (conexión, consulta o restricción); los Blueprints responden 500.
+    """
+
+
+class CategoriaInexistente(Exception):
+    """
+    Se lanza al crear o actualizar un producto con una categortia_id que no existe.
+    """
+
+
+# Columnas que se pueden pedir con fields=, en el orden de la tabla (id siempre se incluye)
+COLUMNAS_PRODUCTO = ('id', 'nombre', 'precio', 'descripcion', 'categortia_id')
+COLUMNAS_CATEGORIA = ('id', 'nombre')
+
+
+# Resultado de cada elemento de ProductoRepo.actualizar_lote()
+ACTUALIZADO = 'actualizado'
+SIN_PRODUCTO = 'sin_producto'
+SIN_CATEGORIA = 'sin_categoria'
+
+
+# Operaciones del registro de cambios (CambioRepo)
+CAMBIO_UPSERT = 'upsert'
+CAMBIO_DELETE = 'delete'
+
+
+class ProductoRepo:
+    """
+    Operaciones sobre la tabla producto.
+    """
+
+    def listar(self, filtros, pagina, campos=None):
+        """
+        Devuelve las filas de una página de productos.
+
+        Args:
+            filtros (dict): categortia_id, precio_min, precio_max y nombre (prefijo), opcionales.
+            pagina (Pagina): Límite, orden y cursor de la página.
+            campos (tuple[str] | None): Columnas a leer (de COLUMNAS_PRODUCTO); None = todas.
+
+        Returns:
+            list[dict]: Hasta pagina.limite + 1 filas.
+        """
+        raise NotImplementedError
+
+    def iterar(self, tamano_lote):
+        """
+        Recorre todos los productos ordenados por id en lotes, con memoria constante.
+
+        Returns:
+            generator[list[dict]]: Lotes de hasta tamano_lote filas.
+        """
+        raise NotImplementedError
+
+    def obtener(self, id, campos=None):
+        """
+        Devuelve el producto (solo las columnas de campos, si se indican) o None si no existe.
+        """
+        raise NotImplementedError
+
+    def obtener_varios(self, ids, campos=None):
+        """
+        Devuelve los productos existentes entre los IDs indicados, en cualquier orden, con una
+        sola consulta.
+        """
+        raise NotImplementedError
+
+    def precios(self, categorias=None):
+        """
+        Devuelve id, categortia_id y precio de los productos, para las estadísticas por categoría.
+
+        Args:
+            categorias (list[int] | None): Limita la lectura a esas categorías; None = todas.
+        """
+        raise NotImplementedError
+
+    def resumen_por_categoria(self):
+        """
+        Agrega los productos por categoría con GROUP BY (recorre la tabla).
+
+        Returns:
+            list[dict]: categortia_id, productos, suma, minimo y maximo de precio por categoría.
+        """
+        raise NotImplementedError
+
+    def buscar(self, terminos, limite, despues=None):
+        """
+        Busca productos por texto completo (nombre y descripción) ordenados por relevancia.
+
+        Args:
+            terminos (list[str]): Términos normalizados; cada uno debe aparecer como prefijo.
+            limite (int): Número de filas a devolver.
+            despues (tuple | None): (relevancia, id) de la última fila de la página anterior.
+
+        Returns:
+            list[dict]: Filas con la columna adicional relevancia.
+        """
+        raise NotImplementedError
+
+    def crear(self, nombre, precio, descripcion, categortia_id):
+        """
+        Inserta un producto y devuelve su ID.
+
+        Raises:
+            CategoriaInexistente: Si la categoría no existe.
+        """
+        raise NotImplementedError
+
+    def actualizar(self, id, nombre, precio, descripcion, categortia_id):
+        """
+        Actualiza un producto y devuelve True si existía.
+
+        Raises:
+            CategoriaInexistente: Si la categoría no existe.
+        """
+        raise NotImplementedError
+
+    def eliminar(self, id):
+        """
+        Elimina un producto y devuelve True si existía.
+        """
+        raise NotImplementedError
+
+    def crear_lote(self, filas):
+        """
+        Inserta varios productos en una sola transacción.
+
+        Args:
+            filas (list[tuple]): (nombre, precio, descripcion, categortia_id) por producto.
+
+        Returns:
+            list[int | None]: ID creado por fila, o None si su categoría no existe.
+        """
+        raise NotImplementedError
+
+    def actualizar_lote(self, filas):
+        """
+        Actualiza varios productos en una sola transacción.
+
+        Args:
+            filas (list[tuple]): (id, (nombre, precio, descripcion, categortia_id)) por producto.
+
+        Returns:
+            list[str]: ACTUALIZADO, SIN_PRODUCTO o SIN_CATEGORIA por fila.
+        """
+        raise NotImplementedError
+
+    def eliminar_lote(self, ids):
+        """
+        Elimina varios productos en una sola transacción.
+
+        Returns:
+            set[int]: IDs que existían y se eliminaron.
+        """
+        raise NotImplementedError
+
+    def importar(self, filas, progreso=None):
+        """
+        Inserta un lote de una importación masiva en una sola transacción, con una sola sentencia
+        (sin verificar categorías: la CLI las resuelve antes) y lo anota en el registro de cambios.
+
+        Args:
+            filas (list[tuple]): (nombre, precio, descripcion, categortia_id) por producto.
+            progreso (tuple[str, int] | None): Clave de la importación y registros del archivo
+                procesados con este lote, que se guardan en la misma transacción.
+        """
+        raise NotImplementedError
+
+
+class CategoriaRepo:
+    """
+    Operaciones sobre la tabla categortia.
+    """
+
+    def listar(self, filtros, pagina, campos=None):
+        """
+        Devuelve las filas de una página de categorías.
+
+        Args:
+            filtros (dict): nombre (prefijo), opcional.
+            pagina (Pagina): Límite, orden y cursor de la página.
+            campos (tuple[str] | None): Columnas a leer (de COLUMNAS_CATEGORIA); None = todas.
+        """
+        raise NotImplementedError
+
+    def obtener(self, id, campos=None):
+        """
+        Devuelve la categoría (solo las columnas de campos, si se indican) o None si no existe.
+        """
+        raise NotImplementedError
+
+    def obtener_varios(self, ids):
+        """
+        Devuelve las categorías existentes entre los IDs indicados, en cualquier orden, con una
+        sola consulta.
+        """
+        raise NotImplementedError
+
+    def iterar(self, tamano_lote):
+        """
+        Recorre todas las categorías ordenadas por id en lotes, con memoria constante.
+        """
+        raise NotImplementedError
+
+    def crear(self, nombre):
+        """
+        Inserta una categoría y devuelve su ID.
+        """
+        raise NotImplementedError
+
+    def actualizar(self, id, nombre):
+        """
+        Actualiza una categoría y devuelve True si existía.
+        """
+        raise NotImplementedError
+
+    def eliminar(self, id):
+        """
+        Elimina una categoría y sus productos (ON DELETE CASCADE).
+
+        Returns:
+            tuple[bool, list[int]]: Si existía y los IDs de los productos eliminados en cascada.
+        """
+        raise NotImplementedError
+
+    def importar(self, nombres, progreso=None):
+        """
+        Inserta un lote de categorías de una importación masiva (ver ProductoRepo.importar()).
+        """
+        raise NotImplementedError
+
+
+class CambioRepo:
+    """
+    Registro de cambios del catálogo (tabla cambio), escrito por ProductoRepo y CategoriaRepo en
+    la misma transacción que cada creación, actualización o eliminación.
+    """
+
+    def leer(self, desde, limite):
+        """
+        Devuelve las entradas posteriores a una secuencia, en orden de secuencia.
+
+        Args:
+            desde (int): Última secuencia que el cliente ya aplicó.
+            limite (int): Número máximo de entradas.
+
+        Returns:
+            list[dict]: seq, tabla, registro_id y operacion de cada entrada.
+        """
+        raise NotImplementedError
+
+    def limites(self):
+        """
+        Devuelve (horizonte, ultima): la última secuencia eliminada por la compactación y la
+        última registrada.
+        """
+        raise NotImplementedError
+
+    def compactar(self, antes_de, max_entradas):
+        """
+        Elimina las entradas reemplazadas por otra posterior del mismo registro y las registradas
+        antes de un instante; estas últimas avanzan el horizonte.
+
+        Args:
+            antes_de (int): Instante (ms) a partir del cual se conservan todas las entradas.
+            max_entradas (int): Máximo de entradas reemplazadas a eliminar en una llamada.
+
+        Returns:
+            int: Entradas eliminadas.
+        """
+        raise NotImplementedError
+
+
+class ImportacionRepo:
+    """
+    Progreso de las importaciones masivas (tabla importacion).
+    """
+
+    def progreso(self, clave):
+        """
+        Devuelve los registros del archivo ya importados con la clave, o 0.
+        """
+        raise NotImplementedError
+
+
+class UsuarioRepo:
+    """
+    Operaciones sobre la tabla usuario.
+    """
+
+    def por_numero(self, numero):
+        """
+        Devuelve el usuario completo (incluido el hash de la contraseña) o None.
+        """
+        raise NotImplementedError
+
+    def existe_numero(self, numero):
+        """
+        Indica si ya hay un usuario registrado con el número.
+        """
+        raise NotImplementedError
+
+    def perfil(self, id):
+        """
+        Devuelve id, numero, nombre y apellido del usuario o None.
+        """
+        raise NotImplementedError
+
+    def crear(self, numero, nombre, apellido, contrasena):
+        """
+        Inserta un usuario con la contraseña ya hasheada y devuelve su ID.
+        """
+        raise NotImplementedError
+
+    def actualizar_contrasena(self, id, contrasena):
+        """
+        Reemplaza el hash de la contraseña del usuario.
+        """
+        raise NotImplementedError
@@ -0,0 +1,312 @@
+"""
+Propósito: Origen de datos MySQL de los repositorios.
+Funcionalidad: Define FuenteMySQL, que toma las conexiones del pool compartido (db.py), ejecuta
+las consultas repetidas como sentencias preparadas del servidor (CursorPreparado), inserta lotes
+con un único INSERT de varias filas (executemany), carga las importaciones masivas con LOAD DATA
+LOCAL INFILE cuando está habilitado y recorre tablas completas con un cursor sin buffer para
+exportarlas en streaming.
+
+Una sentencia preparada se analiza una sola vez por conexión y sus resultados llegan en el
+protocolo binario: los enteros no se convierten desde texto y en cada ejecución solo viajan el
+identificador y los parámetros. Cada conexión del pool guarda sus sentencias en una caché LRU
+que sobrevive a los préstamos y se pierde con la conexión.
+"""
+
+import logging
+import os
+import tempfile
+
+import mysql.connector
+from mysql.connector.cursor import MySQLCursorPreparedDict
+
+try:
+    from mysql.connector.cursor_cext import CMySQLCursorPreparedDict
+except ImportError:  # mysql-connector sin la extensión en C
+    CMySQLCursorPreparedDict = None
+
+from .base import RepositorioError
+from .sql import Fuente
+
+logger = logging.getLogger(__name__)
+
+# Errores de clave foránea: fila referenciada inexistente (ER_NO_REFERENCED_ROW y _2)
+_CLAVE_FORANEA = (1216, 1452)
+
+# Errores con los que el cliente o el servidor rechazan LOAD DATA LOCAL INFILE
+_CARGA_LOCAL_RECHAZADA = (1148, 2068, 3948)
+
+# Caracteres que LOAD DATA interpreta en el formato por defecto (tabuladores, \ como escape)
+_ESCAPES_CARGA = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+# Sentencias que se pueden preparar; el resto (LOAD DATA, EXPLAIN, ...) se envía como texto
+_PREPARABLES = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Sentencia preparada que el servidor ya no conoce (ER_UNKNOWN_STMT_HANDLER)
+_SENTENCIA_DESCONOCIDA = 1243
+
+# Marca de la caché para las sentencias que nunca se preparan
+_TEXTO = -1
+
+
+class _SentenciaPura(MySQLCursorPreparedDict):
+    """
+    Cursor de una sentencia preparada (mysql-connector en Python puro).
+
+    execute() de mysql.connector envía COM_STMT_RESET antes de cada ejecución, un viaje de ida
+    y vuelta que solo hace falta con parámetros enviados por partes (send_long_data), que aquí
+    no se usan; reejecutar() omite ese paso.
+    """
+
+    def reejecutar(self, parametros):
+        self._nextrow = (None, None)
+        resultado = self._connection.cmd_stmt_execute(
+            self._prepared['statement_id'], data=parametros, parameters=self._prepared['parameters']
+        )
+        self._handle_result(resultado)
+
+
+if CMySQLCursorPreparedDict is not None:
+    class _SentenciaC(CMySQLCursorPreparedDict):
+        """
+        Cursor de una sentencia preparada (extensión en C); reejecutar() omite mysql_stmt_reset.
+        """
+
+        def reejecutar(self, parametros):
+            self._nextrow = (None, None)
+            resultado = self._connection.cmd_stmt_execute(self._stmt, *parametros)
+            if resultado:
+                self._handle_result(resultado)
+else:
+    _SentenciaC = None
+
+
+class CursorPreparado:
+    """
+    Cursor de FuenteMySQL que ejecuta como sentencia preparada cada consulta que se repite en
+    la misma conexión.
+
+    La caché de la conexión (ConexionPool.sentencias) asocia cada SQL con las veces que se
+    ejecutó como texto o, a partir de umbral ejecuciones, con el cursor de su sentencia
+    preparada; así las consultas de una sola vez (listas IN de longitud variable, filtros poco
+    usados) no ocupan sentencias en el servidor. Las filas se leen completas al ejecutar, de
+    modo que varias sentencias de la misma conexión no dejan resultados pendientes entre sí.
+    executemany() usa siempre un cursor de texto, que agrupa las filas en un único INSERT.
+
+    Args:
+        conexion (ConexionPool): Conexión prestada por el pool.
+        umbral (int): Ejecuciones de una sentencia antes de prepararla.
+        maximo (int): Entradas máximas de la caché de la conexión.
+    """
+
+    def __init__(self, conexion, umbral, maximo):
+        self._conexion = conexion
+        self._sentencias = conexion.sentencias
+        self._umbral = umbral
+        self._maximo = maximo
+        self._texto = None
+        self._filas = []
+        self._posicion = 0
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    @property
+    def with_rows(self):
+        return self.description is not None
+
+    def execute(self, sql, parametros=()):
+        entrada = self._sentencias.pop(sql, 0)
+        if not isinstance(entrada, tuple) and entrada != _TEXTO:
+            if sql.lstrip()[:7].upper().startswith(_PREPARABLES):
+                entrada += 1
+                if entrada >= self._umbral:
+                    entrada = (sql, self._conexion.cursor(cursor_class=self._clase_sentencia()))
+            else:
+                entrada = _TEXTO
+        # Se reinserta al final: el orden del diccionario es el de uso más reciente
+        self._sentencias[sql] = entrada
+        if len(self._sentencias) > self._maximo:
+            self._recortar()
+        if isinstance(entrada, tuple):
+            self._ejecutar_preparada(sql, entrada, parametros)
+        else:
+            cursor = self._cursor_texto()
+            cursor.execute(sql, parametros)
+            self._leer(cursor)
+
+    def executemany(self, sql, filas):
+        cursor = self._cursor_texto()
+        cursor.executemany(sql, filas)
+        self._leer(cursor)
+
+    def fetchone(self):
+        if self._posicion >= len(self._filas):
+            return None
+        self._posicion += 1
+        return self._filas[self._posicion - 1]
+
+    def fetchmany(self, tamano=1):
+        filas = self._filas[self._posicion:self._posicion + tamano]
+        self._posicion += len(filas)
+        return filas
+
+    def fetchall(self):
+        filas = self._filas[self._posicion:]
+        self._posicion = len(self._filas)
+        return filas
+
+    def close(self):
+        # Las sentencias preparadas quedan en la caché de la conexión
+        self._filas = []
+        if self._texto is not None:
+            self._texto.close()
+            self._texto = None
+
+    def _ejecutar_preparada(self, sql, entrada, parametros):
+        clave, cursor = entrada
+        try:
+            if cursor._executed is clave:
+                cursor.reejecutar(parametros)
+            else:
+                # Primera ejecución: el driver prepara la sentencia (se pasa la misma cadena
+                # que queda en la caché, que el cursor compara por identidad)
+                cursor.execute(clave, parametros)
+        except mysql.connector.Error as err:
+            if err.errno == _SENTENCIA_DESCONOCIDA or cursor._executed is not clave:
+                # El servidor la descartó o no se pudo preparar: se vuelve a intentar después
+                self._sentencias.pop(sql, None)
+            raise
+        self._leer(cursor)
+
+    def _leer(self, cursor):
+        self.description = cursor.description if cursor.with_rows else None
+        self._filas = cursor.fetchall() if self.description is not None else []
+        self._posicion = 0
+        self.rowcount = len(self._filas) if self.description is not None else cursor.rowcount
+        self.lastrowid = cursor.lastrowid
+
+    def _cursor_texto(self):
+        if self._texto is None:
+            self._texto = self._conexion.cursor(dictionary=True)
+        return self._texto
+
+    def _clase_sentencia(self):
+        # La conexión de la extensión en C tiene su propia clase de cursor preparado
+        if _SentenciaC is not None and getattr(self._conexion, '_cmysql', None) is not None:
+            return _SentenciaC
+        return _SentenciaPura
+
+    def _recortar(self):
+        # Desaloja las entradas usadas hace más tiempo; cerrar el cursor libera la sentencia
+        # en el servidor (COM_STMT_CLOSE no tiene respuesta)
+        while len(self._sentencias) > self._maximo:
+            entrada = self._sentencias.pop(next(iter(self._sentencias)))
+            if isinstance(entrada, tuple):
+                try:
+                    entrada[1].close()
+                except mysql.connector.Error:
+                    pass
+
+
+class FuenteMySQL(Fuente):
+    """
+    Fuente SQL sobre el pool de conexiones MySQL de la aplicación.
+
+    Args:
+        pool (PoolConexiones): Pool del que se toman las conexiones.
+        carga_local (bool): Usa LOAD DATA LOCAL INFILE en insertar_masivo() (MYSQL_LOCAL_INFILE).
+        max_sentencias (int): Entradas de la caché de sentencias de cada conexión
+            (MYSQL_STATEMENT_CACHE_SIZE); 0 = sin sentencias preparadas.
+        umbral_preparacion (int): Ejecuciones de una sentencia en una conexión antes de
+            prepararla (MYSQL_PREPARE_THRESHOLD).
+    """
+
+    errores = (mysql.connector.Error,)
+
+    def __init__(self, pool, carga_local=False, max_sentencias=0, umbral_preparacion=2):
+        self.pool = pool
+        self.carga_local = carga_local
+        self.max_sentencias = max_sentencias
+        self.umbral_preparacion = max(umbral_preparacion, 1)
+
+    def abrir(self):
+        return self.pool.obtener()
+
+    def liberar(self, conexion):
+        # Devuelve la conexión al pool, que deshace cualquier transacción pendiente
+        conexion.close()
+
+    def iniciar_transaccion(self, conexion):
+        # Las conexiones del pool usan autocommit: sin esto cada sentencia se confirmaría sola
+        conexion.start_transaction()
+
+    def cursor(self, conexion):
+        if not self.max_sentencias:
+            return conexion.cursor(dictionary=True)
+        return CursorPreparado(conexion, self.umbral_preparacion, self.max_sentencias)
+
+    def es_clave_foranea(self, err):
+        return isinstance(err, mysql.connector.IntegrityError) and err.errno in _CLAVE_FORANEA
+
+    def insertar_varios(self, cursor, sql, filas):
+        # executemany envía un único INSERT de varias filas. Para un INSERT simple (filas
+        # conocidas de antemano) InnoDB reserva todos los valores de una vez en cualquier
+        # innodb_autoinc_lock_mode, pero separados por auto_increment_increment, que en
+        # Galera o con varios primarios es mayor que 1 (y Galera lo ajusta al cambiar el
+        # clúster): se lee en la misma conexión en cada llamada en lugar de suponer 1
+        self.ejecutar(cursor, "SELECT @@SESSION.auto_increment_increment AS incremento")
+        incremento = int(cursor.fetchone()['incremento'])
+        self.ejecutar_varios(cursor, sql, filas)
+        primero = cursor.lastrowid
+        return [primero + desplazamiento * incremento for desplazamiento in range(len(filas))]
+
+    def insertar_masivo(self, cursor, tabla, columnas, filas):
+        if not self.carga_local:
+            super().insertar_masivo(cursor, tabla, columnas, filas)
+            return
+        # El lote se escribe en un archivo temporal con el formato por defecto de LOAD DATA
+        # (tabuladores, \N para NULL), que el servidor carga sin analizar SQL por fila
+        descriptor, ruta = tempfile.mkstemp(suffix='.tsv')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8', newline='\n') as archivo:
+                for fila in filas:
+                    archivo.write('\t'.join(
+                        '\\N' if valor is None else str(valor).translate(_ESCAPES_CARGA) for valor in fila
+                    ) + '\n')
+            try:
+                self.ejecutar(
+                    cursor,
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {tabla} CHARACTER SET utf8mb4 ({', '.join(columnas)})",
+                    (ruta,)
+                )
+            except mysql.connector.Error as err:
+                if err.errno not in _CARGA_LOCAL_RECHAZADA:
+                    raise
+                # Deshabilitado en el cliente o en el servidor (local_infile): se usa executemany
+                logger.warning("LOAD DATA LOCAL INFILE no disponible, se usa INSERT: %s", err)
+                self.carga_local = False
+                super().insertar_masivo(cursor, tabla, columnas, filas)
+        finally:
+            os.remove(ruta)
+
+    def iterar_tabla(self, tabla, tamano_lote):
+        # Una sola consulta con cursor sin buffer: las filas se leen del socket con fetchmany
+        conexion = self.abrir()
+        cursor = self.medir(conexion.cursor(dictionary=True, buffered=False))
+        try:
+            self.ejecutar(cursor, f"SELECT * FROM {tabla} ORDER BY id")
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    return
+                yield filas
+        except self.errores as err:
+            raise RepositorioError(str(err)) from err
+        finally:
+            # Si el consumidor se detiene antes del final quedan filas sin leer: el pool
+            # descarta la conexión en lugar de leerlas todas
+            try:
+                cursor.close()
+            except self.errores:
+                pass
+            self.liberar(conexion)
@@ -0,0 +1,719 @@
+"""
+Propósito: Implementación SQL de los repositorios, común a los backends MySQL y SQLite.
+Funcionalidad: Define Fuente, la base de los orígenes de datos (obtención y liberación de
+conexiones, transacciones, traducción de marcadores y mapeo de errores a RepositorioError), y
+las clases ProductoRepoSQL, CategoriaRepoSQL y UsuarioRepoSQL, que contienen las consultas que
+antes estaban en las funciones de ruta de los Blueprints, IdsCategorias, el conjunto de IDs de
+categoría con el que las escrituras de productos evitan verificar la categoría en la base, CambioRepoSQL, el registro de cambios
+que las escrituras de productos y categorías alimentan dentro de su propia transacción, e
+ImportacionRepoSQL, el progreso de las importaciones masivas.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from .base import (
+    ACTUALIZADO, CAMBIO_DELETE, CAMBIO_UPSERT, SIN_CATEGORIA, SIN_PRODUCTO, CambioRepo,
+    CategoriaInexistente, CategoriaRepo, ImportacionRepo, ProductoRepo, RepositorioError, UsuarioRepo,
+)
+from ..paginacion import escapar_like
+
+
+class Fuente:
+    """
+    Origen de datos SQL. Cada backend define cómo abrir y liberar conexiones y sus diferencias
+    de dialecto; las consultas se escriben con marcadores %s.
+    """
+
+    # Excepciones del driver que se convierten en RepositorioError
+    errores = ()
+    # Comparación por prefijo con barra invertida como carácter de escape
+    like = "LIKE %s"
+    # Prefijo que pide el plan de ejecución de una sentencia
+    explain = "EXPLAIN "
+    # Sufijo de una lectura que bloquea las filas leídas hasta el fin de la transacción
+    bloqueo = " FOR UPDATE"
+    # Medidor de consultas (metricas.Metricas) asignado por la aplicación; None = sin medición
+    medidor = None
+    # Registro de consultas lentas (consultas_lentas.ConsultasLentas); None = desactivado
+    registro_lentas = None
+
+    def abrir(self):
+        """
+        Devuelve una conexión lista para usar.
+        """
+        raise NotImplementedError
+
+    def liberar(self, conexion):
+        """
+        Devuelve la conexión (deshaciendo cualquier transacción sin confirmar).
+        """
+        raise NotImplementedError
+
+    def cursor(self, conexion):
+        """
+        Crea un cursor que devuelve las filas como diccionarios.
+        """
+        raise NotImplementedError
+
+    def iniciar_transaccion(self, conexion):
+        """
+        Abre la transacción de una escritura (por defecto, la abre el driver con la primera
+        sentencia).
+        """
+
+    def es_clave_foranea(self, err):
+        """
+        Indica si el error del driver es una violación de clave foránea.
+        """
+        return False
+
+    def medir(self, cursor):
+        """
+        Envuelve el cursor para medir sus consultas si hay un medidor asignado.
+        """
+        return cursor if self.medidor is None else self.medidor.cursor(cursor)
+
+    def traducir(self, sql):
+        """
+        Adapta una consulta con marcadores %s al dialecto del backend.
+        """
+        return sql
+
+    def ejecutar(self, cursor, sql, parametros=()):
+        """
+        Ejecuta una sentencia en el cursor.
+        """
+        parametros = tuple(parametros)
+        if self.registro_lentas is None:
+            cursor.execute(self.traducir(sql), parametros)
+            return
+        inicio = time.perf_counter()
+        cursor.execute(self.traducir(sql), parametros)
+        self.registro_lentas.registrar(sql, parametros, time.perf_counter() - inicio, cursor.rowcount)
+
+    def ejecutar_varios(self, cursor, sql, filas):
+        """
+        Ejecuta una sentencia una vez por cada fila de parámetros.
+        """
+        if self.registro_lentas is None:
+            cursor.executemany(self.traducir(sql), filas)
+            return
+        inicio = time.perf_counter()
+        cursor.executemany(self.traducir(sql), filas)
+        self.registro_lentas.registrar_varios(sql, filas, time.perf_counter() - inicio, cursor.rowcount)
+
+    def insertar_masivo(self, cursor, tabla, columnas, filas):
+        """
+        Inserta muchas filas sin necesitar sus IDs (importaciones masivas).
+        """
+        self.ejecutar_varios(
+            cursor, f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({marcadores(len(columnas))})", filas
+        )
+
+    def insertar_varios(self, cursor, sql, filas):
+        """
+        Inserta varias filas y devuelve sus IDs en orden.
+        """
+        ids = []
+        for fila in filas:
+            self.ejecutar(cursor, sql, fila)
+            ids.append(cursor.lastrowid)
+        return ids
+
+    def iterar_tabla(self, tabla, tamano_lote):
+        """
+        Recorre una tabla completa ordenada por id en lotes de tamaño fijo.
+
+        La implementación por defecto pide cada lote con una consulta por rango de id, sin
+        mantener la conexión ocupada entre lotes.
+        """
+        ultimo = None
+        while True:
+            with self.lectura() as cursor:
+                if ultimo is None:
+                    self.ejecutar(cursor, f"SELECT * FROM {tabla} ORDER BY id LIMIT %s", (tamano_lote,))
+                else:
+                    self.ejecutar(cursor, f"SELECT * FROM {tabla} WHERE id > %s ORDER BY id LIMIT %s",
+                                  (ultimo, tamano_lote))
+                filas = cursor.fetchall()
+            if not filas:
+                return
+            yield filas
+            if len(filas) < tamano_lote:
+                return
+            ultimo = filas[-1]['id']
+
+    @contextmanager
+    def lectura(self):
+        """
+        Cursor para consultas de solo lectura (sin commit).
+        """
+        with self._usar(confirmar=False) as cursor:
+            yield cursor
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Cursor para escrituras: confirma al salir sin errores y deshace en caso contrario.
+        """
+        with self._usar(confirmar=True) as cursor:
+            yield cursor
+
+    @contextmanager
+    def _usar(self, confirmar):
+        inicio = time.perf_counter()
+        conexion = self.abrir()
+        if self.registro_lentas is not None:
+            # Una espera larga aquí indica un pool saturado o una reconexión lenta
+            self.registro_lentas.registrar_conexion(time.perf_counter() - inicio)
+        cursor = None
+        try:
+            if confirmar:
+                self.iniciar_transaccion(conexion)
+            cursor = self.medir(self.cursor(conexion))
+            yield cursor
+            if confirmar:
+                conexion.commit()
+        except self.errores as err:
+            raise RepositorioError(str(err)) from err
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except self.errores:
+                    pass
+            self.liberar(conexion)
+
+
+def marcadores(n):
+    """
+    Marcadores %s para una cláusula IN con n valores.
+    """
+    return ", ".join(["%s"] * n)
+
+
+def columnas(campos):
+    """
+    Lista de columnas del SELECT; campos ya validados contra la lista de columnas permitidas.
+    """
+    return ", ".join(campos) if campos else "*"
+
+
+class IdsCategorias:
+    """
+    IDs de categoría existentes conocidos por el proceso.
+
+    La tabla es pequeña y casi no cambia: se carga completa y se recarga cada ttl segundos. Los
+    repositorios de este proceso la mantienen al crear y eliminar categorías; las de otros
+    workers no hacen falta para la corrección, porque una categoría ausente se consulta en la
+    base y una eliminada en otro worker la rechaza la clave foránea de producto.
+
+    Args:
+        fuente (Fuente): Origen de datos.
+        ttl (float): Segundos entre recargas completas.
+    """
+
+    def __init__(self, fuente, ttl=300.0):
+        self.fuente = fuente
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = None
+        self._cargado = 0.0
+
+    def cargar(self):
+        """
+        Lee todos los IDs de categoría.
+        """
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, "SELECT id FROM categortia")
+            ids = {fila['id'] for fila in cursor.fetchall()}
+        with self._lock:
+            self._ids = ids
+            self._cargado = time.monotonic()
+
+    def contiene(self, id):
+        """
+        Indica si se sabe que la categoría existe; False también si no se pudo cargar.
+        """
+        if self._ids is None or time.monotonic() - self._cargado >= self.ttl:
+            try:
+                self.cargar()
+            except RepositorioError:
+                return False
+        return id in self._ids
+
+    def agregar(self, id):
+        with self._lock:
+            if self._ids is not None:
+                self._ids.add(id)
+
+    def descartar(self, id):
+        with self._lock:
+            if self._ids is not None:
+                self._ids.discard(id)
+
+
+class RepoSQL:
+    """
+    Base de los repositorios SQL: guarda la fuente y ofrece consultas auxiliares.
+    """
+
+    def __init__(self, fuente):
+        self.fuente = fuente
+
+    def _ids_existentes(self, cursor, tabla, ids):
+        # Una sola consulta IN (...) para verificar varios IDs a la vez
+        ids = list(set(ids))
+        if not ids:
+            return set()
+        self.fuente.ejecutar(cursor, f"SELECT id FROM {tabla} WHERE id IN ({marcadores(len(ids))})", ids)
+        return {fila['id'] for fila in cursor.fetchall()}
+
+    def _registrar_cambios(self, cursor, tabla, ids, operacion):
+        # Misma transacción que la escritura: el registro no pierde ni inventa cambios
+        if not ids:
+            return
+        momento = int(time.time() * 1000)
+        if len(ids) == 1:
+            # Un solo cambio (cada escritura de la API): el INSERT toma la secuencia del contador
+            # recién incrementado, sin leerla antes con otra sentencia
+            self.fuente.ejecutar(cursor, "UPDATE cambio_secuencia SET ultima = ultima + 1 WHERE id = 1")
+            self.fuente.ejecutar(
+                cursor,
+                "INSERT INTO cambio (seq, tabla, registro_id, operacion, momento)"
+                " SELECT ultima, %s, %s, %s, %s FROM cambio_secuencia WHERE id = 1",
+                (tabla, ids[0], operacion, momento)
+            )
+            return
+        primera = self._reservar_secuencias(cursor, len(ids))
+        self.fuente.ejecutar_varios(
+            cursor,
+            "INSERT INTO cambio (seq, tabla, registro_id, operacion, momento) VALUES (%s, %s, %s, %s, %s)",
+            [(primera + desplazamiento, tabla, id, operacion, momento) for desplazamiento, id in enumerate(ids)]
+        )
+
+    def _reservar_secuencias(self, cursor, cantidad):
+        # El UPDATE bloquea la fila del contador hasta que la transacción termina: otra escritura
+        # no obtiene secuencias hasta que esta confirme o revierta, así que una secuencia nunca
+        # se vuelve visible antes que una menor. Por eso se reserva al final de cada escritura
+        self.fuente.ejecutar(cursor, "UPDATE cambio_secuencia SET ultima = ultima + %s WHERE id = 1", (cantidad,))
+        self.fuente.ejecutar(cursor, "SELECT ultima FROM cambio_secuencia WHERE id = 1")
+        return cursor.fetchone()['ultima'] - cantidad + 1
+
+    def _importar(self, tabla, tabla_cambio, campos, filas, progreso):
+        # Lote de una importación masiva: filas, registro de cambios y progreso en una transacción
+        with self.fuente.transaccion() as cursor:
+            ids = []
+            if filas:
+                self.fuente.ejecutar(cursor, f"SELECT MAX(id) AS id FROM {tabla}")
+                fila = cursor.fetchone()
+                ultimo = (fila['id'] if fila else None) or 0
+                self.fuente.insertar_masivo(cursor, tabla, campos, filas)
+                # Lectura consistente con la misma instantánea que el MAX anterior (REPEATABLE
+                # READ): solo ve las filas de este lote, no las de otras escrituras concurrentes,
+                # y no bloquea ningún rango de la tabla
+                self.fuente.ejecutar(cursor, f"SELECT id FROM {tabla} WHERE id > %s ORDER BY id", (ultimo,))
+                ids = [fila['id'] for fila in cursor.fetchall()]
+            if progreso is not None:
+                clave, procesados = progreso
+                momento = int(time.time() * 1000)
+                self.fuente.ejecutar(
+                    cursor, "UPDATE importacion SET filas = %s, momento = %s WHERE clave = %s",
+                    (procesados, momento, clave)
+                )
+                if not cursor.rowcount:
+                    self.fuente.ejecutar(
+                        cursor, "INSERT INTO importacion (clave, tabla, filas, momento) VALUES (%s, %s, %s, %s)",
+                        (clave, tabla_cambio, procesados, momento)
+                    )
+            # Al final: reservar secuencias bloquea las demás escrituras hasta confirmar
+            self._registrar_cambios(cursor, tabla_cambio, ids, CAMBIO_UPSERT)
+        return len(filas)
+
+
+class ProductoRepoSQL(RepoSQL, ProductoRepo):
+    """
+    Repositorio de productos sobre una fuente SQL.
+
+    Args:
+        fuente (Fuente): Origen de datos.
+        ids_categorias (IdsCategorias): IDs de categoría conocidos, compartidos con CategoriaRepoSQL.
+    """
+
+    def __init__(self, fuente, ids_categorias):
+        super().__init__(fuente)
+        self.ids_categorias = ids_categorias
+
+    def listar(self, filtros, pagina, campos=None):
+        condiciones, parametros = [], []
+        if filtros.get('categortia_id') is not None:
+            # Se resuelve con el índice fk_producto_categoria (categortia_id, id)
+            condiciones.append("categortia_id = %s")
+            parametros.append(filtros['categortia_id'])
+        if filtros.get('precio_min') is not None:
+            condiciones.append("precio >= %s")
+            parametros.append(filtros['precio_min'])
+        if filtros.get('precio_max') is not None:
+            condiciones.append("precio <= %s")
+            parametros.append(filtros['precio_max'])
+        if filtros.get('nombre'):
+            # Coincidencia por prefijo del nombre
+            condiciones.append("nombre " + self.fuente.like)
+            parametros.append(escapar_like(filtros['nombre']))
+        consulta = f"SELECT {columnas(campos)} FROM producto" + pagina.sql(condiciones, parametros)
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, consulta, parametros)
+            return cursor.fetchall()
+
+    def iterar(self, tamano_lote):
+        return self.fuente.iterar_tabla('producto', tamano_lote)
+
+    def obtener(self, id, campos=None):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, f"SELECT {columnas(campos)} FROM producto WHERE id = %s", (id,))
+            return cursor.fetchone()
+
+    def obtener_varios(self, ids, campos=None):
+        ids = list(set(ids))
+        if not ids:
+            return []
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(
+                cursor, f"SELECT {columnas(campos)} FROM producto WHERE id IN ({marcadores(len(ids))})", ids
+            )
+            return cursor.fetchall()
+
+    def precios(self, categorias=None):
+        consulta = "SELECT id, categortia_id, precio FROM producto"
+        parametros = []
+        if categorias is not None:
+            if not categorias:
+                return []
+            consulta += f" WHERE categortia_id IN ({marcadores(len(categorias))})"
+            parametros = list(categorias)
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, consulta, parametros)
+            return cursor.fetchall()
+
+    def resumen_por_categoria(self):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(
+                cursor,
+                "SELECT categortia_id, COUNT(*) AS productos, SUM(precio) AS suma, MIN(precio) AS minimo,"
+                " MAX(precio) AS maximo FROM producto GROUP BY categortia_id"
+            )
+            return cursor.fetchall()
+
+    def buscar(self, terminos, limite, despues=None):
+        # Modo booleano: cada término es obligatorio (+) y se compara como prefijo (*)
+        expresion = ' '.join(f"+{termino}*" for termino in terminos)
+        coincidencia = "MATCH (nombre, descripcion) AGAINST (%s IN BOOLEAN MODE)"
+        consulta = (
+            f"SELECT * FROM (SELECT producto.*, {coincidencia} AS relevancia FROM producto"
+            f" WHERE {coincidencia}) resultado"
+        )
+        parametros = [expresion, expresion]
+        if despues is not None:
+            # Continúa después de la última fila: menor relevancia, o igual relevancia y mayor id
+            consulta += " WHERE relevancia < %s OR (relevancia = %s AND id > %s)"
+            parametros.extend([despues[0], despues[0], despues[1]])
+        consulta += " ORDER BY relevancia DESC, id ASC LIMIT %s"
+        parametros.append(limite)
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, consulta, parametros)
+            return cursor.fetchall()
+
+    def crear(self, nombre, precio, descripcion, categortia_id):
+        with self.fuente.transaccion() as cursor:
+            # Verifica si la categoría existe
+            self._verificar_categoria(cursor, categortia_id)
+            try:
+                self.fuente.ejecutar(
+                    cursor,
+                    "INSERT INTO producto (nombre, precio, descripcion, categortia_id) VALUES (%s, %s, %s, %s)",
+                    (nombre, precio, descripcion, categortia_id)
+                )
+            except self.fuente.errores as err:
+                self._clave_foranea(err, categortia_id)
+                raise
+            id = cursor.lastrowid
+            self._registrar_cambios(cursor, 'producto', [id], CAMBIO_UPSERT)
+            return id
+
+    def actualizar(self, id, nombre, precio, descripcion, categortia_id):
+        with self.fuente.transaccion() as cursor:
+            # Verifica si la categoría existe
+            self._verificar_categoria(cursor, categortia_id)
+            try:
+                self.fuente.ejecutar(
+                    cursor,
+                    "UPDATE producto SET nombre = %s, precio = %s, descripcion = %s, categortia_id = %s WHERE id = %s",
+                    (nombre, precio, descripcion, categortia_id, id)
+                )
+            except self.fuente.errores as err:
+                self._clave_foranea(err, categortia_id)
+                raise
+            if not cursor.rowcount:
+                return False
+            self._registrar_cambios(cursor, 'producto', [id], CAMBIO_UPSERT)
+            return True
+
+    def eliminar(self, id):
+        with self.fuente.transaccion() as cursor:
+            self.fuente.ejecutar(cursor, "DELETE FROM producto WHERE id = %s", (id,))
+            if not cursor.rowcount:
+                return False
+            self._registrar_cambios(cursor, 'producto', [id], CAMBIO_DELETE)
+            return True
+
+    def crear_lote(self, filas):
+        with self.fuente.transaccion() as cursor:
+            # Verifica todas las categorías con una sola consulta
+            categorias = self._ids_existentes(cursor, 'categortia', [fila[3] for fila in filas])
+            insertar = [fila for fila in filas if fila[3] in categorias]
+            creados = self.fuente.insertar_varios(
+                cursor,
+                "INSERT INTO producto (nombre, precio, descripcion, categortia_id) VALUES (%s, %s, %s, %s)",
+                insertar
+            ) if insertar else []
+            self._registrar_cambios(cursor, 'producto', creados, CAMBIO_UPSERT)
+            ids = iter(creados)
+            return [next(ids) if fila[3] in categorias else None for fila in filas]
+
+    def actualizar_lote(self, filas):
+        with self.fuente.transaccion() as cursor:
+            # Verifica categorías y productos con una consulta cada uno
+            categorias = self._ids_existentes(cursor, 'categortia', [valores[3] for _, valores in filas])
+            productos = self._ids_existentes(cursor, 'producto', [id for id, _ in filas])
+            estados = []
+            actualizar = []
+            for id, valores in filas:
+                if id not in productos:
+                    estados.append(SIN_PRODUCTO)
+                elif valores[3] not in categorias:
+                    estados.append(SIN_CATEGORIA)
+                else:
+                    estados.append(ACTUALIZADO)
+                    actualizar.append(tuple(valores) + (id,))
+            if actualizar:
+                self.fuente.ejecutar_varios(
+                    cursor,
+                    "UPDATE producto SET nombre = %s, precio = %s, descripcion = %s, categortia_id = %s WHERE id = %s",
+                    actualizar
+                )
+                self._registrar_cambios(cursor, 'producto', [valores[-1] for valores in actualizar], CAMBIO_UPSERT)
+            return estados
+
+    def eliminar_lote(self, ids):
+        with self.fuente.transaccion() as cursor:
+            existentes = self._ids_existentes(cursor, 'producto', ids)
+            if existentes:
+                self.fuente.ejecutar(
+                    cursor, f"DELETE FROM producto WHERE id IN ({marcadores(len(existentes))})", list(existentes)
+                )
+                self._registrar_cambios(cursor, 'producto', sorted(existentes), CAMBIO_DELETE)
+            return existentes
+
+    def importar(self, filas, progreso=None):
+        return self._importar(
+            'producto', 'producto', ('nombre', 'precio', 'descripcion', 'categortia_id'), filas, progreso
+        )
+
+    def _verificar_categoria(self, cursor, categortia_id):
+        # Una categoría conocida no se consulta: la escritura queda en una sola sentencia
+        if self.ids_categorias.contiene(categortia_id):
+            return
+        # Desconocida (creada en otro worker o inexistente): se consulta en la base
+        if not self._ids_existentes(cursor, 'categortia', [categortia_id]):
+            raise CategoriaInexistente(categortia_id)
+        self.ids_categorias.agregar(categortia_id)
+
+    def _clave_foranea(self, err, categortia_id):
+        # La categoría estaba en el conjunto pero se eliminó en otro worker
+        if self.fuente.es_clave_foranea(err):
+            self.ids_categorias.descartar(categortia_id)
+            raise CategoriaInexistente(categortia_id) from err
+
+
+class CategoriaRepoSQL(RepoSQL, CategoriaRepo):
+    """
+    Repositorio de categorías sobre una fuente SQL.
+
+    Args:
+        fuente (Fuente): Origen de datos.
+        ids_categorias (IdsCategorias): IDs de categoría conocidos, que mantiene al crear y eliminar.
+    """
+
+    def __init__(self, fuente, ids_categorias):
+        super().__init__(fuente)
+        self.ids_categorias = ids_categorias
+
+    def listar(self, filtros, pagina, campos=None):
+        condiciones, parametros = [], []
+        if filtros.get('nombre'):
+            # Coincidencia por prefijo del nombre
+            condiciones.append("nombre " + self.fuente.like)
+            parametros.append(escapar_like(filtros['nombre']))
+        consulta = f"SELECT {columnas(campos)} FROM categortia" + pagina.sql(condiciones, parametros)
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, consulta, parametros)
+            return cursor.fetchall()
+
+    def obtener(self, id, campos=None):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, f"SELECT {columnas(campos)} FROM categortia WHERE id = %s", (id,))
+            return cursor.fetchone()
+
+    def obtener_varios(self, ids):
+        ids = list(set(ids))
+        if not ids:
+            return []
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, f"SELECT * FROM categortia WHERE id IN ({marcadores(len(ids))})", ids)
+            return cursor.fetchall()
+
+    def iterar(self, tamano_lote):
+        return self.fuente.iterar_tabla('categortia', tamano_lote)
+
+    def crear(self, nombre):
+        with self.fuente.transaccion() as cursor:
+            self.fuente.ejecutar(cursor, "INSERT INTO categortia (nombre) VALUES (%s)", (nombre,))
+            id = cursor.lastrowid
+            self._registrar_cambios(cursor, 'categoria', [id], CAMBIO_UPSERT)
+        self.ids_categorias.agregar(id)
+        return id
+
+    def actualizar(self, id, nombre):
+        with self.fuente.transaccion() as cursor:
+            self.fuente.ejecutar(cursor, "UPDATE categortia SET nombre = %s WHERE id = %s", (nombre, id))
+            if not cursor.rowcount:
+                return False
+            self._registrar_cambios(cursor, 'categoria', [id], CAMBIO_UPSERT)
+            return True
+
+    def eliminar(self, id):
+        with self.fuente.transaccion() as cursor:
+            # Bloquea la categoría: un producto que se crea o se mueve a ella espera a que el
+            # borrado termine (y falla por la clave foránea) en lugar de desaparecer en la
+            # cascada sin quedar registrado
+            self.fuente.ejecutar(cursor, "SELECT id FROM categortia WHERE id = %s" + self.fuente.bloqueo, (id,))
+            if cursor.fetchone() is None:
+                return False, []
+            # Obtiene los productos que el borrado en cascada (ON DELETE CASCADE) eliminará; el
+            # bloqueo impide que otra transacción los mueva a otra categoría antes del DELETE
+            self.fuente.ejecutar(
+                cursor, "SELECT id FROM producto WHERE categortia_id = %s" + self.fuente.bloqueo, (id,)
+            )
+            productos = [fila['id'] for fila in cursor.fetchall()]
+            self.fuente.ejecutar(cursor, "DELETE FROM categortia WHERE id = %s", (id,))
+            # Los productos borrados en cascada también quedan registrados
+            self._registrar_cambios(cursor, 'producto', productos, CAMBIO_DELETE)
+            self._registrar_cambios(cursor, 'categoria', [id], CAMBIO_DELETE)
+        self.ids_categorias.descartar(id)
+        return True, productos
+
+    def importar(self, nombres, progreso=None):
+        return self._importar('categortia', 'categoria', ('nombre',), [(nombre,) for nombre in nombres], progreso)
+
+
+class CambioRepoSQL(RepoSQL, CambioRepo):
+    """
+    Registro de cambios sobre una fuente SQL.
+    """
+
+    def leer(self, desde, limite):
+        with self.fuente.lectura() as cursor:
+            # Recorre la clave primaria a partir de desde
+            self.fuente.ejecutar(
+                cursor,
+                "SELECT seq, tabla, registro_id, operacion FROM cambio WHERE seq > %s ORDER BY seq LIMIT %s",
+                (desde, limite)
+            )
+            return cursor.fetchall()
+
+    def limites(self):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, "SELECT seq FROM cambio_horizonte WHERE id = 1")
+            fila = cursor.fetchone()
+            horizonte = fila['seq'] if fila else 0
+            self.fuente.ejecutar(cursor, "SELECT MAX(seq) AS seq FROM cambio")
+            fila = cursor.fetchone()
+            return horizonte, max(horizonte, (fila['seq'] if fila else None) or 0)
+
+    def compactar(self, antes_de, max_entradas):
+        eliminadas = 0
+        with self.fuente.transaccion() as cursor:
+            # Entradas reemplazadas: un cliente que las lea recibe igual el estado actual por la
+            # entrada posterior del mismo registro, así que quitarlas no hace perder cambios
+            self.fuente.ejecutar(
+                cursor,
+                "SELECT seq FROM cambio WHERE seq < (SELECT MAX(posterior.seq) FROM cambio posterior"
+                " WHERE posterior.tabla = cambio.tabla AND posterior.registro_id = cambio.registro_id)"
+                " LIMIT %s",
+                (max_entradas,)
+            )
+            reemplazadas = [fila['seq'] for fila in cursor.fetchall()]
+            if reemplazadas:
+                self.fuente.ejecutar(
+                    cursor, f"DELETE FROM cambio WHERE seq IN ({marcadores(len(reemplazadas))})", reemplazadas
+                )
+                eliminadas += cursor.rowcount
+            # Entradas vencidas: se eliminan y el horizonte avanza hasta la última de ellas
+            self.fuente.ejecutar(cursor, "SELECT MAX(seq) AS seq FROM cambio WHERE momento < %s", (antes_de,))
+            fila = cursor.fetchone()
+            vencida = fila['seq'] if fila else None
+            if vencida is not None:
+                self.fuente.ejecutar(cursor, "DELETE FROM cambio WHERE seq <= %s", (vencida,))
+                eliminadas += cursor.rowcount
+                self.fuente.ejecutar(
+                    cursor, "UPDATE cambio_horizonte SET seq = %s WHERE id = 1 AND seq < %s", (vencida, vencida)
+                )
+        return eliminadas
+
+
+class ImportacionRepoSQL(RepoSQL, ImportacionRepo):
+    """
+    Progreso de las importaciones masivas sobre una fuente SQL.
+    """
+
+    def progreso(self, clave):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, "SELECT filas FROM importacion WHERE clave = %s", (clave,))
+            fila = cursor.fetchone()
+            return fila['filas'] if fila else 0
+
+
+class UsuarioRepoSQL(RepoSQL, UsuarioRepo):
+    """
+    Repositorio de usuarios sobre una fuente SQL.
+    """
+
+    def por_numero(self, numero):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, "SELECT * FROM usuario WHERE numero = %s", (numero,))
+            return cursor.fetchone()
+
+    def existe_numero(self, numero):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, "SELECT id FROM usuario WHERE numero = %s", (numero,))
+            return cursor.fetchone() is not None
+
+    def perfil(self, id):
+        with self.fuente.lectura() as cursor:
+            self.fuente.ejecutar(cursor, "SELECT id, numero, nombre, apellido FROM usuario WHERE id = %s", (id,))
+            return cursor.fetchone()
+
+    def crear(self, numero, nombre, apellido, contrasena):
+        with self.fuente.transaccion() as cursor:
+            self.fuente.ejecutar(
+                cursor,
+                "INSERT INTO usuario (numero, nombre, apellido, contrasena) VALUES (%s, %s, %s, %s)",
+                (numero, nombre, apellido, contrasena)
+            )
+            return cursor.lastrowid
+
+    def actualizar_contrasena(self, id, contrasena):
+        with self.fuente.transaccion() as cursor:
+            self.fuente.ejecutar(cursor, "UPDATE usuario SET contrasena = %s WHERE id = %s", (contrasena, id))
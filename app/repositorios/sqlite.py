@@ -0,0 +1,136 @@
+"""
+Propósito: Origen de datos SQLite (en archivo o en memoria) de los repositorios.
+Funcionalidad: Define FuenteSQLite, que crea el esquema equivalente al de tienda_online.sql y lo
+siembra con los datos de ese volcado. Permite ejecutar, perfilar y medir la aplicación sin un
+servidor MySQL. Usa una única conexión protegida por un lock, por lo que está pensada para
+ejecuciones de un solo proceso (desarrollo, pruebas de carga y benchmarks de la capa Flask).
+"""
+
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+
+from .sql import Fuente
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS categortia (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(50) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS producto (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(50) NOT NULL,
+    precio DECIMAL(8,2) DEFAULT NULL,
+    descripcion TEXT DEFAULT NULL,
+    categortia_id INTEGER NOT NULL REFERENCES categortia (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+CREATE INDEX IF NOT EXISTS fk_producto_categoria ON producto (categortia_id);
+CREATE TABLE IF NOT EXISTS usuario (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    numero VARCHAR(20) NOT NULL UNIQUE,
+    nombre VARCHAR(50) NOT NULL,
+    apellido VARCHAR(50) NOT NULL,
+    contrasena VARCHAR(255) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cambio (
+    seq INTEGER PRIMARY KEY,
+    tabla VARCHAR(20) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    operacion VARCHAR(6) NOT NULL,
+    momento BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cambio_registro ON cambio (tabla, registro_id, seq);
+CREATE INDEX IF NOT EXISTS idx_cambio_momento ON cambio (momento);
+CREATE TABLE IF NOT EXISTS cambio_horizonte (
+    id INTEGER PRIMARY KEY,
+    seq BIGINT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cambio_secuencia (
+    id INTEGER PRIMARY KEY,
+    ultima BIGINT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS importacion (
+    clave CHAR(32) PRIMARY KEY,
+    tabla VARCHAR(20) NOT NULL,
+    filas BIGINT NOT NULL,
+    momento BIGINT NOT NULL
+);
+"""
+
+# Sentencias INSERT del volcado de phpMyAdmin
+_INSERT = re.compile(r"^INSERT INTO `\w+` .*?;\s*$", re.MULTILINE | re.DOTALL)
+
+# precio se guarda como texto decimal y se devuelve como Decimal con dos decimales, igual que MySQL
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter('DECIMAL', lambda valor: Decimal(valor.decode('ascii')).quantize(Decimal('0.01')))
+
+
+def _fila_dict(cursor, fila):
+    return {columna[0]: valor for columna, valor in zip(cursor.description, fila)}
+
+
+def sembrar(conexion, archivo):
+    """
+    Ejecuta las sentencias INSERT de un volcado MySQL (tienda_online.sql) en SQLite.
+    """
+    with open(archivo, encoding='utf-8') as volcado:
+        contenido = volcado.read()
+    for sentencia in _INSERT.findall(contenido):
+        # SQLite acepta los nombres entre comillas invertidas, pero no el escape \' de MySQL
+        conexion.execute(sentencia.replace("\\'", "''"))
+
+
+class FuenteSQLite(Fuente):
+    """
+    Fuente SQL sobre una base SQLite.
+
+    Args:
+        ruta (str): Archivo de la base o ':memory:'.
+        archivo_semilla (str | None): Volcado SQL con el que se siembra una base recién creada.
+    """
+
+    errores = (sqlite3.Error,)
+    like = "LIKE %s ESCAPE '\\'"
+    explain = "EXPLAIN QUERY PLAN "
+    # Sin FOR UPDATE: la conexión única ya serializa las transacciones
+    bloqueo = ""
+
+    def __init__(self, ruta, archivo_semilla=None):
+        self._lock = threading.RLock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._conexion.row_factory = _fila_dict
+        self._conexion.execute("PRAGMA foreign_keys = ON")
+        nueva = self._conexion.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'producto'"
+        ).fetchone() is None
+        self._conexion.executescript(ESQUEMA)
+        if nueva and archivo_semilla:
+            sembrar(self._conexion, archivo_semilla)
+        # Horizonte del registro de cambios en bases creadas sin él (o sin volcado)
+        self._conexion.execute("INSERT OR IGNORE INTO cambio_horizonte (id, seq) VALUES (1, 0)")
+        # Contador de secuencias del registro, a partir de lo ya registrado en bases anteriores a él
+        self._conexion.execute(
+            "INSERT OR IGNORE INTO cambio_secuencia (id, ultima) SELECT 1, COALESCE(MAX(seq), 0) FROM cambio"
+        )
+        self._conexion.commit()
+
+    def abrir(self):
+        self._lock.acquire()
+        return self._conexion
+
+    def liberar(self, conexion):
+        try:
+            if conexion.in_transaction:
+                conexion.rollback()
+        finally:
+            self._lock.release()
+
+    def cursor(self, conexion):
+        return conexion.cursor()
+
+    def traducir(self, sql):
+        return sql.replace('%s', '?')
+
+    def es_clave_foranea(self, err):
+        return isinstance(err, sqlite3.IntegrityError) and 'FOREIGN KEY' in str(err)
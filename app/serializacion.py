@@ -0,0 +1,163 @@
+"""
+Propósito: Serialización JSON rápida de las filas de la base de datos.
+Funcionalidad: Define ProveedorJSON, el proveedor JSON de Flask que instala create_app(). Usa
+orjson (codificador en C) si está instalado y, si no, el módulo json estándar, con una política
+explícita para los valores Decimal (columna precio): JSON_DECIMAL = 'string' los envía como texto
+exacto (el formato de siempre) y 'number' como número. Para los listados guarda los bytes JSON de
+cada fila y arma la respuesta concatenándolos, de modo que una fila que no cambió no se vuelve a
+codificar. El tiempo de serialización se informa al medidor (las métricas) si hay uno.
+"""
+
+import decimal
+import json
+import threading
+import time
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+class FilasSerializadas:
+    """
+    Bytes JSON de las filas ya codificadas, por tabla e id.
+
+    Cada entrada guarda una copia de la fila junto con sus bytes; solo se reutilizan si la fila
+    actual es igual a la guardada, así que una fila modificada (en este u otro worker) se vuelve
+    a codificar sin necesidad de invalidar nada. Comparar un diccionario de pocas columnas es
+    mucho más barato que codificarlo.
+
+    Args:
+        max_filas (int): Filas guardadas; al superarlo se descartan las más antiguas.
+    """
+
+    def __init__(self, max_filas=10000):
+        self.max_filas = max_filas
+        self._lock = threading.Lock()
+        self._filas = {}  # (tabla, campos, id) -> (copia de la fila, bytes)
+
+    def codificar(self, tabla, filas, codificar, campos=None):
+        """
+        Devuelve los bytes JSON de cada fila, reutilizando los guardados.
+
+        Args:
+            tabla (str): Tabla de las filas.
+            filas (list[dict]): Filas con columna id.
+            codificar (callable): Función que convierte una fila en bytes JSON.
+            campos (tuple[str] | None): Columnas de las filas (fields=); None = todas.
+        """
+        partes = []
+        nuevas = []
+        for fila in filas:
+            clave = (tabla, campos, fila['id'])
+            entrada = self._filas.get(clave)
+            if entrada is not None and entrada[0] == fila:
+                partes.append(entrada[1])
+                continue
+            codificada = codificar(fila)
+            partes.append(codificada)
+            nuevas.append((clave, (dict(fila), codificada)))
+        if nuevas and self.max_filas > 0:
+            with self._lock:
+                self._filas.update(nuevas)
+                # Los diccionarios conservan el orden de inserción: se descartan las más antiguas
+                exceso = len(self._filas) - self.max_filas
+                if exceso > 0:
+                    for clave in list(self._filas)[:exceso]:
+                        del self._filas[clave]
+        return partes
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask con orjson opcional, política de Decimal y filas precodificadas.
+
+    Mantiene las reglas del proveedor por defecto (claves ordenadas, fechas en formato HTTP);
+    con orjson la salida es UTF-8 sin escapar los caracteres no ASCII.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.decimal = app.config['JSON_DECIMAL']
+        if self.decimal not in ('string', 'number'):
+            raise ValueError("JSON_DECIMAL debe ser 'string' o 'number'")
+        self.filas = FilasSerializadas(app.config['JSON_ROW_CACHE_SIZE'])
+        self.medidor = None  # Metricas, para sumar el tiempo de serialización a la solicitud
+        self._opciones = 0
+        if orjson is not None:
+            # Las fechas pasan por default() para conservar el formato del proveedor por defecto
+            self._opciones = orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                self._opciones |= orjson.OPT_SORT_KEYS
+
+    def default(self, o):
+        if isinstance(o, decimal.Decimal):
+            return str(o) if self.decimal == 'string' else float(o)
+        return DefaultJSONProvider.default(o)
+
+    def codificar(self, obj):
+        """
+        Serializa a bytes JSON compactos.
+        """
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=self._opciones)
+        return json.dumps(
+            obj, default=self.default, ensure_ascii=self.ensure_ascii, sort_keys=self.sort_keys,
+            separators=(',', ':')
+        ).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            if kwargs or orjson is None:
+                kwargs.setdefault('default', self.default)
+                return super().dumps(obj, **kwargs)
+            return orjson.dumps(obj, default=self.default, option=self._opciones).decode('utf-8')
+        finally:
+            self._medir(inicio)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # En depuración se conserva la salida indentada del proveedor por defecto
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        inicio = time.perf_counter()
+        try:
+            cuerpo = self.codificar(obj) + b'\n'
+        finally:
+            self._medir(inicio)
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
+
+    def respuesta_listado(self, resultado, tabla, campos=None):
+        """
+        Respuesta JSON de una página de listado armada con los bytes guardados de cada fila.
+
+        Args:
+            resultado (dict): {"data": filas, ...} según Pagina.resultado().
+            tabla (str): Tabla de las filas, para identificarlas en FilasSerializadas.
+            campos (tuple[str] | None): Columnas proyectadas con fields=; None = todas.
+        """
+        inicio = time.perf_counter()
+        try:
+            partes = self.filas.codificar(tabla, resultado['data'], self.codificar, campos)
+            resto = self.codificar({k: v for k, v in resultado.items() if k != 'data'})
+            # "data" va primero, igual que con las claves ordenadas
+            cuerpo = b'{"data":[' + b','.join(partes) + (b']}' if resto == b'{}' else b'],' + resto[1:])
+        finally:
+            self._medir(inicio)
+        return self._app.response_class(cuerpo + b'\n', mimetype=self.mimetype)
+
+    def _medir(self, inicio):
+        if self.medidor is not None:
+            self.medidor.serializacion(time.perf_counter() - inicio)
+
+
+def respuesta_listado(resultado, tabla, campos=None):
+    """
+    Respuesta JSON de una página de listado de la aplicación actual (ver ProveedorJSON).
+    """
+    return current_app.json.respuesta_listado(resultado, tabla, campos)
@@ -0,0 +1,184 @@
+"""
+Propósito: Contadores de versión por tabla compartidos entre los workers de gunicorn.
+Funcionalidad: Define la extensión VersionesTablas, que guarda un contador por tabla en un
+archivo pequeño mapeado en memoria (mmap). Los manejadores de escritura lo incrementan y las
+lecturas lo consultan sin tocar la base de datos. Con estos contadores se generan ETags fuertes
+para las respuestas GET y se responde 304 Not Modified sin ejecutar la consulta ni serializar.
+En sistemas sin fcntl (Windows), o con una base SQLite en memoria (propia de cada proceso), los
+contadores quedan en la memoria del proceso. El archivo por defecto está en el directorio
+temporal y su nombre incluye la identidad de la base: dos aplicaciones con bases distintas en la
+misma máquina no comparten contadores, y las ETags de una nunca se validan contra la otra.
+"""
+
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import zlib
+
+from flask import Response, current_app, request
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Tablas con contador propio; el orden fija la posición de cada contador en el archivo
+TABLAS = ('producto', 'categoria', 'usuario')
+
+_MAGIA = b'TIENDAV1'
+_CABECERA = struct.Struct('<8sQ')  # magia y época aleatoria del archivo
+_CONTADOR = struct.Struct('<Q')
+_TAMANO = _CABECERA.size + _CONTADOR.size * len(TABLAS)
+
+
+def ruta_por_defecto(config):
+    """
+    Devuelve el archivo de contadores de la base configurada en el directorio temporal, o None
+    si la base es SQLite en memoria.
+    """
+    if config['REPOSITORY_BACKEND'] == 'sqlite':
+        if config['SQLITE_DATABASE'] == ':memory:':
+            return None
+        identidad = 'sqlite:' + os.path.abspath(config['SQLITE_DATABASE'])
+    else:
+        identidad = f"mysql:{config['MYSQL_HOST']}:{config['MYSQL_PORT']}/{config['MYSQL_DATABASE']}"
+    resumen = hashlib.blake2b(identidad.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f'tienda_online_versiones_{resumen}.bin')
+
+
+class VersionesTablas:
+    """
+    Extensión de Flask con los contadores de versión por tabla.
+    """
+
+    def __init__(self, app=None):
+        self.ruta = None
+        self._pid = None
+        self._mapa = None
+        self._fd = None
+        self._lock = threading.Lock()
+        self._locales = dict.fromkeys(TABLAS, 0)
+        self._epoca = secrets.randbits(32)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ruta = app.config['TABLE_VERSIONS_FILE'] or ruta_por_defecto(app.config)
+        # La instancia es global: una aplicación nueva vuelve a abrir su archivo
+        with self._lock:
+            self.ruta = ruta if fcntl is not None else None
+            self._pid = None
+            self._locales = dict.fromkeys(TABLAS, 0)
+            self._epoca = secrets.randbits(32)
+        app.extensions['versiones'] = self
+
+    def leer(self, tabla):
+        """
+        Devuelve la versión actual de la tabla (lectura de 8 bytes, sin bloqueo).
+        """
+        mapa = self._abrir()
+        if mapa is None:
+            return self._locales[tabla]
+        return _CONTADOR.unpack_from(mapa, self._posicion(tabla))[0]
+
+    def incrementar(self, tabla):
+        """
+        Incrementa la versión de la tabla tras una escritura confirmada.
+
+        Returns:
+            tuple[int, int]: Versión anterior y nueva.
+        """
+        mapa = self._abrir()
+        if mapa is None:
+            with self._lock:
+                anterior = self._locales[tabla]
+                self._locales[tabla] = anterior + 1
+            return anterior, anterior + 1
+        posicion = self._posicion(tabla)
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                anterior = _CONTADOR.unpack_from(mapa, posicion)[0]
+                _CONTADOR.pack_into(mapa, posicion, anterior + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return anterior, anterior + 1
+
+    def etag(self, *tablas, clave=''):
+        """
+        Genera el ETag de una respuesta que depende de las tablas indicadas.
+
+        Args:
+            *tablas (str): Tablas cuyos datos forman la respuesta.
+            clave (str): Ruta y parámetros de la solicitud, para distinguir representaciones.
+
+        Returns:
+            str: Valor del ETag sin comillas.
+        """
+        self._abrir()
+        versiones = '.'.join(str(self.leer(tabla)) for tabla in tablas)
+        return f"{self._epoca:x}-{versiones}-{zlib.crc32(clave.encode('utf-8')):x}"
+
+    def _posicion(self, tabla):
+        return _CABECERA.size + _CONTADOR.size * TABLAS.index(tabla)
+
+    def _abrir(self):
+        # Cada proceso abre su propio descriptor: flock no excluye entre procesos que
+        # comparten el descriptor heredado de un fork
+        if self.ruta is None:
+            return None
+        if self._pid == os.getpid():
+            return self._mapa
+        with self._lock:
+            if self._pid != os.getpid():
+                fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    # El primer proceso en abrir el archivo escribe la cabecera
+                    if os.fstat(fd).st_size < _TAMANO:
+                        os.ftruncate(fd, _TAMANO)
+                        os.pwrite(fd, _CABECERA.pack(_MAGIA, secrets.randbits(32)), 0)
+                    mapa = mmap.mmap(fd, _TAMANO)
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                magia, epoca = _CABECERA.unpack_from(mapa, 0)
+                if magia != _MAGIA:
+                    raise RuntimeError(f"Archivo de versiones inválido: {self.ruta}")
+                self._fd, self._mapa, self._epoca = fd, mapa, epoca
+                self._pid = os.getpid()
+        return self._mapa
+
+
+def get_versiones():
+    """
+    Devuelve los contadores de versión de la aplicación actual.
+    """
+    return current_app.extensions['versiones']
+
+
+def etag_vigente(etag):
+    """
+    Indica si el cliente ya tiene la representación identificada por el ETag.
+    """
+    return request.if_none_match.contains_weak(etag) or request.if_none_match.star_tag
+
+
+def no_modificado(etag):
+    """
+    Respuesta 304 Not Modified sin cuerpo para un ETag vigente.
+    """
+    respuesta = Response(status=304)
+    return con_etag(respuesta, etag)
+
+
+def con_etag(respuesta, etag):
+    """
+    Añade el ETag a la respuesta y pide a los clientes revalidar antes de reutilizarla.
+    """
+    respuesta.set_etag(etag)
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    return respuesta
@@ -0,0 +1,20 @@
+"""
+Propósito: Benchmarks reproducibles de carga de la API.
+Funcionalidad: Mide el rendimiento (solicitudes por segundo) y las latencias p50/p95/p99 de cada
+ruta de la API bajo una concurrencia configurable: lecturas y escrituras del catálogo, búsqueda,
+estadísticas, cambios incrementales y autenticación con bcrypt. Los datos se generan a partir de
+tienda_online.sql escalados a la cantidad de productos pedida, con una semilla fija.
+
+Uso:
+    python -m benchmarks list
+    python -m benchmarks run --productos 100k -c 16 -d 20
+    python -m benchmarks run -g lectura --comparar-con benchmarks/resultados/base.json
+    python -m benchmarks compare base.json actual.json --umbral 5
+
+Por defecto la carga se envía a create_app() en el mismo proceso sobre SQLite: mide la capa Flask
+(enrutamiento, cachés, serialización, compresión, JWT, bcrypt) con una base que serializa los
+accesos, y todos los clientes comparten el GIL con la aplicación. Para medir un despliegue real
+(gunicorn con MySQL) se inicia el servidor por separado, con AUTH_RATE_LIMIT=0, y se usa --url.
+Las variables de entorno de la configuración (BCRYPT_ROUNDS, CACHE_ENABLED, ...) se aplican
+también a la aplicación iniciada por run.
+"""
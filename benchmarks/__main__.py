@@ -0,0 +1,226 @@
+"""
+Propósito: Línea de órdenes de los benchmarks (python -m benchmarks).
+Funcionalidad: Define los comandos run, compare y list. run genera (o reutiliza) la base SQLite
+escalada a la cantidad de productos pedida, inicia create_app() sobre una copia, ejecuta los
+escenarios elegidos con la concurrencia indicada, muestra el rendimiento y las latencias de cada
+uno y guarda los resultados como JSON; con --url envía la carga a un servidor ya desplegado en
+lugar de a la aplicación en el mismo proceso. compare contrasta dos archivos de resultados y
+termina con código 1 si encuentra regresiones.
+"""
+
+import atexit
+import datetime
+import os
+import shutil
+import sys
+
+import click
+
+from . import datos, resultados
+from .carga import ClienteHTTP, ClienteWSGI, ejecutar
+from .escenarios import ESCENARIOS, GRUPOS, POR_NOMBRE, Contexto, ErrorPreparacion
+
+# Raíz del repositorio (contiene tienda_online.sql)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directorio por defecto de los archivos de resultados
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+
+# Sufijos admitidos en --productos
+MULTIPLICADORES = {'k': 1000, 'm': 1000000}
+
+
+class CantidadProductos(click.ParamType):
+    """
+    Cantidad de productos con sufijo opcional: 1000, 100k, 1M.
+    """
+
+    name = 'cantidad'
+
+    def convert(self, valor, param, ctx):
+        if isinstance(valor, int):
+            return valor
+        texto = valor.strip().lower()
+        multiplicador = MULTIPLICADORES.get(texto[-1:], 1)
+        if multiplicador != 1:
+            texto = texto[:-1]
+        try:
+            cantidad = int(float(texto) * multiplicador)
+        except ValueError:
+            self.fail(f"{valor!r} no es una cantidad (por ejemplo 1000, 100k o 1M)", param, ctx)
+        if cantidad < 1:
+            self.fail("Debe haber al menos un producto", param, ctx)
+        return cantidad
+
+
+@click.group(help="Benchmarks de carga de la API de la tienda.")
+def cli():
+    pass
+
+
+@cli.command('list', help="Muestra los escenarios disponibles.")
+def listar():
+    for grupo in GRUPOS:
+        click.echo(f"{grupo}:")
+        for escenario in ESCENARIOS:
+            if escenario.grupo == grupo:
+                click.echo(f"  {escenario.nombre}")
+
+
+@cli.command('run', help="Ejecuta los escenarios y guarda los resultados como JSON.")
+@click.option('--productos', type=CantidadProductos(), default='1k', show_default=True,
+              help="Productos de la base generada (1k, 100k, 1M, ...).")
+@click.option('--semilla', type=int, default=42, show_default=True, help="Semilla de los datos y de la carga.")
+@click.option('--concurrencia', '-c', type=click.IntRange(min=1), default=8, show_default=True,
+              help="Clientes que envían solicitudes a la vez.")
+@click.option('--duracion', '-d', type=click.FloatRange(min=0, min_open=True), default=10, show_default=True,
+              help="Segundos medidos por escenario.")
+@click.option('--calentamiento', type=click.FloatRange(min=0), default=2, show_default=True,
+              help="Segundos sin medir antes de cada escenario.")
+@click.option('--escenario', '-e', 'nombres', multiple=True, type=click.Choice(list(POR_NOMBRE)),
+              help="Escenario a ejecutar (repetible); por defecto, todos los de los grupos elegidos.")
+@click.option('--grupo', '-g', 'grupos', multiple=True, type=click.Choice(GRUPOS),
+              help="Grupo de escenarios a ejecutar (repetible); por defecto, todos.")
+@click.option('--salida', '-o', type=click.Path(dir_okay=False),
+              help="Archivo de resultados; por defecto, benchmarks/resultados/<fecha>-<productos>.json.")
+@click.option('--url', help="Servidor al que enviar la carga (por ejemplo http://localhost:8000) en lugar "
+                            "de la aplicación en el mismo proceso; --productos no genera datos.")
+@click.option('--comparar-con', type=click.Path(exists=True, dir_okay=False),
+              help="Resultados de referencia con los que comparar al terminar.")
+@click.option('--umbral', type=float, default=10, show_default=True,
+              help="Variación en porcentaje que se considera regresión en --comparar-con.")
+def run(productos, semilla, concurrencia, duracion, calentamiento, nombres, grupos, salida, url, comparar_con,
+        umbral):
+    elegidos = [POR_NOMBRE[nombre] for nombre in nombres] or [
+        escenario for escenario in ESCENARIOS if not grupos or escenario.grupo in grupos
+    ]
+    # Se lee antes de medir: un archivo de referencia inválido no debe descubrirse al final
+    base = None
+    if comparar_con:
+        try:
+            base = resultados.cargar(comparar_con)
+        except ValueError as error:
+            raise click.ClickException(str(error))
+    if url:
+        crear_cliente = lambda: ClienteHTTP(url)
+    else:
+        app = _iniciar_aplicacion(productos, semilla)
+        crear_cliente = lambda: ClienteWSGI(app)
+
+    contexto = Contexto()
+    preparacion = crear_cliente()
+    try:
+        contexto.preparar(preparacion)
+    except ErrorPreparacion as error:
+        raise click.ClickException(str(error))
+
+    click.echo(f"{len(elegidos)} escenarios, concurrencia {concurrencia}, {duracion:g} s cada uno "
+               f"(+{calentamiento:g} s de calentamiento)", err=True)
+    click.echo(_linea('escenario', 'rps', 'p50 ms', 'p95 ms', 'p99 ms', 'errores'))
+    escenarios = {}
+    for escenario in elegidos:
+        contexto.renovar(preparacion)
+        try:
+            medicion = ejecutar(escenario, crear_cliente, contexto, concurrencia, duracion, calentamiento, semilla)
+        except ErrorPreparacion as error:
+            click.echo(f"{escenario.nombre}: {error}", err=True)
+            continue
+        resumen = resultados.resumir(medicion)
+        escenarios[escenario.nombre] = resumen
+        click.echo(_linea(escenario.nombre, resumen['rps'], resumen['p50_ms'], resumen['p95_ms'],
+                          resumen['p99_ms'], resumen['errores']))
+        for estado, cuerpo in resumen.get('ejemplos_error', {}).items():
+            click.echo(f"  {estado}: {cuerpo}", err=True)
+
+    parametros = {
+        "productos": None if url else productos,
+        "semilla": semilla,
+        "concurrencia": concurrencia,
+        "duracion": duracion,
+        "calentamiento": calentamiento,
+        "destino": url or 'wsgi',
+    }
+    documento = resultados.documento(parametros, escenarios)
+    if salida is None:
+        marca = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        salida = os.path.join(DIRECTORIO_RESULTADOS, f"{marca}-{'http' if url else productos}.json")
+    resultados.guardar(salida, documento)
+    click.echo(f"Resultados guardados en {salida}", err=True)
+
+    if base is not None:
+        if _informar_comparacion(base, documento, umbral):
+            sys.exit(1)
+
+
+@cli.command('compare', help="Compara dos archivos de resultados; termina con código 1 si hay regresiones.")
+@click.argument('base', type=click.Path(exists=True, dir_okay=False))
+@click.argument('actual', type=click.Path(exists=True, dir_okay=False))
+@click.option('--umbral', type=float, default=10, show_default=True,
+              help="Variación en porcentaje que se considera regresión.")
+def compare(base, actual, umbral):
+    try:
+        anterior, posterior = resultados.cargar(base), resultados.cargar(actual)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    if _informar_comparacion(anterior, posterior, umbral):
+        sys.exit(1)
+
+
+def _iniciar_aplicacion(productos, semilla):
+    # La configuración se lee del entorno al importar el paquete app: se fija antes de importarlo
+    trabajo = os.path.join(datos.DIRECTORIO_DATOS, f'trabajo_{os.getpid()}')
+    os.makedirs(trabajo, exist_ok=True)
+    atexit.register(shutil.rmtree, trabajo, ignore_errors=True)
+    base = os.path.join(trabajo, 'tienda.db')
+    os.environ['REPOSITORY_BACKEND'] = 'sqlite'
+    os.environ['SQLITE_DATABASE'] = base
+    # Contadores de versión y métricas propios, para no mezclarse con un servidor local
+    os.environ['TABLE_VERSIONS_FILE'] = os.path.join(trabajo, 'versiones.bin')
+    os.environ['METRICS_DIR'] = os.path.join(trabajo, 'metricas')
+    # Todas las solicitudes vienen del mismo cliente: sin esto auth_login mediría solo 429
+    os.environ.setdefault('AUTH_RATE_LIMIT', '0')
+
+    plantilla = datos.preparar_plantilla(
+        productos, semilla, os.path.join(RAIZ, 'tienda_online.sql'), informar=lambda texto: click.echo(texto, err=True)
+    )
+    datos.copiar_plantilla(plantilla, base)
+
+    from app import create_app
+    click.echo(f"Iniciando la aplicación sobre {base}", err=True)
+    return create_app()
+
+
+def _linea(nombre, *valores):
+    columnas = [f"{'-' if valor is None else valor:>10}" for valor in valores]
+    return f"{nombre:<28}" + ''.join(columnas)
+
+
+def _informar_comparacion(base, actual, umbral):
+    """
+    Muestra la comparación de dos ejecuciones.
+
+    Returns:
+        bool: True si hubo regresiones.
+    """
+    for aviso in resultados.advertencias(base, actual):
+        click.echo(f"Aviso: {aviso}", err=True)
+    filas = resultados.comparar(base, actual, umbral)
+    click.echo(f"Base: {base['fecha']} ({base.get('commit') or 'sin commit'})  "
+               f"Actual: {actual['fecha']} ({actual.get('commit') or 'sin commit'})")
+    click.echo(_linea('escenario', 'rps', 'p50', 'p95', 'p99', ''))
+    regresiones = 0
+    for fila in filas:
+        variaciones = []
+        for metrica, valores in fila['metricas'].items():
+            variacion = valores['variacion']
+            variaciones.append('-' if variacion is None else f"{variacion:+.1f}%")
+        marca = 'REGRESIÓN: ' + ', '.join(fila['regresiones']) if fila['regresiones'] else ''
+        click.echo(_linea(fila['escenario'], *variaciones) + '  ' + marca)
+        regresiones += bool(fila['regresiones'])
+    click.echo(f"{len(filas)} escenarios comparados, {regresiones} con regresiones "
+               f"(umbral {umbral:g}%; variación positiva = mejor)")
+    return regresiones > 0
+
+
+if __name__ == '__main__':
+    cli(prog_name='python -m benchmarks')
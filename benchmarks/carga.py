@@ -0,0 +1,182 @@
+"""
+Propósito: Generador de carga con concurrencia configurable.
+Funcionalidad: Define los clientes de los benchmarks (ClienteWSGI, que llama a la aplicación en
+el mismo proceso con el cliente de pruebas de Flask, y ClienteHTTP, que envía las solicitudes a
+un servidor con conexiones persistentes) y ejecutar(), que lanza un hilo por cliente concurrente
+sobre un escenario durante un calentamiento y una duración fijos, y mide la latencia de cada
+solicitud y los códigos de estado obtenidos. Solo se mide el envío y la respuesta: armar el
+cuerpo y recargar los datos de prueba no cuentan.
+"""
+
+import collections
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+
+class ClienteWSGI:
+    """
+    Envía las solicitudes a la aplicación en el mismo proceso, sin red.
+    """
+
+    def __init__(self, app):
+        self._cliente = app.test_client()
+
+    def enviar(self, metodo, ruta, cuerpo=None, cabeceras=None):
+        """
+        Returns:
+            tuple[int, bytes]: Código de estado y cuerpo de la respuesta.
+        """
+        respuesta = self._cliente.open(ruta, method=metodo, json=cuerpo, headers=cabeceras)
+        return respuesta.status_code, respuesta.get_data()
+
+
+class ClienteHTTP:
+    """
+    Envía las solicitudes a un servidor HTTP manteniendo la conexión abierta entre solicitudes.
+    """
+
+    def __init__(self, url):
+        partes = urllib.parse.urlsplit(url)
+        clase = http.client.HTTPSConnection if partes.scheme == 'https' else http.client.HTTPConnection
+        self._fabrica = lambda: clase(partes.hostname, partes.port, timeout=30)
+        self._prefijo = partes.path.rstrip('/')
+        self._conexion = None
+
+    def enviar(self, metodo, ruta, cuerpo=None, cabeceras=None):
+        datos = None
+        cabeceras = dict(cabeceras or {})
+        if cuerpo is not None:
+            datos = json.dumps(cuerpo).encode('utf-8')
+            cabeceras['Content-Type'] = 'application/json'
+        # Un reintento si el servidor cerró la conexión persistente entre solicitudes
+        for intento in range(2):
+            if self._conexion is None:
+                self._conexion = self._fabrica()
+            try:
+                self._conexion.request(metodo, self._prefijo + ruta, body=datos, headers=cabeceras)
+                respuesta = self._conexion.getresponse()
+                contenido = respuesta.read()
+            except (http.client.HTTPException, ConnectionError):
+                self._conexion.close()
+                self._conexion = None
+                if intento:
+                    raise
+                continue
+            if respuesta.will_close:
+                self._conexion.close()
+                self._conexion = None
+            return respuesta.status, contenido
+
+    def cerrar(self):
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+
+
+class Medicion:
+    """
+    Resultado de un escenario: latencias en segundos de las solicitudes iniciadas después del
+    calentamiento, solicitudes por código de estado (0 = error de conexión) y errores.
+    """
+
+    def __init__(self, escenario, concurrencia):
+        self.escenario = escenario
+        self.concurrencia = concurrencia
+        self.latencias = []
+        self.estados = collections.Counter()
+        self.errores = 0
+        self.segundos = 0.0
+        self.ejemplos = {}  # código de estado inesperado -> cuerpo de una respuesta
+
+
+def ejecutar(escenario, crear_cliente, contexto, concurrencia, duracion, calentamiento, semilla):
+    """
+    Ejecuta un escenario con varios clientes concurrentes.
+
+    Args:
+        escenario (Escenario): Ruta bajo carga.
+        crear_cliente (callable): Devuelve un cliente nuevo para cada hilo.
+        contexto (Contexto): Datos compartidos por los hilos.
+        concurrencia (int): Hilos que envían solicitudes sin pausa.
+        duracion (float): Segundos medidos.
+        calentamiento (float): Segundos previos que no se miden.
+        semilla (int): Semilla de los datos aleatorios de cada hilo.
+
+    Returns:
+        Medicion
+
+    Raises:
+        ErrorPreparacion: Si un hilo no pudo preparar sus datos (por ejemplo, la reserva de
+            productos a eliminar).
+    """
+    medicion = Medicion(escenario, concurrencia)
+    lock = threading.Lock()
+    salida = threading.Barrier(concurrencia + 1)
+    tiempos = {}
+    fallos = []
+    finales = []
+
+    def trabajar(numero):
+        cliente = crear_cliente()
+        rng = random.Random(f"{semilla}:{escenario.nombre}:{numero}")
+        latencias = []
+        estados = collections.Counter()
+        ejemplos = {}
+        ultimo = 0.0
+        salida.wait()
+        inicio_medicion = tiempos['inicio']
+        fin = tiempos['fin']
+        try:
+            while True:
+                metodo, ruta, cuerpo, cabeceras = escenario.solicitud(contexto, rng, cliente)
+                inicio = time.perf_counter()
+                if inicio >= fin:
+                    break
+                try:
+                    estado, contenido = cliente.enviar(metodo, ruta, cuerpo, cabeceras)
+                except (OSError, http.client.HTTPException) as error:
+                    estado, contenido = 0, str(error).encode('utf-8')
+                termino = time.perf_counter()
+                # Se mide toda solicitud iniciada dentro de la ventana, aunque termine después:
+                # descartar las que cruzan el final sesgaría los percentiles altos
+                if inicio < inicio_medicion:
+                    continue
+                latencias.append(termino - inicio)
+                ultimo = termino
+                estados[estado] += 1
+                if estado not in escenario.esperados and estado not in ejemplos:
+                    ejemplos[estado] = contenido[:300].decode('utf-8', 'replace')
+        except Exception as error:
+            with lock:
+                fallos.append(error)
+        finally:
+            if hasattr(cliente, 'cerrar'):
+                cliente.cerrar()
+            with lock:
+                medicion.latencias.extend(latencias)
+                medicion.estados.update(estados)
+                for estado, contenido in ejemplos.items():
+                    medicion.ejemplos.setdefault(estado, contenido)
+                finales.append(ultimo)
+
+    hilos = [threading.Thread(target=trabajar, args=(numero,), daemon=True) for numero in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    ahora = time.perf_counter()
+    tiempos['inicio'] = ahora + calentamiento
+    tiempos['fin'] = ahora + calentamiento + duracion
+    salida.wait()
+    for hilo in hilos:
+        hilo.join()
+    if fallos:
+        raise fallos[0]
+    # La ventana termina con la última respuesta medida
+    medicion.segundos = max(max(finales) - tiempos['inicio'], duracion)
+    medicion.errores = sum(
+        cantidad for estado, cantidad in medicion.estados.items() if estado not in escenario.esperados
+    )
+    return medicion
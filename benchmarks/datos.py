@@ -0,0 +1,123 @@
+"""
+Propósito: Bases de datos de prueba para los benchmarks.
+Funcionalidad: Genera, a partir de tienda_online.sql, una base SQLite con el catálogo escalado a
+la cantidad de productos pedida (1K, 100K, 1M, ...). Los datos son deterministas para una
+semilla dada: nombres y descripciones con un vocabulario fijo (para que la búsqueda tenga
+coincidencias), precios y categorías pseudoaleatorios. La base generada se guarda como
+plantilla y cada ejecución trabaja sobre una copia, de modo que las escrituras de una corrida
+no cambian los datos de la siguiente.
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from decimal import Decimal
+
+# Directorio de las plantillas generadas (se reutilizan entre ejecuciones)
+DIRECTORIO_DATOS = os.path.join(tempfile.gettempdir(), 'tienda_online_bench')
+
+# Productos por categoría generada; con 1M de productos resultan 1000 categorías
+PRODUCTOS_POR_CATEGORIA = 1000
+
+# Filas por transacción al poblar la plantilla
+LOTE = 5000
+
+# Vocabulario de los nombres y descripciones generados
+ADJETIVOS = ('rojo', 'azul', 'verde', 'negro', 'blanco', 'compacto', 'portátil', 'clásico', 'premium',
+             'económico', 'inalámbrico', 'ergonómico', 'resistente', 'ligero', 'digital', 'eléctrico')
+SUSTANTIVOS = ('teclado', 'ratón', 'monitor', 'silla', 'mesa', 'lámpara', 'cámara', 'altavoz', 'cable',
+               'cargador', 'auricular', 'mochila', 'reloj', 'taza', 'cuaderno', 'bolígrafo', 'router',
+               'disco', 'memoria', 'impresora')
+MARCAS = ('Andina', 'Boreal', 'Cumbre', 'Delta', 'Estrella', 'Faro', 'Glaciar', 'Horizonte')
+
+
+def ruta_plantilla(productos, semilla):
+    """
+    Ruta de la plantilla de una cantidad de productos y una semilla.
+    """
+    return os.path.join(DIRECTORIO_DATOS, f'productos_{productos}_s{semilla}.db')
+
+
+def preparar_plantilla(productos, semilla, archivo_semilla, informar=print):
+    """
+    Devuelve la plantilla de la base, generándola si todavía no existe.
+
+    Args:
+        productos (int): Productos del catálogo (incluidos los del volcado).
+        semilla (int): Semilla de los datos generados.
+        archivo_semilla (str): Volcado tienda_online.sql.
+        informar (callable): Recibe los mensajes de avance.
+
+    Returns:
+        str: Ruta de la plantilla.
+    """
+    ruta = ruta_plantilla(productos, semilla)
+    if os.path.exists(ruta):
+        return ruta
+    os.makedirs(DIRECTORIO_DATOS, exist_ok=True)
+    # Se genera en un archivo temporal: una generación interrumpida no deja una plantilla a medias
+    temporal = ruta + f'.{os.getpid()}.tmp'
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    inicio = time.monotonic()
+    try:
+        _poblar(temporal, productos, semilla, archivo_semilla, informar)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    informar(f"Plantilla de {productos} productos generada en {time.monotonic() - inicio:.1f} s: {ruta}")
+    return ruta
+
+
+def copiar_plantilla(plantilla, destino):
+    """
+    Copia la plantilla en la base de trabajo de una ejecución.
+    """
+    for sufijo in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(destino + sufijo):
+            os.remove(destino + sufijo)
+    shutil.copyfile(plantilla, destino)
+
+
+def _poblar(ruta, productos, semilla, archivo_semilla, informar):
+    # Se importa aquí: cargar el paquete app lee la configuración del entorno
+    from app.repositorios import ConjuntoRepositorios
+    from app.repositorios.sqlite import FuenteSQLite
+
+    repos = ConjuntoRepositorios(FuenteSQLite(ruta, archivo_semilla))
+    rng = random.Random(semilla)
+    existentes = [fila['id'] for lote in repos.categorias.iterar(LOTE) for fila in lote]
+    faltantes = max(productos // PRODUCTOS_POR_CATEGORIA - len(existentes), 0)
+    if faltantes:
+        repos.categorias.importar([f"Categoría {numero}" for numero in range(1, faltantes + 1)])
+    categorias = [fila['id'] for lote in repos.categorias.iterar(LOTE) for fila in lote]
+    pendientes = productos - sum(len(lote) for lote in repos.productos.iterar(LOTE))
+    generados = 0
+    while generados < pendientes:
+        cantidad = min(LOTE, pendientes - generados)
+        repos.productos.importar([_producto(rng, categorias) for _ in range(cantidad)])
+        generados += cantidad
+        if generados % (LOTE * 20) == 0:
+            informar(f"{generados}/{pendientes} productos generados")
+    # Compacta el archivo: la plantilla se copia en cada ejecución
+    conexion = sqlite3.connect(ruta)
+    try:
+        conexion.execute("ANALYZE")
+        conexion.execute("VACUUM")
+    finally:
+        conexion.close()
+
+
+def _producto(rng, categorias):
+    adjetivo = rng.choice(ADJETIVOS)
+    sustantivo = rng.choice(SUSTANTIVOS)
+    marca = rng.choice(MARCAS)
+    nombre = f"{sustantivo.capitalize()} {adjetivo} {marca}"
+    precio = Decimal(rng.randint(100, 500000)).scaleb(-2)
+    descripcion = (f"{sustantivo.capitalize()} {marca} {adjetivo}, "
+                   f"{rng.choice(ADJETIVOS)} y {rng.choice(ADJETIVOS)}, modelo {rng.randint(1, 9999)}")
+    return nombre, precio, descripcion, rng.choice(categorias)
@@ -0,0 +1,212 @@
+"""
+Propósito: Escenarios de carga de los benchmarks, uno por ruta de la API.
+Funcionalidad: Define Escenario (cómo se arma cada solicitud y qué códigos de estado se
+consideran correctos), el catálogo ESCENARIOS con las lecturas y escrituras del catálogo, la
+autenticación con bcrypt, los cambios incrementales y la documentación, y Contexto, los datos
+compartidos por los hilos de carga (rango de IDs, categorías y tokens del usuario de prueba),
+que se obtienen a través de la propia API antes de medir.
+"""
+
+import itertools
+import json
+import threading
+import time
+
+from .datos import ADJETIVOS, MARCAS, SUSTANTIVOS
+
+# Usuario con el que se miden las rutas protegidas y /auth
+USUARIO_BENCH = {"numero": "bench-0001", "nombre": "Bench", "apellido": "Carga", "contrasena": "bench-secreto"}
+
+# Productos creados por cada recarga de la reserva que consumen las eliminaciones
+RESERVA_ELIMINACION = 200
+
+# Elementos de cada solicitud de /productos/bulk
+TAMANO_BULK = 100
+
+# Segundos de uso de un token de acceso antes de pedir otro (expiran a los 15 minutos)
+VIGENCIA_TOKENS = 600
+
+
+class ErrorPreparacion(Exception):
+    """
+    La API no respondió como se esperaba al preparar el contexto o un escenario.
+    """
+
+
+class Contexto:
+    """
+    Datos de la API compartidos por los hilos de un escenario.
+
+    Attributes:
+        id_min, id_max (int): Rango de IDs de los productos existentes al empezar.
+        categorias (list[int]): IDs de las categorías.
+        access_token, refresh_token (str): Tokens del usuario de prueba.
+    """
+
+    def __init__(self):
+        self.id_min = 0
+        self.id_max = 0
+        self.categorias = []
+        self.access_token = None
+        self.refresh_token = None
+        self._emitidos = 0.0
+        self._secuencia = itertools.count(1)
+        self._local = threading.local()
+
+    def preparar(self, cliente):
+        """
+        Lee el rango de productos y las categorías e inicia sesión con el usuario de prueba,
+        registrándolo si no existe.
+        """
+        self.id_min = _primer_id(cliente, '/productos/?limit=1&fields=id')
+        self.id_max = _primer_id(cliente, '/productos/?limit=1&fields=id&sort=-id')
+        self.categorias = []
+        ruta = '/categorias/?limit=500'
+        while ruta:
+            pagina = _json(cliente, 'GET', ruta)
+            self.categorias.extend(fila['id'] for fila in pagina['data'])
+            cursor = pagina.get('next_cursor')
+            ruta = f'/categorias/?limit=500&cursor={cursor}' if cursor else None
+        self.iniciar_sesion(cliente)
+
+    def iniciar_sesion(self, cliente):
+        """
+        Obtiene tokens nuevos del usuario de prueba.
+        """
+        credenciales = {"numero": USUARIO_BENCH["numero"], "contrasena": USUARIO_BENCH["contrasena"]}
+        estado, cuerpo = cliente.enviar('POST', '/auth/login', credenciales)
+        if estado == 404:
+            estado, cuerpo = cliente.enviar('POST', '/auth/register', USUARIO_BENCH)
+        if estado not in (200, 201):
+            raise ErrorPreparacion(f"No se pudo iniciar sesión con el usuario de prueba ({estado})")
+        tokens = json.loads(cuerpo)
+        self.access_token = tokens['access_token']
+        self.refresh_token = tokens['refresh_token']
+        self._emitidos = time.monotonic()
+
+    def renovar(self, cliente):
+        """
+        Pide tokens nuevos si los actuales podrían expirar durante el siguiente escenario.
+        """
+        if time.monotonic() - self._emitidos > VIGENCIA_TOKENS:
+            self.iniciar_sesion(cliente)
+
+    def autorizacion(self, refresco=False):
+        return {"Authorization": "Bearer " + (self.refresh_token if refresco else self.access_token)}
+
+    def secuencia(self):
+        """
+        Número único entre hilos (nombres y números de usuario sin repetir).
+        """
+        return next(self._secuencia)
+
+    def id_para_eliminar(self, cliente, rng):
+        """
+        Devuelve un producto que nadie más elimina; la reserva de cada hilo se recarga con
+        /productos/bulk fuera de la medición.
+        """
+        reserva = getattr(self._local, 'reserva', None)
+        if not reserva:
+            items = [producto_aleatorio(self, rng) for _ in range(RESERVA_ELIMINACION)]
+            estado, cuerpo = cliente.enviar('POST', '/productos/bulk', items, self.autorizacion())
+            if estado != 200:
+                raise ErrorPreparacion(f"No se pudo recargar la reserva de eliminación ({estado})")
+            reserva = self._local.reserva = [r['id'] for r in json.loads(cuerpo)['resultados'] if 'id' in r]
+        return reserva.pop()
+
+
+class Escenario:
+    """
+    Una ruta de la API bajo carga.
+
+    Args:
+        nombre (str): Identificador del escenario en los resultados.
+        grupo (str): 'lectura', 'escritura', 'auth' u 'otros'.
+        solicitud (callable): (contexto, rng, cliente) -> (método, ruta, cuerpo JSON, cabeceras).
+        esperados (tuple[int]): Códigos de estado correctos; el resto cuenta como error.
+    """
+
+    def __init__(self, nombre, grupo, solicitud, esperados=(200,)):
+        self.nombre = nombre
+        self.grupo = grupo
+        self.solicitud = solicitud
+        self.esperados = frozenset(esperados)
+
+
+def producto_aleatorio(contexto, rng):
+    return {
+        "nombre": f"{rng.choice(SUSTANTIVOS).capitalize()} {rng.choice(ADJETIVOS)} {rng.choice(MARCAS)}",
+        "precio": f"{rng.randint(100, 500000) / 100:.2f}",
+        "descripcion": f"Producto de carga {contexto.secuencia()}",
+        "categortia_id": rng.choice(contexto.categorias),
+    }
+
+
+def _id_producto(contexto, rng):
+    return rng.randint(contexto.id_min, contexto.id_max)
+
+
+def _json(cliente, metodo, ruta):
+    estado, cuerpo = cliente.enviar(metodo, ruta)
+    if estado != 200:
+        raise ErrorPreparacion(f"{metodo} {ruta} respondió {estado}")
+    return json.loads(cuerpo)
+
+
+def _primer_id(cliente, ruta):
+    filas = _json(cliente, 'GET', ruta)['data']
+    if not filas:
+        raise ErrorPreparacion("La base no tiene productos")
+    return filas[0]['id']
+
+
+ESCENARIOS = [
+    # Lecturas del catálogo
+    Escenario('productos_listar', 'lectura', lambda c, rng, _: ('GET', '/productos/?limit=50', None, None)),
+    Escenario('productos_filtrar', 'lectura', lambda c, rng, _: (
+        'GET', f'/productos/?limit=50&categortia_id={rng.choice(c.categorias)}&precio_min={rng.randint(1, 2000)}',
+        None, None)),
+    Escenario('productos_incluir_categoria', 'lectura', lambda c, rng, _: (
+        'GET', '/productos/?limit=50&include=categoria&sort=-id', None, None)),
+    Escenario('producto_obtener', 'lectura', lambda c, rng, _: (
+        'GET', f'/productos/{_id_producto(c, rng)}', None, None), esperados=(200, 404)),
+    Escenario('producto_obtener_campos', 'lectura', lambda c, rng, _: (
+        'GET', f'/productos/{_id_producto(c, rng)}?fields=id,nombre,precio', None, None), esperados=(200, 404)),
+    Escenario('productos_por_ids', 'lectura', lambda c, rng, _: (
+        'GET', '/productos/?ids=' + ','.join(str(_id_producto(c, rng)) for _ in range(20)), None, None)),
+    Escenario('productos_buscar', 'lectura', lambda c, rng, _: (
+        'GET', f'/productos/search?q={rng.choice(SUSTANTIVOS)}+{rng.choice(ADJETIVOS)}&limit=20', None, None)),
+    Escenario('categorias_listar', 'lectura', lambda c, rng, _: ('GET', '/categorias/?limit=50', None, None)),
+    Escenario('categoria_obtener', 'lectura', lambda c, rng, _: (
+        'GET', f'/categorias/{rng.choice(c.categorias)}', None, None), esperados=(200, 404)),
+    Escenario('categorias_stats', 'lectura', lambda c, rng, _: ('GET', '/categorias/stats', None, None)),
+    Escenario('cambios', 'lectura', lambda c, rng, _: ('GET', '/changes?since=0&limit=100', None, None)),
+    # Escrituras del catálogo (requieren JWT)
+    Escenario('producto_crear', 'escritura', lambda c, rng, _: (
+        'POST', '/productos/', producto_aleatorio(c, rng), c.autorizacion()), esperados=(201,)),
+    Escenario('producto_actualizar', 'escritura', lambda c, rng, _: (
+        'PUT', f'/productos/{_id_producto(c, rng)}', producto_aleatorio(c, rng), c.autorizacion()),
+        esperados=(200, 404)),
+    Escenario('producto_eliminar', 'escritura', lambda c, rng, cliente: (
+        'DELETE', f'/productos/{c.id_para_eliminar(cliente, rng)}', None, c.autorizacion())),
+    Escenario('productos_bulk_crear', 'escritura', lambda c, rng, _: (
+        'POST', '/productos/bulk', [producto_aleatorio(c, rng) for _ in range(TAMANO_BULK)], c.autorizacion())),
+    Escenario('categoria_crear', 'escritura', lambda c, rng, _: (
+        'POST', '/categorias/', {"nombre": f"Carga {c.secuencia()}"}, c.autorizacion()), esperados=(201,)),
+    # Autenticación (bcrypt en /login y /register)
+    Escenario('auth_login', 'auth', lambda c, rng, _: (
+        'POST', '/auth/login', {"numero": USUARIO_BENCH["numero"], "contrasena": USUARIO_BENCH["contrasena"]}, None)),
+    Escenario('auth_register', 'auth', lambda c, rng, _: (
+        'POST', '/auth/register', dict(USUARIO_BENCH, numero=f"bench-{rng.getrandbits(48):012x}-{c.secuencia()}"),
+        None), esperados=(201,)),
+    Escenario('auth_me', 'auth', lambda c, rng, _: ('GET', '/auth/me', None, c.autorizacion())),
+    Escenario('auth_refresh', 'auth', lambda c, rng, _: ('POST', '/auth/refresh', None, c.autorizacion(refresco=True))),
+    # Rutas sin base de datos
+    Escenario('documentacion', 'otros', lambda c, rng, _: ('GET', '/documentacion/swagger.json', None, None)),
+]
+
+# Nombre -> escenario
+POR_NOMBRE = {escenario.nombre: escenario for escenario in ESCENARIOS}
+
+# Grupos en el orden en que se ejecutan
+GRUPOS = ('lectura', 'escritura', 'auth', 'otros')
@@ -0,0 +1,177 @@
+"""
+Propósito: Resumen, almacenamiento y comparación de los resultados de los benchmarks.
+Funcionalidad: Resume cada Medicion en rendimiento (solicitudes por segundo), latencias p50,
+p95, p99, media y máxima en milisegundos, códigos de estado y tasa de errores; guarda una
+ejecución completa como JSON junto con sus parámetros, el commit y el entorno; y compara dos
+ejecuciones escenario por escenario, marcando como regresión una caída del rendimiento o una
+subida de p95/p99 mayores que el umbral indicado, o más errores que en la base.
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+# Versión del formato de los archivos de resultados
+VERSION_FORMATO = 1
+
+# Métricas comparadas: nombre -> True si un valor mayor es mejor
+METRICAS_COMPARADAS = {'rps': True, 'p50_ms': False, 'p95_ms': False, 'p99_ms': False}
+
+# Métricas que marcan regresión; p50 solo se informa
+METRICAS_REGRESION = ('rps', 'p95_ms', 'p99_ms')
+
+
+def percentil(ordenadas, p):
+    """
+    Percentil por rango más cercano de una lista ordenada (None si está vacía).
+    """
+    if not ordenadas:
+        return None
+    rango = max(1, -(-len(ordenadas) * p // 100))
+    return ordenadas[int(rango) - 1]
+
+
+def resumir(medicion):
+    """
+    Resume una Medicion.
+
+    Returns:
+        dict: Rendimiento, latencias en milisegundos, códigos de estado y errores.
+    """
+    ordenadas = sorted(medicion.latencias)
+    total = len(ordenadas)
+
+    def ms(segundos):
+        return None if segundos is None else round(segundos * 1000, 3)
+
+    resumen = {
+        "grupo": medicion.escenario.grupo,
+        "concurrencia": medicion.concurrencia,
+        "solicitudes": total,
+        "segundos": round(medicion.segundos, 3),
+        "rps": round(total / medicion.segundos, 2) if medicion.segundos else 0.0,
+        "p50_ms": ms(percentil(ordenadas, 50)),
+        "p95_ms": ms(percentil(ordenadas, 95)),
+        "p99_ms": ms(percentil(ordenadas, 99)),
+        "media_ms": ms(sum(ordenadas) / total) if total else None,
+        "max_ms": ms(ordenadas[-1]) if total else None,
+        "estados": {str(estado): cantidad for estado, cantidad in sorted(medicion.estados.items())},
+        "errores": medicion.errores,
+        "tasa_errores": round(medicion.errores / total, 4) if total else 0.0,
+    }
+    if medicion.ejemplos:
+        resumen["ejemplos_error"] = {str(estado): cuerpo for estado, cuerpo in medicion.ejemplos.items()}
+    return resumen
+
+
+def documento(parametros, escenarios):
+    """
+    Arma el documento JSON de una ejecución.
+
+    Args:
+        parametros (dict): Opciones con que se ejecutó.
+        escenarios (dict): Nombre del escenario -> resumen.
+    """
+    return {
+        "version": VERSION_FORMATO,
+        "fecha": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        "commit": _commit(),
+        "entorno": {
+            "python": platform.python_version(),
+            "implementacion": platform.python_implementation(),
+            "sistema": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": parametros,
+        "escenarios": escenarios,
+    }
+
+
+def guardar(ruta, datos):
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, ensure_ascii=False, indent=2)
+        archivo.write('\n')
+
+
+def cargar(ruta):
+    """
+    Lee un archivo de resultados.
+
+    Raises:
+        ValueError: Si el archivo no es un resultado de este formato.
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        try:
+            datos = json.load(archivo)
+        except ValueError as error:
+            raise ValueError(f"{ruta} no es JSON válido: {error}")
+    if not isinstance(datos, dict) or datos.get('version') != VERSION_FORMATO:
+        raise ValueError(f"{ruta} no es un archivo de resultados (versión {VERSION_FORMATO})")
+    return datos
+
+
+def comparar(base, actual, umbral):
+    """
+    Compara los escenarios presentes en dos ejecuciones.
+
+    Args:
+        base (dict): Resultados de referencia.
+        actual (dict): Resultados a evaluar.
+        umbral (float): Variación relativa en porcentaje que se considera regresión.
+
+    Returns:
+        list[dict]: Por escenario, las métricas de ambas ejecuciones, su variación en porcentaje
+        (positiva = mejor) y las regresiones encontradas.
+    """
+    filas = []
+    for nombre, resumen in actual['escenarios'].items():
+        anterior = base['escenarios'].get(nombre)
+        if anterior is None:
+            continue
+        fila = {"escenario": nombre, "metricas": {}, "regresiones": []}
+        for metrica, mayor_es_mejor in METRICAS_COMPARADAS.items():
+            antes, ahora = anterior.get(metrica), resumen.get(metrica)
+            variacion = None
+            if antes and ahora is not None:
+                variacion = (ahora - antes) / antes * 100
+                if not mayor_es_mejor:
+                    # + 0.0 evita mostrar -0.0 cuando no hay variación
+                    variacion = -variacion + 0.0
+                if metrica in METRICAS_REGRESION and variacion < -umbral:
+                    fila["regresiones"].append(metrica)
+            fila["metricas"][metrica] = {"base": antes, "actual": ahora, "variacion": variacion}
+        if resumen.get('tasa_errores', 0) > anterior.get('tasa_errores', 0):
+            fila["regresiones"].append('errores')
+        filas.append(fila)
+    return filas
+
+
+def advertencias(base, actual):
+    """
+    Diferencias de parámetros o entorno que hacen poco comparables dos ejecuciones.
+    """
+    avisos = []
+    for clave in ('productos', 'concurrencia', 'destino'):
+        antes, ahora = base['parametros'].get(clave), actual['parametros'].get(clave)
+        if antes != ahora:
+            avisos.append(f"{clave} distinto: {antes} -> {ahora}")
+    if base['entorno'].get('cpus') != actual['entorno'].get('cpus'):
+        avisos.append(f"cpus distinto: {base['entorno'].get('cpus')} -> {actual['entorno'].get('cpus')}")
+    return avisos
+
+
+def _commit():
+    # Commit del árbol medido; None fuera de un repositorio git
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=raiz, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
@@ -0,0 +1,50 @@
+# Propósito: Configuración de gunicorn (la lee automáticamente al iniciarse desde la raíz del proyecto).
+# Funcionalidad: Define los hooks del proceso maestro que mantienen el directorio de métricas
+# (METRICS_DIR) coherente entre los workers: al arrancar borra los archivos de ejecuciones
+# anteriores y, cuando un worker termina, suma sus valores a los de los workers retirados y
+# borra su archivo antes de que otro worker pueda reutilizar el pid. Los workers son de gevent:
+# cada conexión abierta de GET /productos/stream ocupa un greenlet en lugar de un worker
+# síncrono completo. Ejemplo:
+# gunicorn -w 4 run:app
+
+import os
+
+# Clase de worker (GUNICORN_WORKER_CLASS=sync para desactivar gevent) y conexiones
+# simultáneas por worker, incluidas las de SSE
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 2000))
+
+# Los módulos de la aplicación se importan aquí, en el maestro, antes del fork: sin parchear
+# antes, sus threading.Lock serían bloqueos del sistema y un greenlet que cede mientras tiene
+# uno tomado bloquearía a todo el worker
+if worker_class == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+# Importa la configuración y las funciones de mantenimiento del directorio de métricas
+from app.config import Config
+from app.metricas import limpiar_directorio, retirar_worker
+
+
+def _directorio_metricas():
+    # Sin volcado no hay archivos que mantener
+    if Config.METRICS_ENABLED and Config.METRICS_PERSIST and Config.METRICS_DIR:
+        return Config.METRICS_DIR
+    return None
+
+
+def on_starting(server):
+    # Antes de crear los workers: los contadores empiezan de cero en cada arranque del servicio
+    directorio = _directorio_metricas()
+    if directorio:
+        limpiar_directorio(directorio)
+
+
+def child_exit(server, worker):
+    # En el maestro, después de que el worker terminó (ya volcó sus valores al salir)
+    directorio = _directorio_metricas()
+    if directorio:
+        try:
+            retirar_worker(directorio, worker.pid)
+        except OSError as error:
+            server.log.warning("No se pudieron retirar las métricas del worker %s: %s", worker.pid, error)
@@ -0,0 +1,44 @@
+"""
+Propósito: Configuración común de las pruebas.
+Funcionalidad: Fija el entorno antes de importar el paquete app (la configuración se lee al
+importarlo): backend SQLite en memoria con los datos de tienda_online.sql, bcrypt sin pool de
+procesos y con pocas rondas, y sin límite de intentos en /auth. Cada prueba crea su propia
+aplicación (base nueva) con los contadores de versión y las métricas en un directorio temporal,
+y dispone de un cliente y de las cabeceras de un usuario autenticado.
+"""
+
+import os
+
+os.environ['REPOSITORY_BACKEND'] = 'sqlite'
+os.environ['SQLITE_DATABASE'] = ':memory:'
+os.environ['BCRYPT_WORKERS'] = '0'
+os.environ['BCRYPT_ROUNDS'] = '4'
+os.environ['AUTH_RATE_LIMIT'] = '0'
+os.environ.pop('FLASK_RUN_FROM_CLI', None)
+
+import pytest
+
+from app import create_app
+from app.config import Config
+
+# Usuario registrado por la fixture autorizacion
+USUARIO = {"numero": "prueba-0001", "nombre": "Prueba", "apellido": "Tienda", "contrasena": "secreto-prueba"}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', str(tmp_path / 'versiones.bin'))
+    monkeypatch.setattr(Config, 'METRICS_DIR', str(tmp_path / 'metricas'))
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def autorizacion(client):
+    respuesta = client.post('/auth/register', json=USUARIO)
+    assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+    return {"Authorization": "Bearer " + respuesta.get_json()['access_token']}
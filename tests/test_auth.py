@@ -0,0 +1,76 @@
+"""
+Propósito: Pruebas de la autenticación y de la caché de perfiles.
+Funcionalidad: Comprueba que /auth/me responde con el perfil del token, que sin claims lo lee
+de la base una sola vez y luego de la caché, que el inicio de sesión con rehash de la
+contraseña (costo de bcrypt cambiado) no altera el perfil servido, y que /auth/refresh emite el
+perfil actual (tras invalidar la caché) y responde 404 si el usuario ya no existe.
+"""
+
+from flask_jwt_extended import decode_token
+
+from conftest import USUARIO
+
+CREDENCIALES = {"numero": USUARIO["numero"], "contrasena": USUARIO["contrasena"]}
+
+
+def _me(client, token):
+    return client.get('/auth/me', headers={"Authorization": "Bearer " + token})
+
+
+def test_me_desde_claims(client, autorizacion):
+    respuesta = client.get('/auth/me', headers=autorizacion)
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['usuario']['numero'] == USUARIO['numero']
+
+
+def test_me_sin_claims_usa_la_cache(app, client, autorizacion):
+    perfiles = app.extensions['perfiles']
+    perfiles.claims = False
+    token = client.post('/auth/login', json=CREDENCIALES).get_json()['access_token']
+    for _ in range(3):
+        respuesta = _me(client, token)
+        assert respuesta.status_code == 200
+        assert respuesta.get_json()['usuario']['nombre'] == USUARIO['nombre']
+    contadores = perfiles.estadisticas()
+    assert contadores['entradas'] == 1
+
+
+def test_login_con_rehash_conserva_el_perfil(app, client, autorizacion):
+    hashing = app.extensions['hashing']
+    hashing.costo += 1
+    respuesta = client.post('/auth/login', json=CREDENCIALES)
+    assert respuesta.status_code == 200
+    usuario = app.extensions['repositorios'].usuarios.por_numero(USUARIO['numero'])
+    assert not hashing.requiere_rehash(usuario['contrasena'])
+    assert _me(client, respuesta.get_json()['access_token']).get_json()['usuario']['apellido'] == USUARIO['apellido']
+
+
+def _ejecutar(app, sql, parametros):
+    # Escritura directa en la base, fuera de la API
+    repos = app.extensions['repositorios']
+    with repos.fuente.transaccion() as cursor:
+        repos.fuente.ejecutar(cursor, sql, parametros)
+
+
+def test_refresh_emite_el_perfil_actual(app, client, autorizacion):
+    sesion = client.post('/auth/login', json=CREDENCIALES).get_json()
+    refresco = {"Authorization": "Bearer " + sesion['refresh_token']}
+    id = sesion['usuario']['id']
+    assert client.post('/auth/refresh', headers=refresco).status_code == 200
+
+    _ejecutar(app, "UPDATE usuario SET nombre = %s WHERE id = %s", ("Renombrado", id))
+    app.extensions['perfiles'].invalidar(id)
+    respuesta = client.post('/auth/refresh', headers=refresco)
+    assert respuesta.status_code == 200
+    with app.app_context():
+        claims = decode_token(respuesta.get_json()['access_token'])
+    assert claims['perfil']['nombre'] == "Renombrado"
+
+
+def test_refresh_de_usuario_eliminado(app, client, autorizacion):
+    sesion = client.post('/auth/login', json=CREDENCIALES).get_json()
+    id = sesion['usuario']['id']
+    _ejecutar(app, "DELETE FROM usuario WHERE id = %s", (id,))
+    app.extensions['perfiles'].invalidar(id)
+    respuesta = client.post('/auth/refresh', headers={"Authorization": "Bearer " + sesion['refresh_token']})
+    assert respuesta.status_code == 404
@@ -0,0 +1,112 @@
+"""
+Propósito: Pruebas de la búsqueda de productos.
+Funcionalidad: Comprueba el índice invertido por sí solo (tokenización, coincidencia sin acentos,
+expansión por prefijo, orden por relevancia y paginación con cursor) y que la extensión aplica
+las escrituras de otros workers leyendo el registro de cambios, con reconstrucción completa
+solo cuando esas entradas ya se compactaron.
+"""
+
+import time
+
+import pytest
+
+from app.busqueda import IndiceInvertido, codificar_cursor, decodificar_cursor, tokenizar
+from app.paginacion import ParametroInvalido
+
+
+def _indice(*productos):
+    indice = IndiceInvertido()
+    for id, nombre, descripcion in productos:
+        indice.agregar({"id": id, "nombre": nombre, "descripcion": descripcion})
+    return indice
+
+
+def _ids(indice, texto, limite=10, despues=None):
+    return [id for id, _ in indice.buscar(tokenizar(texto), limite, despues, max_expansiones=50, min_prefijo=2)]
+
+
+def test_tokenizar_minusculas_sin_acentos_ni_signos():
+    assert tokenizar("¡Cámara ÑANDÚ, 4K_ultra!") == ['camara', 'nandu', '4k', 'ultra']
+    assert tokenizar("") == [] and tokenizar(None) == []
+
+
+def test_buscar_ignora_acentos_y_exige_todos_los_terminos():
+    indice = _indice((1, "Cámara réflex", None), (2, "Cámara compacta", "Batería extra"), (3, "Trípode", None))
+    assert _ids(indice, "CAMARA") == [1, 2]
+    assert _ids(indice, "cámara bateria") == [2]
+    assert _ids(indice, "camara tripode") == []
+
+
+def test_prefijo_y_orden_por_relevancia():
+    indice = _indice(
+        (1, "Funda", "Para cámara"),  # solo en la descripción
+        (2, "Camiseta", None),  # prefijo en el nombre
+        (3, "Cam", None),  # palabra completa en el nombre
+        (4, "Camara", None),  # prefijo en el nombre
+    )
+    pares = indice.buscar(['cam'], 10, None, max_expansiones=50, min_prefijo=2)
+    # Completa en el nombre > prefijo en el nombre (la palabra más rara primero) > prefijo en
+    # la descripción
+    assert [id for id, _ in pares] == [3, 2, 4, 1]
+    relevancias = [relevancia for _, relevancia in pares]
+    assert relevancias == sorted(relevancias, reverse=True) and len(set(relevancias)) == 4
+    # Más corto que min_prefijo: solo la palabra completa
+    assert _ids(_indice((1, "C", None), (2, "Cable", None)), "c") == [1]
+
+
+def test_agregar_reemplaza_y_quitar_elimina():
+    indice = _indice((1, "Cámara", None))
+    indice.agregar({"id": 1, "nombre": "Trípode", "descripcion": None})
+    assert _ids(indice, "camara") == [] and _ids(indice, "tripode") == [1]
+    indice.quitar(1)
+    assert _ids(indice, "tripode") == [] and indice.vocabulario == []
+
+
+def test_paginacion_con_cursor_recorre_el_orden_completo():
+    indice = _indice(*[(id, "Cable" if id % 3 else "Cable cable", "USB" if id % 2 else None) for id in range(1, 12)])
+    completo = indice.buscar(['cable'], 100, None, max_expansiones=50, min_prefijo=2)
+    vistos, despues = [], None
+    while True:
+        pagina = indice.buscar(['cable'], 3, despues, max_expansiones=50, min_prefijo=2)
+        if not pagina:
+            break
+        vistos.extend(pagina)
+        id, relevancia = pagina[-1]
+        despues = decodificar_cursor(codificar_cursor(relevancia, id))
+    assert vistos == completo and len(completo) == 11
+    with pytest.raises(ParametroInvalido):
+        decodificar_cursor("no-es-un-cursor")
+
+
+def test_escrituras_de_otro_worker_se_aplican_desde_el_registro(app, client):
+    busqueda = app.extensions['busqueda']
+    repos = app.extensions['repositorios']
+    assert len(client.get('/productos/search?q=smartphone').get_json()['data']) == 4
+    # Otro worker escribe en la base e incrementa el contador compartido sin notificar a este
+    id = repos.productos.crear('Cámara réflex', '500.00', None, 3)
+    repos.productos.eliminar(8)
+    app.extensions['versiones'].incrementar('producto')
+
+    assert [p['id'] for p in client.get('/productos/search?q=camara').get_json()['data']] == [id]
+    assert {p['id'] for p in client.get('/productos/search?q=smartphone').get_json()['data']} == {9, 10, 11}
+    estado = busqueda.estadisticas()
+    assert estado['desfasado'] is False and estado['construyendo'] is False
+
+
+def test_registro_compactado_reconstruye_el_indice(app, client):
+    busqueda = app.extensions['busqueda']
+    repos = app.extensions['repositorios']
+    repos.productos.eliminar(8)
+    app.extensions['versiones'].incrementar('producto')
+    registro = app.extensions['registro_cambios']
+    registro.retencion = -60
+    assert registro.compactar() == 1
+
+    busqueda.intervalo = 0
+    client.get('/productos/search?q=smartphone')
+    for _ in range(100):
+        if not busqueda.estadisticas()['construyendo']:
+            break
+        time.sleep(0.01)
+    assert busqueda.estadisticas()['desfasado'] is False
+    assert {p['id'] for p in client.get('/productos/search?q=smartphone').get_json()['data']} == {9, 10, 11}
@@ -0,0 +1,116 @@
+"""
+Propósito: Pruebas del registro de cambios (/changes) y de la eliminación de categorías.
+Funcionalidad: Comprueba que las entradas se entregan en cuanto se confirman, con secuencias
+consecutivas tomadas del contador (una escritura simple lo hace con dos sentencias); que
+eliminar una categoría se refleja en la caché, la búsqueda, las estadísticas y el registro
+(incluidos los productos eliminados en cascada), también cuando otro hilo crea un producto en la
+categoría mientras se elimina; y que un cliente con una secuencia anterior a la compactación
+recibe 410 y puede continuar desde la marca de agua informada.
+"""
+
+import threading
+
+from app.repositorios import CategoriaInexistente
+
+
+def test_cambios_visibles_al_confirmar_con_secuencias_consecutivas(client, autorizacion):
+    producto = {"nombre": "Tablet", "precio": "199.00", "descripcion": None, "categortia_id": 3}
+    id = client.post('/productos/', json=producto, headers=autorizacion).get_json()[1]['id']
+    assert client.delete('/productos/8', headers=autorizacion).status_code == 200
+    cuerpo = client.get('/changes?since=0').get_json()
+    assert [(c['seq'], c['table'], c['id'], c['op']) for c in cuerpo['changes']] == [
+        (1, 'producto', id, 'upsert'), (2, 'producto', 8, 'delete')
+    ]
+    assert cuerpo['changes'][0]['data']['nombre'] == 'Tablet'
+    assert cuerpo['high_water_mark'] == 2
+    assert client.get('/changes?since=2').get_json() == {"changes": [], "high_water_mark": 2, "has_more": False}
+
+
+def test_eliminar_categoria_en_cascada(client, autorizacion):
+    # Carga la caché, el índice de búsqueda y las estadísticas antes de eliminar
+    assert client.get('/productos/9').status_code == 200
+    assert {p['id'] for p in client.get('/productos/search?q=smartphone').get_json()['data']} == {8, 9, 10, 11}
+    estadisticas = client.get('/categorias/stats').get_json()['data']
+    assert 3 in [fila['categortia_id'] for fila in estadisticas]
+
+    assert client.delete('/categorias/3', headers=autorizacion).status_code == 200
+
+    assert client.get('/productos/9').status_code == 404
+    assert client.get('/categorias/3').status_code == 404
+    assert {p['id'] for p in client.get('/productos/search?q=smartphone').get_json()['data']} == {8, 11}
+    estadisticas = client.get('/categorias/stats').get_json()['data']
+    assert [fila['categortia_id'] for fila in estadisticas] == [5]
+    cambios = client.get('/changes?since=0').get_json()['changes']
+    assert [(c['table'], c['id'], c['op']) for c in cambios] == [
+        ('producto', 9, 'delete'), ('producto', 10, 'delete'), ('categoria', 3, 'delete')
+    ]
+
+
+def test_producto_creado_mientras_se_elimina_su_categoria(app, monkeypatch):
+    repos = app.extensions['repositorios']
+    fuente = repos.fuente
+    ejecutar = fuente.ejecutar
+    resultado = {}
+
+    def crear_producto():
+        try:
+            resultado['id'] = repos.productos.crear('Tablet', '199.00', None, 3)
+        except CategoriaInexistente:
+            resultado['error'] = 'categoria'
+
+    def ejecutar_y_crear(cursor, sql, parametros=()):
+        # Otro hilo crea un producto en la categoría justo cuando el borrado lee sus productos
+        if sql.startswith("SELECT id FROM producto WHERE categortia_id") and 'hilo' not in resultado:
+            resultado['hilo'] = threading.Thread(target=crear_producto)
+            resultado['hilo'].start()
+            resultado['hilo'].join(0.2)
+            resultado['esperaba'] = resultado['hilo'].is_alive()
+        return ejecutar(cursor, sql, parametros)
+
+    monkeypatch.setattr(fuente, 'ejecutar', ejecutar_y_crear)
+    eliminada, productos = repos.categorias.eliminar(3)
+    resultado['hilo'].join()
+
+    # La creación esperó al borrado y falló por la categoría: no hay producto sin registrar
+    assert eliminada and productos == [9, 10]
+    assert resultado['esperaba'] is True
+    assert resultado.get('error') == 'categoria' and 'id' not in resultado
+    assert repos.categorias.obtener(3) is None
+    assert [(c['tabla'], c['registro_id'], c['operacion']) for c in repos.cambios.leer(0, 100)] == [
+        ('producto', 9, 'delete'), ('producto', 10, 'delete'), ('categoria', 3, 'delete')
+    ]
+
+
+def test_crear_producto_registra_el_cambio_en_dos_sentencias(app, monkeypatch):
+    repos = app.extensions['repositorios']
+    fuente = repos.fuente
+    ejecutar = fuente.ejecutar
+    sentencias = []
+
+    def registrar(cursor, sql, parametros=()):
+        sentencias.append(sql.split()[0])
+        return ejecutar(cursor, sql, parametros)
+
+    monkeypatch.setattr(fuente, 'ejecutar', registrar)
+    id = repos.productos.crear('Tablet', '199.00', None, 3)
+    # INSERT del producto, incremento del contador e INSERT ... SELECT de la entrada
+    assert sentencias == ['INSERT', 'UPDATE', 'INSERT']
+    assert [(c['seq'], c['registro_id']) for c in repos.cambios.leer(0, 10)] == [(1, id)]
+
+
+def test_since_compactado_pide_resincronizacion(app, client, autorizacion):
+    for id in (8, 9):
+        assert client.delete(f'/productos/{id}', headers=autorizacion).status_code == 200
+    registro = app.extensions['registro_cambios']
+    registro.retencion = -60
+    assert registro.compactar() == 2
+
+    respuesta = client.get('/changes?since=0')
+    assert respuesta.status_code == 410
+    cuerpo = respuesta.get_json()
+    assert cuerpo['resync_required'] is True
+    assert cuerpo['high_water_mark'] == 2
+
+    assert client.delete('/productos/10', headers=autorizacion).status_code == 200
+    siguiente = client.get(f"/changes?since={cuerpo['high_water_mark']}").get_json()
+    assert [(c['seq'], c['id']) for c in siguiente['changes']] == [(3, 10)]
@@ -0,0 +1,97 @@
+"""
+Propósito: Pruebas de las rutas del catálogo sobre el backend SQLite.
+Funcionalidad: Comprueba la paginación por cursor de /productos/, las respuestas 304 con
+If-None-Match y su invalidación tras una escritura, y el resultado por elemento de las
+operaciones masivas de /productos/bulk.
+"""
+
+
+def _producto(nombre, categoria=3):
+    return {"nombre": nombre, "precio": "10.50", "descripcion": "Producto de prueba", "categortia_id": categoria}
+
+
+def test_paginacion_por_cursor_recorre_todos_sin_repetir(client):
+    vistos = []
+    ruta = '/productos/?limit=2'
+    while ruta:
+        respuesta = client.get(ruta)
+        assert respuesta.status_code == 200
+        pagina = respuesta.get_json()
+        assert len(pagina['data']) <= 2
+        vistos.extend(fila['id'] for fila in pagina['data'])
+        cursor = pagina['next_cursor']
+        ruta = f'/productos/?limit=2&cursor={cursor}' if cursor else None
+    assert vistos == [8, 9, 10, 11]
+
+
+def test_paginacion_descendente_y_cursor_invalido(client):
+    pagina = client.get('/productos/?limit=3&sort=-id').get_json()
+    assert [fila['id'] for fila in pagina['data']] == [11, 10, 9]
+    siguiente = client.get(f"/productos/?limit=3&sort=-id&cursor={pagina['next_cursor']}").get_json()
+    assert [fila['id'] for fila in siguiente['data']] == [8]
+    assert siguiente['next_cursor'] is None
+    assert client.get('/productos/?cursor=no-es-un-cursor').status_code == 400
+
+
+def test_etag_304_e_invalidacion_tras_escritura(client, autorizacion):
+    primera = client.get('/productos/8')
+    etag = primera.headers['ETag']
+    repetida = client.get('/productos/8', headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    assert repetida.get_data() == b''
+
+    actualizado = dict(_producto('Smartphone renovado', 5))
+    assert client.put('/productos/8', json=actualizado, headers=autorizacion).status_code == 200
+
+    nueva = client.get('/productos/8', headers={"If-None-Match": etag})
+    assert nueva.status_code == 200
+    assert nueva.headers['ETag'] != etag
+    assert nueva.get_json()['nombre'] == 'Smartphone renovado'
+
+
+def test_etag_de_listado_cambia_al_crear(client, autorizacion):
+    etag = client.get('/productos/?limit=50').headers['ETag']
+    assert client.get('/productos/?limit=50', headers={"If-None-Match": etag}).status_code == 304
+    assert client.post('/productos/', json=_producto('Tablet'), headers=autorizacion).status_code == 201
+    respuesta = client.get('/productos/?limit=50', headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert 'Tablet' in [fila['nombre'] for fila in respuesta.get_json()['data']]
+
+
+def test_bulk_crear_informa_cada_elemento(client, autorizacion):
+    items = [_producto('Monitor'), {"nombre": "Sin precio"}, _producto('Teclado', categoria=999), _producto('Mouse')]
+    respuesta = client.post('/productos/bulk', json=items, headers=autorizacion)
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.get_json()
+    assert (cuerpo['creados'], cuerpo['errores']) == (2, 2)
+    estados = [(r['indice'], r['status']) for r in cuerpo['resultados']]
+    assert estados == [(0, 201), (1, 400), (2, 404), (3, 201)]
+    ids = [cuerpo['resultados'][0]['id'], cuerpo['resultados'][3]['id']]
+    assert ids[1] > ids[0]
+    filas = client.get('/productos/?ids=' + ','.join(map(str, ids))).get_json()['data']
+    assert [fila['nombre'] for fila in filas] == ['Monitor', 'Mouse']
+
+
+def test_bulk_actualizar_y_eliminar_informan_faltantes(client, autorizacion):
+    items = [dict(_producto('Uno'), id=8), dict(_producto('Dos'), id=9999), _producto('Sin id')]
+    cuerpo = client.put('/productos/bulk', json=items, headers=autorizacion).get_json()
+    assert [r['status'] for r in cuerpo['resultados']] == [200, 404, 400]
+    assert client.get('/productos/8').get_json()['nombre'] == 'Uno'
+
+    respuesta = client.delete('/productos/bulk', json=[9, 9999], headers=autorizacion)
+    assert respuesta.status_code == 200
+    assert [r['status'] for r in respuesta.get_json()['resultados']] == [200, 404]
+    assert client.get('/productos/9').status_code == 404
+
+
+def test_bulk_rechaza_ids_booleanos(client, autorizacion):
+    # true es 1 para Python: no debe actualizar ni eliminar el producto 1
+    items = [dict(_producto('Booleano'), id=True), dict(_producto('Uno'), id=8)]
+    cuerpo = client.put('/productos/bulk', json=items, headers=autorizacion).get_json()
+    assert [(r['status'], r.get('error')) for r in cuerpo['resultados']] == [(400, "id es requerido"), (200, None)]
+    assert client.delete('/productos/bulk', json=[True], headers=autorizacion).status_code == 400
+
+
+def test_bulk_exige_arreglo_y_autenticacion(client, autorizacion):
+    assert client.post('/productos/bulk', json=[_producto('X')]).status_code == 401
+    assert client.post('/productos/bulk', json={}, headers=autorizacion).status_code == 400
@@ -0,0 +1,97 @@
+"""
+Propósito: Pruebas de los comandos flask catalog.
+Funcionalidad: Comprueba que bajo la línea de órdenes de Flask no se precargan el índice de
+búsqueda ni las estadísticas, que una importación queda visible para la búsqueda (construida
+con la primera consulta) y para el catálogo, que se rechazan los registros que no caben en las
+columnas y que reemplazar el archivo con otro del mismo tamaño no reanuda la importación anterior.
+"""
+
+import os
+
+import pytest
+
+from app import create_app
+from app.comandos import clave_importacion
+from app.config import Config
+
+
+@pytest.fixture
+def app_cli(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', str(tmp_path / 'versiones.bin'))
+    monkeypatch.setattr(Config, 'METRICS_DIR', str(tmp_path / 'metricas'))
+    monkeypatch.setenv('FLASK_RUN_FROM_CLI', 'true')
+    return create_app()
+
+
+def test_la_linea_de_ordenes_no_precarga(app_cli):
+    assert app_cli.extensions['busqueda']._indice is None
+    assert app_cli.extensions['estadisticas']._productos is None
+
+
+def test_importar_productos_csv(app_cli, tmp_path):
+    archivo = tmp_path / 'productos.csv'
+    archivo.write_text(
+        "nombre,precio,descripcion,categortia_id\n"
+        "Auriculares inalambricos,89.90,Bluetooth,3\n"
+        "Parlante portatil,45.00,,5\n"
+        ",10.00,Sin nombre,3\n",
+        encoding='utf-8',
+    )
+    resultado = app_cli.test_cli_runner().invoke(args=['catalog', 'import', str(archivo)])
+    assert resultado.exit_code == 0, resultado.output
+    assert '1 registros omitidos' in resultado.output
+
+    client = app_cli.test_client()
+    nombres = [fila['nombre'] for fila in client.get('/productos/?limit=50').get_json()['data']]
+    assert nombres[-2:] == ['Auriculares inalambricos', 'Parlante portatil']
+    encontrados = client.get('/productos/search?q=auriculares').get_json()['data']
+    assert [fila['nombre'] for fila in encontrados] == ['Auriculares inalambricos']
+
+
+def test_importar_registra_un_cambio_por_fila_importada(app_cli, tmp_path):
+    repos = app_cli.extensions['repositorios']
+    antes = repos.cambios.limites()[1]
+    archivo = tmp_path / 'productos.ndjson'
+    archivo.write_text(
+        '{"nombre": "Lampara", "precio": "12.00", "categortia_id": 3}\n'
+        '{"nombre": "Escritorio", "precio": "150.00", "categortia_id": 5}\n',
+        encoding='utf-8',
+    )
+    resultado = app_cli.test_cli_runner().invoke(args=['catalog', 'import', str(archivo)])
+    assert resultado.exit_code == 0, resultado.output
+    entradas = repos.cambios.leer(antes, 100)
+    assert [(fila['tabla'], fila['registro_id']) for fila in entradas] == [('producto', 12), ('producto', 13)]
+
+
+def test_importar_rechaza_valores_que_no_caben_en_las_columnas(app_cli, tmp_path):
+    archivo = tmp_path / 'productos.csv'
+    archivo.write_text(
+        "nombre,precio,descripcion,categortia_id\n"
+        f"{'N' * 51},10.00,Nombre largo,3\n"
+        "Caro,1000000.00,Fuera de decimal(8,2),3\n"
+        "Negativo,-1000000,Fuera de decimal(8,2),3\n"
+        f"{'N' * 50},999999.99,En el límite,3\n"
+        "Redondeado,10.005,,3\n",
+        encoding='utf-8',
+    )
+    resultado = app_cli.test_cli_runner().invoke(args=['catalog', 'import', str(archivo)])
+    assert resultado.exit_code == 0, resultado.output
+    assert 'Registro 1 omitido: nombre de más de 50 caracteres' in resultado.output
+    assert 'Registro 2 omitido: precio fuera de rango' in resultado.output
+    assert '3 registros omitidos' in resultado.output
+    filas = app_cli.test_client().get('/productos/?limit=50').get_json()['data']
+    assert [(fila['nombre'], fila['precio']) for fila in filas[-2:]] == [('N' * 50, '999999.99'), ('Redondeado', '10.01')]
+
+
+def test_clave_de_importacion_cambia_con_el_contenido(tmp_path):
+    archivo = tmp_path / 'productos.csv'
+    archivo.write_text("nombre,categortia_id\nLampara,3\n", encoding='utf-8')
+    clave = clave_importacion(str(archivo), 'productos')
+    assert clave_importacion(str(archivo), 'productos') == clave
+    # Mismo tamaño y misma fecha de modificación, otro contenido
+    estado = os.stat(archivo)
+    archivo.write_text("nombre,categortia_id\nVentana,3\n", encoding='utf-8')
+    os.utime(archivo, ns=(estado.st_atime_ns, estado.st_mtime_ns))
+    assert os.path.getsize(archivo) == estado.st_size
+    assert clave_importacion(str(archivo), 'productos') != clave
+    assert clave_importacion(str(archivo), 'categorias') != clave_importacion(str(archivo), 'productos')
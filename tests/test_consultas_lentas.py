@@ -0,0 +1,43 @@
+"""
+Propósito: Pruebas del registro de consultas lentas.
+Funcionalidad: Con un umbral mínimo todas las sentencias cuentan como lentas; comprueba que un
+executemany (la actualización masiva de productos) se registra con el tamaño del lote y que su
+plan se obtiene con los parámetros de la primera fila.
+"""
+
+import time
+
+import pytest
+
+from app import create_app
+from app.config import Config
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', str(tmp_path / 'versiones.bin'))
+    monkeypatch.setattr(Config, 'METRICS_DIR', str(tmp_path / 'metricas'))
+    monkeypatch.setattr(Config, 'SLOW_QUERY_THRESHOLD', 1e-9)
+    return create_app()
+
+
+def _esperar_plan(registro, prefijo, segundos=5):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        for plantilla, plan in registro.recientes()['planes'].items():
+            if plantilla.startswith(prefijo):
+                return plan
+        time.sleep(0.02)
+    return None
+
+
+def test_executemany_registra_el_lote_y_obtiene_el_plan(app, client, autorizacion):
+    items = [
+        {"id": id, "nombre": f"Producto {id}", "precio": "9.99", "descripcion": None, "categortia_id": 3}
+        for id in (8, 9, 10)
+    ]
+    assert client.put('/productos/bulk', json=items, headers=autorizacion).status_code == 200
+    registro = app.extensions['consultas_lentas']
+    lotes = [e for e in registro.recientes()['recientes'] if e['plantilla'].startswith('UPDATE producto')]
+    assert lotes and lotes[0]['parametros'] == '3 filas'
+    assert _esperar_plan(registro, 'UPDATE producto')
@@ -0,0 +1,51 @@
+"""
+Propósito: Pruebas de la documentación servida desde memoria.
+Funcionalidad: Comprueba que la página de Swagger UI enlaza los recursos con el hash de su
+contenido, que solo esas URLs se guardan en caché sin revalidar, y que cuando un recurso cambia
+en disco la página pasa a enlazar la versión nueva.
+"""
+
+import os
+import re
+import shutil
+
+from app.documentos import RECURSOS_PAGINA
+
+
+def _enlaces(client):
+    pagina = client.get('/documentacion/docs')
+    assert pagina.headers['Cache-Control'] == 'no-cache'
+    return dict(re.findall(r'/documentacion/swagger-ui/([\w.-]+)\?v=(\w+)', pagina.get_data(as_text=True)))
+
+
+def test_recursos_versionados_en_cache_y_sin_version_revalidados(client):
+    enlaces = _enlaces(client)
+    assert sorted(enlaces) == sorted(RECURSOS_PAGINA)
+    versionado = client.get(f"/documentacion/swagger-ui/swagger-ui.css?v={enlaces['swagger-ui.css']}")
+    assert versionado.status_code == 200
+    assert versionado.headers['Cache-Control'] == 'public, max-age=86400, immutable'
+    for ruta in ('/documentacion/swagger-ui/swagger-ui.css', '/documentacion/swagger-ui/swagger-ui.css?v=antigua'):
+        respuesta = client.get(ruta)
+        assert respuesta.headers['Cache-Control'] == 'no-cache'
+        revalidada = client.get(ruta, headers={'If-None-Match': respuesta.headers['ETag']})
+        assert revalidada.status_code == 304
+
+
+def test_recurso_modificado_cambia_la_version_de_la_pagina(app, client, tmp_path):
+    documentacion = app.extensions['documentacion']
+    for nombre in RECURSOS_PAGINA:
+        shutil.copy(os.path.join(documentacion.directorio_recursos, nombre), tmp_path / nombre)
+    documentacion.directorio_recursos = str(tmp_path)
+    documentacion._recursos = {}
+    documentacion.intervalo = 1e-9
+    antes = _enlaces(client)
+
+    css = tmp_path / 'swagger-ui.css'
+    css.write_text(css.read_text(encoding='utf-8') + "\n/* cambio */\n", encoding='utf-8')
+    os.utime(css, ns=(os.stat(css).st_atime_ns, os.stat(css).st_mtime_ns + 1))
+    despues = _enlaces(client)
+    assert despues['swagger-ui.css'] != antes['swagger-ui.css']
+    assert despues['swagger-ui-bundle.js'] == antes['swagger-ui-bundle.js']
+    respuesta = client.get(f"/documentacion/swagger-ui/swagger-ui.css?v={despues['swagger-ui.css']}")
+    assert respuesta.headers['Cache-Control'].endswith('immutable')
+    assert respuesta.get_data(as_text=True).endswith("/* cambio */\n")
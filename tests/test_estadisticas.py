@@ -0,0 +1,92 @@
+"""
+Propósito: Pruebas de las estadísticas por categoría.
+Funcionalidad: Comprueba que mover un producto de categoría y eliminarlo actualizan de forma
+exacta ambas categorías (recuento, mínimo, máximo y promedio), que con muchos productos y
+escrituras al azar el resumen coincide con el cálculo completo, y que la memoria por producto
+se mantiene dentro de lo documentado.
+"""
+
+import random
+import tracemalloc
+from decimal import Decimal
+
+from app.estadisticas import EstadisticasCategorias
+
+
+def _stats(client):
+    return {fila['categortia_id']: fila for fila in client.get('/categorias/stats').get_json()['data']}
+
+
+def test_mover_producto_actualiza_ambas_categorias(client, autorizacion):
+    assert _stats(client)[3]['productos'] == 2
+    producto = {"nombre": "Smartphone", "precio": "10.00", "descripcion": None, "categortia_id": 5}
+    assert client.put('/productos/9', json=producto, headers=autorizacion).status_code == 200
+
+    stats = _stats(client)
+    assert (stats[3]['productos'], stats[3]['precio_min'], stats[3]['precio_max']) == (1, '599.99', '599.99')
+    assert (stats[5]['productos'], stats[5]['precio_min'], stats[5]['precio_max']) == (3, '10.00', '649.99')
+    assert stats[5]['precio_promedio'] == '419.99'
+
+
+def test_eliminar_productos_recalcula_extremos_y_quita_la_categoria(client, autorizacion):
+    assert _stats(client)[5]['precio_max'] == '649.99'
+    for id in (8, 11):
+        assert client.delete(f'/productos/{id}', headers=autorizacion).status_code == 200
+    stats = _stats(client)
+    assert 5 not in stats
+    assert client.delete('/productos/9', headers=autorizacion).status_code == 200
+    assert _stats(client)[3]['productos'] == 1
+
+
+def _esperado(productos):
+    # Cálculo completo, como el GROUP BY de la conciliación
+    por_categoria = {}
+    for categoria, precio in productos.values():
+        por_categoria.setdefault(categoria, []).append(precio)
+    esperado = {}
+    for categoria, precios in por_categoria.items():
+        con_precio = [precio for precio in precios if precio is not None]
+        esperado[categoria] = {
+            "categortia_id": categoria,
+            "productos": len(precios),
+            "precio_min": min(con_precio) if con_precio else None,
+            "precio_max": max(con_precio) if con_precio else None,
+            "precio_promedio": (sum(con_precio) / len(con_precio)).quantize(Decimal('0.01')) if con_precio else None,
+        }
+    return esperado
+
+
+def test_muchos_productos_con_escrituras_al_azar():
+    azar = random.Random(17)
+    estadisticas = EstadisticasCategorias()
+    estadisticas._productos, estadisticas._resumenes = {}, {}
+
+    def escribir(id, categoria, precio):
+        fila = [] if categoria is None else [{"id": id, "categortia_id": categoria, "precio": precio}]
+        estadisticas._aplicar([id], fila)
+        if categoria is None:
+            productos.pop(id, None)
+        else:
+            productos[id] = (categoria, precio)
+
+    filas = [
+        {"id": id, "categortia_id": azar.randint(1, 40),
+         "precio": None if id % 10 == 0 else Decimal(azar.randint(1, 99999999)).scaleb(-2)}
+        for id in range(1, 50001)
+    ]
+    tracemalloc.start()
+    estadisticas._aplicar([], filas)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Unos 120 bytes por producto (ver el docstring de app/estadisticas.py)
+    assert memoria / len(filas) < 160
+    productos = {fila['id']: (fila['categortia_id'], fila['precio']) for fila in filas}
+
+    for _ in range(5000):
+        id = azar.randint(1, 50000)
+        if azar.random() < 0.3:
+            escribir(id, None, None)
+        else:
+            escribir(id, azar.randint(1, 40), Decimal(azar.randint(1, 99999999)).scaleb(-2))
+    resumen = {categoria: r.como_dict(categoria) for categoria, r in estadisticas._resumenes.items()}
+    assert resumen == _esperado(productos)
@@ -0,0 +1,56 @@
+"""
+Propósito: Pruebas del pool de hashing de contraseñas.
+Funcionalidad: Comprueba que un trabajo vencido conserva su cupo hasta terminar de verdad en
+el pool (BCRYPT_MAX_PENDING acota también los trabajos abandonados): con los cupos ocupados la
+siguiente operación se rechaza y /auth responde 503 con Retry-After, y cuando el pool termina
+los trabajos las operaciones vuelven a completarse.
+"""
+
+import time
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.hashing import HashingSaturado
+from conftest import USUARIO
+
+
+@pytest.fixture
+def app_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', str(tmp_path / 'versiones.bin'))
+    monkeypatch.setattr(Config, 'METRICS_DIR', str(tmp_path / 'metricas'))
+    # Un proceso, dos cupos y hashes (costo 13, ~0,6 s) mucho más lentos que el tiempo de espera
+    monkeypatch.setattr(Config, 'BCRYPT_WORKERS', 1)
+    monkeypatch.setattr(Config, 'BCRYPT_MAX_PENDING', 2)
+    monkeypatch.setattr(Config, 'BCRYPT_TIMEOUT', 0.05)
+    monkeypatch.setattr(Config, 'BCRYPT_ROUNDS', 13)
+    return create_app()
+
+
+def test_cupos_ocupados_hasta_que_el_pool_termina(app_pool):
+    hashing = app_pool.extensions['hashing']
+    client = app_pool.test_client()
+    # Las solicitudes dejan de esperar, pero los dos trabajos siguen en el pool
+    for _ in range(2):
+        with pytest.raises(HashingSaturado, match="Tiempo de espera"):
+            hashing.hashear('secreto')
+    with pytest.raises(HashingSaturado, match="Cola de hashing llena"):
+        hashing.hashear('secreto')
+    respuesta = client.post('/auth/register', json=USUARIO)
+    assert respuesta.status_code == 503
+    assert respuesta.headers['Retry-After'] == str(Config.BCRYPT_RETRY_AFTER)
+
+    # Cuando el pool termina los trabajos vencidos, los cupos vuelven
+    hashing.costo = 4
+    hashing.timeout = 10
+    limite = time.monotonic() + 20
+    while True:
+        try:
+            hash_guardado = hashing.hashear('secreto')
+            break
+        except HashingSaturado:
+            assert time.monotonic() < limite, "los cupos no se liberaron"
+            time.sleep(0.05)
+    assert hashing.verificar('secreto', hash_guardado)
+    assert client.post('/auth/register', json=USUARIO).status_code == 201
@@ -0,0 +1,101 @@
+"""
+Propósito: Pruebas de la agregación de métricas entre workers.
+Funcionalidad: Simula otros workers con archivos en METRICS_DIR y comprueba que /metrics suma
+sus contadores, que las solicitudes en curso solo cuentan para procesos vivos, que retirar un
+worker conserva sus valores aunque otro reutilice el pid, que el directorio se vacía al
+arrancar y que sin METRICS_DIR la aplicación arranca con las métricas solo del proceso.
+"""
+
+import json
+import os
+
+from app import create_app
+from app.config import Config
+from app.metricas import ARCHIVO_RETIRADOS, limpiar_directorio, retirar_worker
+
+# Pid que no corresponde a ningún proceso (mayor que pid_max en Linux)
+PID_INEXISTENTE = 2 ** 22 + 1
+
+ETIQUETAS = ["categoria", "categoria.get_categorias", "GET", "200"]
+
+
+def _escribir_worker(directorio, pid, solicitudes, en_curso=0):
+    os.makedirs(directorio, exist_ok=True)
+    datos = {
+        "pid": pid,
+        "contadores": [["http_requests_total", ETIQUETAS, solicitudes]],
+        "histogramas": [],
+        "en_curso": [[["categoria", "categoria.get_categorias"], en_curso]],
+    }
+    with open(os.path.join(directorio, f"worker_{pid}.json"), 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo)
+
+
+def _valor(texto, prefijo):
+    for linea in texto.splitlines():
+        if linea.startswith(prefijo):
+            return float(linea.rsplit(' ', 1)[1])
+    return None
+
+
+def test_metrics_suma_los_workers_y_descarta_en_curso_de_muertos(app, client):
+    directorio = app.config['METRICS_DIR']
+    _escribir_worker(directorio, PID_INEXISTENTE, 5, en_curso=3)
+    client.get('/categorias/')
+    texto = client.get('/metrics').get_data(as_text=True)
+    total = 'http_requests_total{blueprint="categoria",endpoint="categoria.get_categorias",method="GET",status="200"}'
+    assert _valor(texto, total) == 6
+    en_curso = 'http_requests_in_flight{blueprint="categoria",endpoint="categoria.get_categorias"}'
+    assert _valor(texto, en_curso) == 0
+
+
+def test_retirar_worker_conserva_los_contadores_con_pid_reutilizado(tmp_path):
+    directorio = str(tmp_path)
+    _escribir_worker(directorio, 100, 7)
+    retirar_worker(directorio, 100)
+    assert not os.path.exists(tmp_path / 'worker_100.json')
+    # Un worker nuevo con el mismo pid empieza de cero
+    _escribir_worker(directorio, 100, 2)
+    retirar_worker(directorio, 100)
+    with open(tmp_path / ARCHIVO_RETIRADOS, encoding='utf-8') as archivo:
+        retirados = json.load(archivo)
+    assert retirados['contadores'] == [["http_requests_total", ETIQUETAS, 9]]
+    assert retirados['en_curso'] == []
+
+
+def test_retirados_se_suman_en_metrics(app, client):
+    directorio = app.config['METRICS_DIR']
+    _escribir_worker(directorio, PID_INEXISTENTE, 4)
+    retirar_worker(directorio, PID_INEXISTENTE)
+    texto = client.get('/metrics').get_data(as_text=True)
+    assert _valor(texto, 'http_requests_total{blueprint="categoria",endpoint="categoria.get_categorias"') == 4
+
+
+def test_limpiar_directorio_borra_ejecuciones_anteriores(tmp_path):
+    _escribir_worker(str(tmp_path), 100, 1)
+    _escribir_worker(str(tmp_path), 101, 1)
+    retirar_worker(str(tmp_path), 101)
+    (tmp_path / 'otro.txt').write_text('se conserva')
+    limpiar_directorio(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ['otro.txt']
+
+
+def test_sin_metrics_dir_mide_solo_el_proceso(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', str(tmp_path / 'versiones.bin'))
+    monkeypatch.setattr(Config, 'METRICS_DIR', '')
+    app = create_app()
+    assert app.extensions['metricas'].persistir is False
+    assert 'METRICS_DIR' in caplog.text
+    client = app.test_client()
+    client.get('/categorias/')
+    texto = client.get('/metrics').get_data(as_text=True)
+    assert _valor(texto, 'http_requests_total{blueprint="categoria",endpoint="categoria.get_categorias"') == 1
+
+
+def test_la_linea_de_ordenes_no_vuelca(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', str(tmp_path / 'versiones.bin'))
+    monkeypatch.setattr(Config, 'METRICS_DIR', str(tmp_path / 'metricas'))
+    monkeypatch.setenv('FLASK_RUN_FROM_CLI', 'true')
+    app = create_app()
+    app.extensions['metricas'].volcar()
+    assert not os.path.exists(tmp_path / 'metricas')
@@ -0,0 +1,41 @@
+"""
+Propósito: Pruebas de los contadores de versión por tabla.
+Funcionalidad: Comprueba que el archivo por defecto depende de la base configurada (bases
+distintas no comparten contadores ni época de ETag) y que con SQLite en memoria los contadores
+quedan en el proceso.
+"""
+
+from app import create_app
+from app.config import Config
+from app.versiones import ruta_por_defecto
+
+
+def _config(**valores):
+    config = {
+        'REPOSITORY_BACKEND': 'mysql', 'MYSQL_HOST': 'db1', 'MYSQL_PORT': 3306, 'MYSQL_DATABASE': 'tienda_online',
+        'SQLITE_DATABASE': ':memory:',
+    }
+    config.update(valores)
+    return config
+
+
+def test_ruta_por_defecto_segun_la_base(tmp_path):
+    assert ruta_por_defecto(_config()) == ruta_por_defecto(_config())
+    assert ruta_por_defecto(_config()) != ruta_por_defecto(_config(MYSQL_HOST='db2'))
+    assert ruta_por_defecto(_config()) != ruta_por_defecto(_config(MYSQL_DATABASE='tienda_pruebas'))
+    sqlite = _config(REPOSITORY_BACKEND='sqlite', SQLITE_DATABASE=str(tmp_path / 'a.db'))
+    assert ruta_por_defecto(sqlite) != ruta_por_defecto(dict(sqlite, SQLITE_DATABASE=str(tmp_path / 'b.db')))
+    assert ruta_por_defecto(_config(REPOSITORY_BACKEND='sqlite')) is None
+
+
+def test_sqlite_en_memoria_usa_contadores_del_proceso(monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_VERSIONS_FILE', '')
+    monkeypatch.setattr(Config, 'METRICS_DIR', '')
+    app = create_app()
+    versiones = app.extensions['versiones']
+    assert versiones.ruta is None
+    client = app.test_client()
+    etag = client.get('/productos/').headers['ETag']
+    assert client.get('/productos/', headers={'If-None-Match': etag}).status_code == 304
+    versiones.incrementar('producto')
+    assert client.get('/productos/', headers={'If-None-Match': etag}).status_code == 200
@@ -23,6 +23,68 @@ SET time_zone = "+00:00";
 
 -- --------------------------------------------------------
 
+--
+-- Estructura de tabla para la tabla `cambio`
+--
+-- Registro de cambios del catálogo (GET /changes): una fila por producto o categoría creado,
+-- actualizado (upsert) o eliminado (delete), escrita en la misma transacción que el cambio.
+-- momento son milisegundos desde la época Unix.
+--
+
+CREATE TABLE `cambio` (
+  `seq` bigint(20) NOT NULL,
+  `tabla` varchar(20) NOT NULL,
+  `registro_id` int(11) NOT NULL,
+  `operacion` varchar(6) NOT NULL,
+  `momento` bigint(20) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Estructura de tabla para la tabla `cambio_horizonte`
+--
+-- Última secuencia eliminada del registro por la compactación; un cliente con since menor
+-- debe volver a sincronizar el catálogo completo.
+--
+
+CREATE TABLE `cambio_horizonte` (
+  `id` tinyint(4) NOT NULL,
+  `seq` bigint(20) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+--
+-- Volcado de datos para la tabla `cambio_horizonte`
+--
+
+INSERT INTO `cambio_horizonte` (`id`, `seq`) VALUES
+(1, 0);
+
+-- --------------------------------------------------------
+
+--
+-- Estructura de tabla para la tabla `cambio_secuencia`
+--
+-- Última secuencia asignada en `cambio`. Cada escritura la reserva con un UPDATE de esta fila,
+-- que queda bloqueada hasta que la transacción termina: las secuencias se confirman en orden.
+-- En una base existente se inicializa con
+-- INSERT INTO cambio_secuencia (id, ultima) SELECT 1, COALESCE(MAX(seq), 0) FROM cambio;
+--
+
+CREATE TABLE `cambio_secuencia` (
+  `id` tinyint(4) NOT NULL,
+  `ultima` bigint(20) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+--
+-- Volcado de datos para la tabla `cambio_secuencia`
+--
+
+INSERT INTO `cambio_secuencia` (`id`, `ultima`) VALUES
+(1, 0);
+
+-- --------------------------------------------------------
+
 --
 -- Estructura de tabla para la tabla `categortia`
 --
@@ -46,6 +108,22 @@ INSERT INTO `categortia` (`id`, `nombre`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Estructura de tabla para la tabla `importacion`
+--
+-- Progreso de las importaciones masivas (flask catalog import): registros del archivo ya
+-- procesados, guardado en la misma transacción que cada lote para reanudar tras un corte.
+--
+
+CREATE TABLE `importacion` (
+  `clave` char(32) NOT NULL,
+  `tabla` varchar(20) NOT NULL,
+  `filas` bigint(20) NOT NULL,
+  `momento` bigint(20) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Estructura de tabla para la tabla `producto`
 --
@@ -95,18 +173,45 @@ INSERT INTO `usuario` (`id`, `numero`, `nombre`, `apellido`, `contrasena`) VALUE
 -- Índices para tablas volcadas
 --
 
+--
+-- Indices de la tabla `cambio`
+--
+ALTER TABLE `cambio`
+  ADD PRIMARY KEY (`seq`),
+  ADD KEY `idx_cambio_registro` (`tabla`,`registro_id`,`seq`),
+  ADD KEY `idx_cambio_momento` (`momento`);
+
+--
+-- Indices de la tabla `cambio_horizonte`
+--
+ALTER TABLE `cambio_horizonte`
+  ADD PRIMARY KEY (`id`);
+
+--
+-- Indices de la tabla `cambio_secuencia`
+--
+ALTER TABLE `cambio_secuencia`
+  ADD PRIMARY KEY (`id`);
+
 --
 -- Indices de la tabla `categortia`
 --
 ALTER TABLE `categortia`
   ADD PRIMARY KEY (`id`);
 
+--
+-- Indices de la tabla `importacion`
+--
+ALTER TABLE `importacion`
+  ADD PRIMARY KEY (`clave`);
+
 --
 -- Indices de la tabla `producto`
 --
 ALTER TABLE `producto`
   ADD PRIMARY KEY (`id`),
-  ADD KEY `fk_producto_categoria` (`categortia_id`);
+  ADD KEY `fk_producto_categoria` (`categortia_id`),
+  ADD FULLTEXT KEY `ft_producto_texto` (`nombre`,`descripcion`);
 
 --
 -- Indices de la tabla `usuario`